@@ -1,6 +1,18 @@
 """mcp_auth_broker package."""
 
-from .server import MCPAuthBrokerServer
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .server import MCPAuthBrokerServer
+
+
+def __getattr__(name):
+    # The server pulls in every provider and transport; import it only when asked for.
+    if name == "MCPAuthBrokerServer":
+        from .server import MCPAuthBrokerServer
+
+        return MCPAuthBrokerServer
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def main(argv=None):
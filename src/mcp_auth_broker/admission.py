@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Callable, Iterator, Mapping
+from contextlib import contextmanager
+
+from .fair_queue import FairQueue
+from .metrics import MetricsRegistry
+
+# A flow is (requester_id, tenant_id); tenant_id is "" unless flows are keyed per tenant too.
+Flow = tuple[str, str]
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, reason: str, queue_ms: int) -> None:
+        super().__init__(f"request shed: {reason}")
+        self.reason = reason
+        self.queue_ms = queue_ms
+
+
+class AdmissionController:
+    """Bounds in-flight requests and sheds queued ones with CoDel-style queue-delay control.
+
+    Up to ``max_in_flight`` requests run at once and up to ``max_queue`` wait for a slot.
+    Waiting requests are grouped into flows by requester and served by deficit round robin
+    (``weights`` maps requester IDs to their share, default 1), so one requester's backlog
+    cannot starve the others. When queue delay has stayed above ``target_seconds`` for a full
+    ``interval_seconds``, the controller enters a dropping state. In that state it rejects new
+    arrivals that would have to queue, and queued requests that waited longer than the target.
+    It leaves the state as soon as a request is admitted within the target. A request that
+    cannot get a slot before its own deadline is shed rather than left to time out.
+
+    ``max_in_flight=0`` disables admission control.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_in_flight: int,
+        max_queue: int,
+        target_seconds: float,
+        interval_seconds: float,
+        weights: Mapping[str, int] | None = None,
+        metrics: MetricsRegistry | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.target_seconds = target_seconds
+        self.interval_seconds = interval_seconds
+        self.weights = dict(weights or {})
+        self.metrics = metrics
+        self._clock = clock
+        self._cond = threading.Condition()
+        self._queue = FairQueue(lambda flow: self.weights.get(flow[0], 1))
+        self._in_flight = 0
+        self._first_above_at = 0.0
+        self._dropping = False
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._queue)
+
+    def flow_depth(self, flow: Flow) -> int:
+        return self._queue.depth(flow)
+
+    @contextmanager
+    def admit(self, deadline_seconds: float, flow: Flow = ("", "")) -> Iterator[None]:
+        """Hold a slot for the body of the ``with`` block, or raise ``AdmissionRejected``."""
+        if self.max_in_flight <= 0:
+            yield
+            return
+        self._acquire(deadline_seconds, flow)
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._in_flight -= 1
+                self._cond.notify_all()
+
+    def _acquire(self, deadline_seconds: float, flow: Flow) -> None:
+        with self._cond:
+            if self._in_flight < self.max_in_flight and not self._queue:
+                self._in_flight += 1
+                self._observe(0.0)
+                return
+            if len(self._queue) >= self.max_queue:
+                raise AdmissionRejected("queue_full", 0)
+            if self._dropping:
+                raise AdmissionRejected("queue_delay", 0)
+
+            ticket = object()
+            enqueued_at = self._clock()
+            self._queue.push(flow, ticket)
+            self._report_depth(flow)
+            try:
+                while self._queue.peek() is not ticket or self._in_flight >= self.max_in_flight:
+                    remaining = enqueued_at + deadline_seconds - self._clock()
+                    if remaining <= 0:
+                        raise AdmissionRejected("deadline", int(deadline_seconds * 1000))
+                    self._cond.wait(remaining)
+            except BaseException:
+                self._queue.remove(flow, ticket)
+                self._report_depth(flow)
+                self._cond.notify_all()
+                raise
+            self._queue.pop()
+            self._report_depth(flow)
+
+            sojourn = self._clock() - enqueued_at
+            if self.metrics is not None:
+                self.metrics.increment(
+                    "admission.queue_wait_ms",
+                    sojourn * 1000,
+                    requester=flow[0],
+                    tenant=flow[1],
+                )
+                self.metrics.increment("admission.dequeued", requester=flow[0], tenant=flow[1])
+            if self._observe(sojourn):
+                self._cond.notify_all()
+                raise AdmissionRejected("queue_delay", int(sojourn * 1000))
+            self._in_flight += 1
+
+    def _report_depth(self, flow: Flow) -> None:
+        if self.metrics is not None:
+            self.metrics.set_gauge(
+                "admission.queue_depth",
+                self._queue.depth(flow),
+                requester=flow[0],
+                tenant=flow[1],
+            )
+
+    def _observe(self, sojourn: float) -> bool:
+        """Track queue delay; return True when this request should be dropped."""
+        now = self._clock()
+        if sojourn < self.target_seconds:
+            self._first_above_at = 0.0
+            self._dropping = False
+            return False
+        if self._first_above_at == 0.0:
+            self._first_above_at = now + self.interval_seconds
+        elif now >= self._first_above_at:
+            self._dropping = True
+        return self._dropping
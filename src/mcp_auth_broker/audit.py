@@ -1,18 +1,36 @@
 from __future__ import annotations
 
 import json
+import sys
+import threading
+import time
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from typing import Any
+from typing import TYPE_CHECKING, Any
 from uuid import uuid4
 
 from .config import BrokerConfig
 
+if TYPE_CHECKING:
+    from .redaction import RedactionEngine
+
 
 @dataclass
 class AuditEmitter:
+    """Records audit events and writes each one as a single JSON line.
+
+    Safe to share between worker threads: an event is appended and written under one
+    lock, so the in-memory order matches the output order and lines never interleave.
+    When a ``redactor`` is set, payloads are redacted before they are recorded and each
+    redacted field is listed in the event's ``redactions``.
+    """
+
     emit_to_stdout: bool = True
     events: list[dict[str, Any]] = field(default_factory=list)
+    redactor: RedactionEngine | None = None
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False, compare=False
+    )
 
     def emit(
         self,
@@ -23,13 +41,22 @@ class AuditEmitter:
         trace_id: str,
         payload: dict[str, Any],
         redactions: list[dict[str, str]] | None = None,
+        occurred_at: float | None = None,
+        redact: bool = True,
     ) -> dict[str, Any]:
+        if redact:
+            payload, found = self.redact(payload)
+            redactions = [*(redactions or []), *found]
         requester = request.get("requester") or {}
         event = {
             "schema_version": config.contract_version,
             "event_type": event_type,
             "event_id": str(uuid4()),
-            "occurred_at": datetime.now(timezone.utc).isoformat(),
+            "occurred_at": (
+                datetime.now(timezone.utc)
+                if occurred_at is None
+                else datetime.fromtimestamp(occurred_at, timezone.utc)
+            ).isoformat(),
             "request_id": request.get("request_id", ""),
             "trace_id": trace_id,
             "requester_id": requester.get("requester_id", ""),
@@ -38,7 +65,109 @@ class AuditEmitter:
             "redactions": redactions or [],
             "payload": payload,
         }
-        self.events.append(event)
-        if self.emit_to_stdout:
-            print(json.dumps(event, sort_keys=True))
+        line = json.dumps(event, sort_keys=True) + "\n" if self.emit_to_stdout else None
+        with self._lock:
+            self.events.append(event)
+            if line is not None:
+                sys.stdout.write(line)
+                sys.stdout.flush()
         return event
+
+    def redact(self, payload: dict[str, Any]) -> tuple[dict[str, Any], list[dict[str, str]]]:
+        if self.redactor is None:
+            return payload, []
+        return self.redactor.redact(payload)
+
+    def trail(self, *, config: BrokerConfig, request: dict[str, Any], trace_id: str) -> AuditTrail:
+        return AuditTrail(
+            self,
+            config=config,
+            request=request,
+            trace_id=trace_id,
+            compact=config.audit_mode == "compact",
+            expand_failures=config.audit_expand_failures,
+        )
+
+
+# (event_type, redacted payload, caller redactions, payload redactions, recorded at)
+_Stage = tuple[str, dict[str, Any], list[dict[str, str]], list[dict[str, str]], float]
+
+
+class AuditTrail:
+    """Lifecycle events for one request flow.
+
+    In full mode every stage is emitted as it is recorded. In compact mode stages are held
+    until ``result.emitted`` and written as a single ``request.completed`` event; when the
+    flow ends in an error and ``expand_failures`` is set, the held stages are emitted as
+    separate events instead, with their original timestamps.
+    """
+
+    def __init__(
+        self,
+        emitter: AuditEmitter,
+        *,
+        config: BrokerConfig,
+        request: dict[str, Any],
+        trace_id: str,
+        compact: bool = False,
+        expand_failures: bool = True,
+    ) -> None:
+        self.emitter = emitter
+        self.config = config
+        self.request = request
+        self.trace_id = trace_id
+        self.compact = compact
+        self.expand_failures = expand_failures
+        self._stages: list[_Stage] = []
+
+    def record(
+        self,
+        event_type: str,
+        payload: dict[str, Any],
+        redactions: list[dict[str, str]] | None = None,
+    ) -> None:
+        if not self.compact:
+            self._emit(event_type, payload, redactions)
+            return
+        redacted, found = self.emitter.redact(payload)
+        self._stages.append((event_type, redacted, redactions or [], found, time.time()))
+        if event_type == "result.emitted":
+            self._flush(failed=payload.get("status") == "error")
+
+    def _flush(self, *, failed: bool) -> None:
+        stages, self._stages = self._stages, []
+        if failed and self.expand_failures:
+            for event_type, payload, redactions, found, occurred_at in stages:
+                self._emit(event_type, payload, [*redactions, *found], occurred_at)
+            return
+        # Payload fields redacted in a stage are reported under that stage's key.
+        redactions = []
+        for event_type, _, stage_redactions, found, _ in stages:
+            redactions.extend(stage_redactions)
+            redactions.extend(
+                {**redaction, "field": f"{event_type}.{redaction['field']}"} for redaction in found
+            )
+        self._emit(
+            "request.completed",
+            {event_type: payload for event_type, payload, _, _, _ in stages},
+            redactions,
+        )
+
+    def _emit(
+        self,
+        event_type: str,
+        payload: dict[str, Any],
+        redactions: list[dict[str, str]] | None,
+        occurred_at: float | None = None,
+    ) -> None:
+        self.emitter.emit(
+            config=self.config,
+            event_type=event_type,
+            request=self.request,
+            trace_id=self.trace_id,
+            payload=payload,
+            redactions=redactions,
+            occurred_at=occurred_at,
+            # Compact mode redacts each stage as it is recorded.
+            redact=not self.compact,
+        )
@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass, field, replace
+from typing import Any
+from uuid import uuid4
+
+from .downstream import GraphDownstreamClient, GraphDownstreamError, GraphRequest, GraphResponse
+
+GRAPH_BATCH_LIMIT = 20
+
+BatchKey = tuple[str, str, str, str, str]
+
+
+@dataclass
+class _Pending:
+    request: GraphRequest
+    relative_url: str
+    done: threading.Event = field(default_factory=threading.Event)
+    response: GraphResponse | None = None
+    error: GraphDownstreamError | None = None
+
+
+@dataclass
+class _Batch:
+    key: BatchKey
+    items: list[_Pending] = field(default_factory=list)
+    closed: bool = False
+
+
+class GraphBatchCoalescer:
+    """Coalesces compatible downstream reads into Graph JSON ``$batch`` requests.
+
+    Only ``GET`` calls are coalesced; writes are sent directly. Calls are compatible when
+    they share resource, API version, tenant, requester and access token. The first call
+    opens a batch, later calls within ``window_seconds`` join it, and the batch is sent when
+    the window closes or ``max_batch_size`` is reached. Each caller blocks until its own
+    sub-response is available. A failed ``$batch`` envelope raises ``GraphDownstreamError``
+    in every caller.
+    """
+
+    def __init__(
+        self,
+        inner: GraphDownstreamClient,
+        *,
+        window_seconds: float,
+        max_batch_size: int = GRAPH_BATCH_LIMIT,
+    ) -> None:
+        if not 1 <= max_batch_size <= GRAPH_BATCH_LIMIT:
+            raise ValueError(f"max_batch_size must be between 1 and {GRAPH_BATCH_LIMIT}")
+        self.inner = inner
+        self.window_seconds = window_seconds
+        self.max_batch_size = max_batch_size
+        self._open: dict[BatchKey, _Batch] = {}
+        self._lock = threading.Lock()
+
+    def send(self, request: GraphRequest) -> GraphResponse:
+        # Writes from independent callers must not share one $batch: Graph does not make the
+        # batch atomic, and a caller's write would ride on another caller's request.
+        split = _split_versioned_path(request.path)
+        if split is None or request.method.upper() != "GET" or isinstance(request.body, bytes):
+            return self.inner.send(request)
+        version, relative_url = split
+
+        pending = _Pending(request=request, relative_url=relative_url)
+        key = (
+            request.resource,
+            version,
+            request.tenant_id,
+            request.requester_id,
+            request.access_token,
+        )
+        flush_now = None
+        with self._lock:
+            batch = self._open.get(key)
+            if batch is None:
+                batch = _Batch(key=key)
+                self._open[key] = batch
+                timer = threading.Timer(self.window_seconds, self._flush_on_timer, args=(batch,))
+                timer.daemon = True
+                timer.start()
+            batch.items.append(pending)
+            if len(batch.items) >= self.max_batch_size:
+                flush_now = self._detach(batch)
+
+        if flush_now is not None:
+            self._flush(flush_now)
+        pending.done.wait()
+        if pending.error is not None:
+            raise pending.error
+        return pending.response
+
+    def _detach(self, batch: _Batch) -> _Batch | None:
+        if batch.closed:
+            return None
+        batch.closed = True
+        if self._open.get(batch.key) is batch:
+            del self._open[batch.key]
+        return batch
+
+    def _flush_on_timer(self, batch: _Batch) -> None:
+        with self._lock:
+            detached = self._detach(batch)
+        if detached is not None:
+            self._flush(detached)
+
+    def _flush(self, batch: _Batch) -> None:
+        try:
+            if len(batch.items) == 1:
+                only = batch.items[0]
+                only.response = self.inner.send(only.request)
+            else:
+                self._send_batch(batch)
+        except GraphDownstreamError as exc:
+            for item in batch.items:
+                if item.response is None:
+                    item.error = exc
+        except Exception:
+            error = GraphDownstreamError("provider.unavailable", "downstream batch failed")
+            for item in batch.items:
+                if item.response is None:
+                    item.error = error
+        finally:
+            for item in batch.items:
+                if item.response is None and item.error is None:
+                    item.error = GraphDownstreamError(
+                        "provider.bad_response", "downstream batch response missing item"
+                    )
+                item.done.set()
+
+    def _send_batch(self, batch: _Batch) -> None:
+        first = batch.items[0].request
+        version = batch.key[1]
+        batch_id = str(uuid4())
+        sub_requests = []
+        for index, item in enumerate(batch.items):
+            sub_request: dict[str, Any] = {
+                "id": str(index),
+                "method": item.request.method,
+                "url": item.relative_url,
+            }
+            headers = dict(item.request.headers)
+            if item.request.body is not None:
+                headers.setdefault("content-type", "application/json")
+                sub_request["body"] = item.request.body
+            if headers:
+                sub_request["headers"] = headers
+            sub_requests.append(sub_request)
+
+        envelope = self.inner.send(
+            replace(
+                first,
+                method="POST",
+                path=f"/{version}/$batch",
+                headers={"content-type": "application/json", "accept": "application/json"},
+                body={"requests": sub_requests},
+                timeout_seconds=max(item.request.timeout_seconds for item in batch.items),
+            )
+        )
+        if envelope.status != 200 or not isinstance(envelope.body, dict):
+            raise _envelope_error(envelope.status)
+
+        annotations = {"batch": {"batch_id": batch_id, "size": len(batch.items)}}
+        for sub_response in envelope.body.get("responses") or []:
+            try:
+                item = batch.items[int(sub_response["id"])]
+            except (KeyError, TypeError, ValueError, IndexError):
+                continue
+            headers = {
+                str(name).lower(): str(value)
+                for name, value in (sub_response.get("headers") or {}).items()
+            }
+            item.response = GraphResponse(
+                status=int(sub_response.get("status", 502)),
+                headers=headers,
+                body=sub_response.get("body"),
+                provider_request_id=headers.get("request-id") or envelope.provider_request_id,
+                annotations=annotations,
+            )
+
+
+def _envelope_error(status: int) -> GraphDownstreamError:
+    # The envelope describes the batch, not any caller's request, so it is never handed out.
+    if status == 429:
+        return GraphDownstreamError("provider.rate_limited", "downstream batch rate limited")
+    if status >= 500:
+        return GraphDownstreamError("provider.unavailable", "downstream batch failed")
+    return GraphDownstreamError("provider.bad_response", "downstream batch rejected")
+
+
+def _split_versioned_path(path: str) -> tuple[str, str] | None:
+    # "/v1.0/me/messages" -> ("v1.0", "/me/messages"); absolute URLs are not batchable.
+    if not path.startswith("/"):
+        return None
+    version, separator, remainder = path[1:].partition("/")
+    if not separator or version not in {"v1.0", "beta"}:
+        return None
+    return version, "/" + remainder
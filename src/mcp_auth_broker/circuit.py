@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from .graph_tokens import GraphTokenMintClient, GraphTokenProviderError
+from .secrets import SecretProvider, SecretProviderError, SecretReference
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Only failures that indicate the dependency itself is degraded count toward tripping.
+SECRET_TRIP_CODES = frozenset({"secret.timeout", "secret.unavailable"})
+MINT_TRIP_CODES = frozenset({"provider.timeout", "provider.unavailable"})
+
+StateListener = Callable[[str, str, str, str], None]
+
+
+@dataclass
+class _Circuit:
+    state: str = CLOSED
+    consecutive_failures: int = 0
+    opened_at: float = 0.0
+    probes_in_flight: int = 0
+
+
+class CircuitBreaker:
+    """Closed/open/half-open breaker tracked independently for each key.
+
+    ``on_state_change(dependency, key, previous_state, new_state)`` is called
+    after every transition, outside the breaker lock.
+    """
+
+    def __init__(
+        self,
+        *,
+        dependency: str,
+        failure_threshold: int = 5,
+        reset_timeout_seconds: float = 30.0,
+        half_open_max_calls: int = 1,
+        on_state_change: StateListener | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.dependency = dependency
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_seconds = reset_timeout_seconds
+        self.half_open_max_calls = half_open_max_calls
+        self.on_state_change = on_state_change
+        self._clock = clock
+        self._circuits: dict[str, _Circuit] = {}
+        self._lock = threading.Lock()
+
+    def state(self, key: str) -> str:
+        with self._lock:
+            circuit = self._circuits.get(key)
+            return circuit.state if circuit is not None else CLOSED
+
+    def allow(self, key: str) -> bool:
+        transition = None
+        with self._lock:
+            circuit = self._circuits.setdefault(key, _Circuit())
+            if circuit.state == OPEN:
+                if self._clock() - circuit.opened_at < self.reset_timeout_seconds:
+                    return False
+                transition = self._move(circuit, HALF_OPEN)
+            if circuit.state == HALF_OPEN:
+                if circuit.probes_in_flight >= self.half_open_max_calls:
+                    allowed = False
+                else:
+                    circuit.probes_in_flight += 1
+                    allowed = True
+            else:
+                allowed = True
+        self._notify(key, transition)
+        return allowed
+
+    def record_success(self, key: str) -> None:
+        transition = None
+        with self._lock:
+            circuit = self._circuits.setdefault(key, _Circuit())
+            circuit.consecutive_failures = 0
+            if circuit.state == HALF_OPEN:
+                circuit.probes_in_flight = 0
+                transition = self._move(circuit, CLOSED)
+        self._notify(key, transition)
+
+    def record_failure(self, key: str) -> None:
+        transition = None
+        with self._lock:
+            circuit = self._circuits.setdefault(key, _Circuit())
+            circuit.consecutive_failures += 1
+            if circuit.state == HALF_OPEN or (
+                circuit.state == CLOSED and circuit.consecutive_failures >= self.failure_threshold
+            ):
+                circuit.probes_in_flight = 0
+                circuit.opened_at = self._clock()
+                transition = self._move(circuit, OPEN)
+        self._notify(key, transition)
+
+    def _move(self, circuit: _Circuit, new_state: str) -> tuple[str, str]:
+        previous_state = circuit.state
+        circuit.state = new_state
+        return previous_state, new_state
+
+    def _notify(self, key: str, transition: tuple[str, str] | None) -> None:
+        if transition is not None and self.on_state_change is not None:
+            self.on_state_change(self.dependency, key, *transition)
+
+
+class CircuitBreakingSecretProvider:
+    def __init__(self, inner: SecretProvider, breaker: CircuitBreaker) -> None:
+        self.inner = inner
+        self.breaker = breaker
+
+    def resolve(self, reference: SecretReference) -> str:
+        key = reference.to_uri()
+        if not self.breaker.allow(key):
+            raise SecretProviderError(
+                code="secret.unavailable",
+                message="secret provider circuit open",
+            )
+        try:
+            value = self.inner.resolve(reference)
+        except SecretProviderError as exc:
+            if exc.code in SECRET_TRIP_CODES:
+                self.breaker.record_failure(key)
+            else:
+                self.breaker.record_success(key)
+            raise
+        except BaseException:
+            # Unexpected errors must still release a half-open probe slot.
+            self.breaker.record_failure(key)
+            raise
+        self.breaker.record_success(key)
+        return value
+
+    def check(self) -> None:
+        self.inner.check()
+
+
+class CircuitBreakingMintClient:
+    def __init__(self, inner: GraphTokenMintClient, breaker: CircuitBreaker) -> None:
+        self.inner = inner
+        self.breaker = breaker
+
+    def mint(
+        self,
+        *,
+        tenant_id: str,
+        client_id: str,
+        client_secret: str,
+        scope: str,
+        timeout_seconds: int,
+    ) -> tuple[str, str, int]:
+        if not self.breaker.allow(tenant_id):
+            raise GraphTokenProviderError("provider.unavailable", "token provider circuit open")
+        try:
+            minted = self.inner.mint(
+                tenant_id=tenant_id,
+                client_id=client_id,
+                client_secret=client_secret,
+                scope=scope,
+                timeout_seconds=timeout_seconds,
+            )
+        except GraphTokenProviderError as exc:
+            if exc.code in MINT_TRIP_CODES:
+                self.breaker.record_failure(tenant_id)
+            else:
+                self.breaker.record_success(tenant_id)
+            raise
+        except BaseException:
+            self.breaker.record_failure(tenant_id)
+            raise
+        self.breaker.record_success(tenant_id)
+        return minted
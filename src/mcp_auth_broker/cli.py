@@ -2,9 +2,15 @@ from __future__ import annotations
 
 import argparse
 import json
-from typing import Sequence
+import signal
+import threading
+from collections.abc import Callable
+from typing import TYPE_CHECKING, Any, Sequence
 
-from .server import MCPAuthBrokerServer
+from .probes import PROBE_COMMANDS, run_probe
+
+if TYPE_CHECKING:
+    from .server import MCPAuthBrokerServer
 
 
 def build_parser() -> argparse.ArgumentParser:
@@ -22,26 +28,48 @@ def build_parser() -> argparse.ArgumentParser:
 def main(argv: Sequence[str] | None = None) -> None:
     parser = build_parser()
     args = parser.parse_args(argv)
-    server = MCPAuthBrokerServer()
-
-    if args.command == "health":
-        print(json.dumps(server.health(), sort_keys=True))
-        return
 
-    if args.command == "ready":
-        print(json.dumps(server.readiness(), sort_keys=True))
+    if args.command in PROBE_COMMANDS:
+        result = run_probe(args.command)
+        print(json.dumps(result, sort_keys=True))
+        # Exec probes read the exit status, not the output.
+        if args.command == "ready" and result["status"] != "ready":
+            raise SystemExit(1)
         return
 
-    if args.command == "tools":
-        print(json.dumps(server.discover_tools(), sort_keys=True))
-        return
+    from .server import MCPAuthBrokerServer
 
+    server = MCPAuthBrokerServer()
+    server.start()
     payload = {
         "status": "started",
         "service": server.config.service_name,
         "environment": server.config.environment,
     }
-    print(json.dumps(payload, sort_keys=True))
+    _serve(server, lambda: print(json.dumps(payload, sort_keys=True), flush=True))
+    print(json.dumps({**payload, "status": "stopped"}, sort_keys=True))
+
+
+def _serve(server: MCPAuthBrokerServer, on_ready: Callable[[], None]) -> None:
+    """Block until SIGTERM or SIGINT, reloading configuration on SIGHUP, then shut down."""
+    stopping = threading.Event()
+    previous: dict[int, Any] = {}
+    # Signal handlers can only be installed from the main thread.
+    if threading.current_thread() is threading.main_thread():
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            previous[signum] = signal.signal(signum, lambda *_: stopping.set())
+        if hasattr(signal, "SIGHUP"):
+            previous[signal.SIGHUP] = signal.getsignal(signal.SIGHUP)
+            server.reloader.install_signal_handler(signal.SIGHUP)
+    try:
+        on_ready()
+        # Wake periodically so signal handlers run promptly on every platform.
+        while not stopping.wait(0.5):
+            pass
+    finally:
+        server.shutdown()
+        for signum, handler in previous.items():
+            signal.signal(signum, handler)
 
 
 if __name__ == "__main__":
@@ -1,7 +1,8 @@
 from __future__ import annotations
 
 import os
-from dataclasses import dataclass
+from collections.abc import Mapping
+from dataclasses import dataclass, field
 
 from .secrets import SecretReference
 
@@ -21,10 +22,65 @@ class BrokerConfig:
     token_cache_skew_seconds: int
     token_max_ttl_seconds: int
     token_provider_timeout_seconds: int
+    token_cache_backend: str = "memory"
+    token_cache_address: tuple[str, int] | None = None
+    token_cache_key: bytes = field(default=b"", repr=False)
+    token_cache_l1_ttl_seconds: int = 5
+    prewarm_targets: tuple[tuple[str, tuple[str, ...]], ...] = ()
+    prewarm_timeout_seconds: int = 30
+    mint_rate_per_second: float = 5.0
+    mint_burst: int = 10
+    circuit_failure_threshold: int = 5
+    circuit_reset_timeout_seconds: int = 30
+    downstream_mode: str = "none"
+    graph_batch_window_ms: int = 0
+    downstream_max_response_bytes: int = 16 * 1024 * 1024
+    response_cache_max_bytes: int = 0
+    response_cache_max_age: tuple[tuple[str, int], ...] = ()
+    delta_state_path: str = ":memory:"
+    upload_source_root: str = ""
+    upload_read_ahead_chunks: int = 4
+    config_reload_path: str = ""
+    worker_threads: int = 8
+    audit_mode: str = "full"
+    audit_expand_failures: bool = True
+    secret_file_root: str = ""
+    secret_connect_url: str = ""
+    admission_max_in_flight: int = 0
+    admission_max_queue: int = 64
+    admission_target_queue_ms: int = 50
+    admission_interval_ms: int = 500
+    admission_fair_key: str = "requester"
+    admission_weights: tuple[tuple[str, int], ...] = ()
+    negative_cache_ttls: tuple[tuple[str, int], ...] = (
+        ("secret.not_found", 30),
+        ("secret.access_denied", 30),
+        ("provider.auth_failed", 30),
+    )
+    negative_cache_max_entries: int = 1024
+    credential_registry_path: str = ""
+    credential_idle_seconds: int = 900
+    redact_audit_paths: tuple[str, ...] = ()
+    redact_response_paths: tuple[str, ...] = ()
+    readiness_interval_seconds: int = 15
+    readiness_stale_seconds: int = 45
+    readiness_status_path: str = ""
+    slo_budgets_ms: tuple[tuple[str, int], ...] = (
+        ("secret", 1500),
+        ("mint", 3000),
+        ("downstream", 4000),
+    )
+    slo_window_seconds: int = 300
+    slo_max_tenants: int = 256
+    idempotency_ttl_seconds: int = 600
+    idempotency_max_entries: int = 10000
+    idempotency_max_bytes: int = 64 * 1024 * 1024
+    idempotency_max_entry_bytes: int = 1024 * 1024
 
     @classmethod
-    def from_env(cls) -> "BrokerConfig":
-        timeout_raw = os.getenv("MCP_AUTH_BROKER_DEFAULT_TIMEOUT_MS", "10000")
+    def from_env(cls, environ: Mapping[str, str] | None = None) -> "BrokerConfig":
+        env = os.environ if environ is None else environ
+        timeout_raw = env.get("MCP_AUTH_BROKER_DEFAULT_TIMEOUT_MS", "10000")
         try:
             timeout_ms = int(timeout_raw)
         except ValueError as exc:
@@ -33,16 +89,30 @@ class BrokerConfig:
         if timeout_ms <= 0:
             raise ValueError("MCP_AUTH_BROKER_DEFAULT_TIMEOUT_MS must be positive")
 
-        scopes_raw = os.getenv("MCP_AUTH_BROKER_ALLOWED_SCOPES", "User.Read")
+        scopes_raw = env.get("MCP_AUTH_BROKER_ALLOWED_SCOPES", "User.Read")
         scopes = tuple(scope.strip() for scope in scopes_raw.split(",") if scope.strip())
         if not scopes:
             raise ValueError("MCP_AUTH_BROKER_ALLOWED_SCOPES must contain at least one scope")
 
-        secret_provider_mode = os.getenv("MCP_AUTH_BROKER_SECRET_PROVIDER", "none")
-        if secret_provider_mode not in {"none", "1password"}:
-            raise ValueError("MCP_AUTH_BROKER_SECRET_PROVIDER must be one of: none, 1password")
+        secret_provider_mode = env.get("MCP_AUTH_BROKER_SECRET_PROVIDER", "none")
+        if secret_provider_mode not in {"none", "1password", "file", "connect"}:
+            raise ValueError(
+                "MCP_AUTH_BROKER_SECRET_PROVIDER must be one of: none, 1password, file, connect"
+            )
+
+        secret_file_root = env.get("MCP_AUTH_BROKER_SECRET_FILE_ROOT", "").strip()
+        if secret_provider_mode == "file" and not secret_file_root:
+            raise ValueError("MCP_AUTH_BROKER_SECRET_FILE_ROOT is required for the file provider")
+
+        secret_connect_url = env.get("MCP_AUTH_BROKER_SECRET_CONNECT_URL", "").strip()
+        if secret_provider_mode == "connect" and not secret_connect_url.startswith(
+            ("http://", "https://")
+        ):
+            raise ValueError(
+                "MCP_AUTH_BROKER_SECRET_CONNECT_URL must be an http(s) URL for the connect provider"
+            )
 
-        secret_reference_raw = os.getenv("MCP_AUTH_BROKER_GRAPH_SECRET_REF", "").strip()
+        secret_reference_raw = env.get("MCP_AUTH_BROKER_GRAPH_SECRET_REF", "").strip()
         secret_reference = None
         if secret_reference_raw:
             try:
@@ -50,9 +120,9 @@ class BrokerConfig:
             except Exception as exc:
                 raise ValueError("MCP_AUTH_BROKER_GRAPH_SECRET_REF is invalid") from exc
 
-        graph_client_id = os.getenv("MCP_AUTH_BROKER_GRAPH_CLIENT_ID", "").strip()
+        graph_client_id = env.get("MCP_AUTH_BROKER_GRAPH_CLIENT_ID", "").strip()
 
-        resources_raw = os.getenv(
+        resources_raw = env.get(
             "MCP_AUTH_BROKER_ALLOWED_GRAPH_RESOURCES", "https://graph.microsoft.com"
         )
         allowed_graph_resources = tuple(
@@ -63,9 +133,9 @@ class BrokerConfig:
                 "MCP_AUTH_BROKER_ALLOWED_GRAPH_RESOURCES must contain at least one value"
             )
 
-        skew_raw = os.getenv("MCP_AUTH_BROKER_TOKEN_CACHE_SKEW_SECONDS", "60")
-        ttl_raw = os.getenv("MCP_AUTH_BROKER_TOKEN_MAX_TTL_SECONDS", "3000")
-        timeout_raw = os.getenv("MCP_AUTH_BROKER_TOKEN_PROVIDER_TIMEOUT_SECONDS", "4")
+        skew_raw = env.get("MCP_AUTH_BROKER_TOKEN_CACHE_SKEW_SECONDS", "60")
+        ttl_raw = env.get("MCP_AUTH_BROKER_TOKEN_MAX_TTL_SECONDS", "3000")
+        timeout_raw = env.get("MCP_AUTH_BROKER_TOKEN_PROVIDER_TIMEOUT_SECONDS", "4")
         try:
             token_cache_skew_seconds = int(skew_raw)
             token_max_ttl_seconds = int(ttl_raw)
@@ -80,11 +150,265 @@ class BrokerConfig:
         if token_provider_timeout_seconds <= 0:
             raise ValueError("MCP_AUTH_BROKER_TOKEN_PROVIDER_TIMEOUT_SECONDS must be positive")
 
+        token_cache_backend = env.get("MCP_AUTH_BROKER_TOKEN_CACHE_BACKEND", "memory")
+        if token_cache_backend not in {"memory", "network"}:
+            raise ValueError("MCP_AUTH_BROKER_TOKEN_CACHE_BACKEND must be one of: memory, network")
+
+        token_cache_address = None
+        token_cache_key = env.get("MCP_AUTH_BROKER_TOKEN_CACHE_KEY", "").encode("utf-8")
+        l1_ttl_raw = env.get("MCP_AUTH_BROKER_TOKEN_CACHE_L1_TTL_SECONDS", "5")
+        try:
+            token_cache_l1_ttl_seconds = int(l1_ttl_raw)
+        except ValueError as exc:
+            raise ValueError(
+                "MCP_AUTH_BROKER_TOKEN_CACHE_L1_TTL_SECONDS must be an integer"
+            ) from exc
+        if token_cache_l1_ttl_seconds < 0:
+            raise ValueError("MCP_AUTH_BROKER_TOKEN_CACHE_L1_TTL_SECONDS cannot be negative")
+
+        if token_cache_backend == "network":
+            address_raw = env.get("MCP_AUTH_BROKER_TOKEN_CACHE_ADDRESS", "").strip()
+            host, _, port_raw = address_raw.rpartition(":")
+            if not host or not port_raw.isdigit():
+                raise ValueError("MCP_AUTH_BROKER_TOKEN_CACHE_ADDRESS must be host:port")
+            token_cache_address = (host, int(port_raw))
+            if len(token_cache_key) < 32:
+                raise ValueError("MCP_AUTH_BROKER_TOKEN_CACHE_KEY must be at least 32 bytes")
+
+        prewarm_targets = _parse_prewarm_targets(env.get("MCP_AUTH_BROKER_PREWARM", ""))
+        prewarm_timeout_raw = env.get("MCP_AUTH_BROKER_PREWARM_TIMEOUT_SECONDS", "30")
+        try:
+            prewarm_timeout_seconds = int(prewarm_timeout_raw)
+        except ValueError as exc:
+            raise ValueError("MCP_AUTH_BROKER_PREWARM_TIMEOUT_SECONDS must be an integer") from exc
+        if prewarm_timeout_seconds <= 0:
+            raise ValueError("MCP_AUTH_BROKER_PREWARM_TIMEOUT_SECONDS must be positive")
+
+        mint_rate_raw = env.get("MCP_AUTH_BROKER_MINT_RATE_PER_SECOND", "5")
+        mint_burst_raw = env.get("MCP_AUTH_BROKER_MINT_BURST", "10")
+        try:
+            mint_rate_per_second = float(mint_rate_raw)
+            mint_burst = int(mint_burst_raw)
+        except ValueError as exc:
+            raise ValueError("Mint rate limiter settings must be numeric") from exc
+        if mint_rate_per_second <= 0:
+            raise ValueError("MCP_AUTH_BROKER_MINT_RATE_PER_SECOND must be positive")
+        if mint_burst < 1:
+            raise ValueError("MCP_AUTH_BROKER_MINT_BURST must be at least 1")
+
+        circuit_threshold_raw = env.get("MCP_AUTH_BROKER_CIRCUIT_FAILURE_THRESHOLD", "5")
+        circuit_reset_raw = env.get("MCP_AUTH_BROKER_CIRCUIT_RESET_TIMEOUT_SECONDS", "30")
+        try:
+            circuit_failure_threshold = int(circuit_threshold_raw)
+            circuit_reset_timeout_seconds = int(circuit_reset_raw)
+        except ValueError as exc:
+            raise ValueError("Circuit breaker settings must be integers") from exc
+        if circuit_failure_threshold < 1:
+            raise ValueError("MCP_AUTH_BROKER_CIRCUIT_FAILURE_THRESHOLD must be at least 1")
+        if circuit_reset_timeout_seconds <= 0:
+            raise ValueError("MCP_AUTH_BROKER_CIRCUIT_RESET_TIMEOUT_SECONDS must be positive")
+
+        downstream_mode = env.get("MCP_AUTH_BROKER_DOWNSTREAM_MODE", "none")
+        if downstream_mode not in {"none", "graph"}:
+            raise ValueError("MCP_AUTH_BROKER_DOWNSTREAM_MODE must be one of: none, graph")
+
+        batch_window_raw = env.get("MCP_AUTH_BROKER_GRAPH_BATCH_WINDOW_MS", "0")
+        try:
+            graph_batch_window_ms = int(batch_window_raw)
+        except ValueError as exc:
+            raise ValueError("MCP_AUTH_BROKER_GRAPH_BATCH_WINDOW_MS must be an integer") from exc
+        if graph_batch_window_ms < 0:
+            raise ValueError("MCP_AUTH_BROKER_GRAPH_BATCH_WINDOW_MS cannot be negative")
+
+        max_response_raw = env.get(
+            "MCP_AUTH_BROKER_DOWNSTREAM_MAX_RESPONSE_BYTES", str(16 * 1024 * 1024)
+        )
+        try:
+            downstream_max_response_bytes = int(max_response_raw)
+        except ValueError as exc:
+            raise ValueError(
+                "MCP_AUTH_BROKER_DOWNSTREAM_MAX_RESPONSE_BYTES must be an integer"
+            ) from exc
+        if downstream_max_response_bytes <= 0:
+            raise ValueError("MCP_AUTH_BROKER_DOWNSTREAM_MAX_RESPONSE_BYTES must be positive")
+
+        cache_bytes_raw = env.get("MCP_AUTH_BROKER_RESPONSE_CACHE_MAX_BYTES", "0")
+        try:
+            response_cache_max_bytes = int(cache_bytes_raw)
+        except ValueError as exc:
+            raise ValueError("MCP_AUTH_BROKER_RESPONSE_CACHE_MAX_BYTES must be an integer") from exc
+        if response_cache_max_bytes < 0:
+            raise ValueError("MCP_AUTH_BROKER_RESPONSE_CACHE_MAX_BYTES cannot be negative")
+
+        read_ahead_raw = env.get("MCP_AUTH_BROKER_UPLOAD_READ_AHEAD_CHUNKS", "4")
+        try:
+            upload_read_ahead_chunks = int(read_ahead_raw)
+        except ValueError as exc:
+            raise ValueError("MCP_AUTH_BROKER_UPLOAD_READ_AHEAD_CHUNKS must be an integer") from exc
+        if upload_read_ahead_chunks <= 0:
+            raise ValueError("MCP_AUTH_BROKER_UPLOAD_READ_AHEAD_CHUNKS must be positive")
+
+        worker_threads_raw = env.get("MCP_AUTH_BROKER_WORKER_THREADS", "8")
+        try:
+            worker_threads = int(worker_threads_raw)
+        except ValueError as exc:
+            raise ValueError("MCP_AUTH_BROKER_WORKER_THREADS must be an integer") from exc
+        if worker_threads <= 0:
+            raise ValueError("MCP_AUTH_BROKER_WORKER_THREADS must be positive")
+
+        try:
+            admission_max_in_flight = int(env.get("MCP_AUTH_BROKER_ADMISSION_MAX_IN_FLIGHT", "0"))
+            admission_max_queue = int(env.get("MCP_AUTH_BROKER_ADMISSION_MAX_QUEUE", "64"))
+            admission_target_queue_ms = int(
+                env.get("MCP_AUTH_BROKER_ADMISSION_TARGET_QUEUE_MS", "50")
+            )
+            admission_interval_ms = int(env.get("MCP_AUTH_BROKER_ADMISSION_INTERVAL_MS", "500"))
+        except ValueError as exc:
+            raise ValueError("Admission control settings must be integers") from exc
+        if admission_max_in_flight < 0:
+            raise ValueError("MCP_AUTH_BROKER_ADMISSION_MAX_IN_FLIGHT cannot be negative")
+        if admission_max_queue < 0:
+            raise ValueError("MCP_AUTH_BROKER_ADMISSION_MAX_QUEUE cannot be negative")
+        if admission_target_queue_ms <= 0 or admission_interval_ms <= 0:
+            raise ValueError("Admission target queue delay and interval must be positive")
+        # submit_tool hands work to a FIFO thread pool before admission, so fair queueing only
+        # orders requests that already hold a worker; leave workers spare for them to wait on.
+        if admission_max_in_flight >= worker_threads:
+            raise ValueError(
+                "MCP_AUTH_BROKER_ADMISSION_MAX_IN_FLIGHT must be below "
+                "MCP_AUTH_BROKER_WORKER_THREADS"
+            )
+
+        admission_fair_key = env.get("MCP_AUTH_BROKER_ADMISSION_FAIR_KEY", "requester")
+        if admission_fair_key not in {"requester", "requester_tenant"}:
+            raise ValueError(
+                "MCP_AUTH_BROKER_ADMISSION_FAIR_KEY must be one of: requester, requester_tenant"
+            )
+        admission_weights = _parse_admission_weights(
+            env.get("MCP_AUTH_BROKER_ADMISSION_WEIGHTS", "")
+        )
+
+        negative_cache_ttls = _parse_negative_cache_ttls(
+            env.get(
+                "MCP_AUTH_BROKER_NEGATIVE_CACHE_TTLS",
+                "secret.not_found=30,secret.access_denied=30,provider.auth_failed=30",
+            )
+        )
+        negative_max_raw = env.get("MCP_AUTH_BROKER_NEGATIVE_CACHE_MAX_ENTRIES", "1024")
+        try:
+            negative_cache_max_entries = int(negative_max_raw)
+        except ValueError as exc:
+            raise ValueError(
+                "MCP_AUTH_BROKER_NEGATIVE_CACHE_MAX_ENTRIES must be an integer"
+            ) from exc
+        if negative_cache_max_entries < 0:
+            raise ValueError("MCP_AUTH_BROKER_NEGATIVE_CACHE_MAX_ENTRIES cannot be negative")
+
+        credential_idle_raw = env.get("MCP_AUTH_BROKER_CREDENTIAL_IDLE_SECONDS", "900")
+        try:
+            credential_idle_seconds = int(credential_idle_raw)
+        except ValueError as exc:
+            raise ValueError("MCP_AUTH_BROKER_CREDENTIAL_IDLE_SECONDS must be an integer") from exc
+        if credential_idle_seconds <= 0:
+            raise ValueError("MCP_AUTH_BROKER_CREDENTIAL_IDLE_SECONDS must be positive")
+
+        readiness_interval_raw = env.get("MCP_AUTH_BROKER_READINESS_INTERVAL_SECONDS", "15")
+        try:
+            readiness_interval_seconds = int(readiness_interval_raw)
+        except ValueError as exc:
+            raise ValueError(
+                "MCP_AUTH_BROKER_READINESS_INTERVAL_SECONDS must be an integer"
+            ) from exc
+        if readiness_interval_seconds < 0:
+            raise ValueError("MCP_AUTH_BROKER_READINESS_INTERVAL_SECONDS cannot be negative")
+
+        readiness_stale_raw = env.get(
+            "MCP_AUTH_BROKER_READINESS_STALE_SECONDS", str(readiness_interval_seconds * 3)
+        )
+        try:
+            readiness_stale_seconds = int(readiness_stale_raw)
+        except ValueError as exc:
+            raise ValueError("MCP_AUTH_BROKER_READINESS_STALE_SECONDS must be an integer") from exc
+        if readiness_interval_seconds and readiness_stale_seconds <= readiness_interval_seconds:
+            raise ValueError(
+                "MCP_AUTH_BROKER_READINESS_STALE_SECONDS must exceed the probe interval"
+            )
+
+        slo_budgets_ms = _parse_slo_budgets(
+            env.get("MCP_AUTH_BROKER_SLO_BUDGETS_MS", "secret=1500,mint=3000,downstream=4000")
+        )
+
+        slo_window_raw = env.get("MCP_AUTH_BROKER_SLO_WINDOW_SECONDS", "300")
+        try:
+            slo_window_seconds = int(slo_window_raw)
+        except ValueError as exc:
+            raise ValueError("MCP_AUTH_BROKER_SLO_WINDOW_SECONDS must be an integer") from exc
+        if slo_window_seconds < 0:
+            raise ValueError("MCP_AUTH_BROKER_SLO_WINDOW_SECONDS cannot be negative")
+
+        slo_max_tenants_raw = env.get("MCP_AUTH_BROKER_SLO_MAX_TENANTS", "256")
+        try:
+            slo_max_tenants = int(slo_max_tenants_raw)
+        except ValueError as exc:
+            raise ValueError("MCP_AUTH_BROKER_SLO_MAX_TENANTS must be an integer") from exc
+        if slo_max_tenants < 0:
+            raise ValueError("MCP_AUTH_BROKER_SLO_MAX_TENANTS cannot be negative")
+
+        idempotency_ttl_raw = env.get("MCP_AUTH_BROKER_IDEMPOTENCY_TTL_SECONDS", "600")
+        try:
+            idempotency_ttl_seconds = int(idempotency_ttl_raw)
+        except ValueError as exc:
+            raise ValueError("MCP_AUTH_BROKER_IDEMPOTENCY_TTL_SECONDS must be an integer") from exc
+        if idempotency_ttl_seconds < 0:
+            raise ValueError("MCP_AUTH_BROKER_IDEMPOTENCY_TTL_SECONDS cannot be negative")
+
+        idempotency_max_raw = env.get("MCP_AUTH_BROKER_IDEMPOTENCY_MAX_ENTRIES", "10000")
+        try:
+            idempotency_max_entries = int(idempotency_max_raw)
+        except ValueError as exc:
+            raise ValueError("MCP_AUTH_BROKER_IDEMPOTENCY_MAX_ENTRIES must be an integer") from exc
+        if idempotency_max_entries < 0:
+            raise ValueError("MCP_AUTH_BROKER_IDEMPOTENCY_MAX_ENTRIES cannot be negative")
+
+        idempotency_bytes_raw = env.get(
+            "MCP_AUTH_BROKER_IDEMPOTENCY_MAX_BYTES", str(64 * 1024 * 1024)
+        )
+        try:
+            idempotency_max_bytes = int(idempotency_bytes_raw)
+        except ValueError as exc:
+            raise ValueError("MCP_AUTH_BROKER_IDEMPOTENCY_MAX_BYTES must be an integer") from exc
+        if idempotency_max_bytes < 0:
+            raise ValueError("MCP_AUTH_BROKER_IDEMPOTENCY_MAX_BYTES cannot be negative")
+
+        idempotency_entry_bytes_raw = env.get(
+            "MCP_AUTH_BROKER_IDEMPOTENCY_MAX_ENTRY_BYTES", str(1024 * 1024)
+        )
+        try:
+            idempotency_max_entry_bytes = int(idempotency_entry_bytes_raw)
+        except ValueError as exc:
+            raise ValueError(
+                "MCP_AUTH_BROKER_IDEMPOTENCY_MAX_ENTRY_BYTES must be an integer"
+            ) from exc
+        if idempotency_max_entry_bytes < 0:
+            raise ValueError("MCP_AUTH_BROKER_IDEMPOTENCY_MAX_ENTRY_BYTES cannot be negative")
+
+        audit_mode = env.get("MCP_AUTH_BROKER_AUDIT_MODE", "full")
+        if audit_mode not in {"full", "compact"}:
+            raise ValueError("MCP_AUTH_BROKER_AUDIT_MODE must be one of: full, compact")
+
+        expand_failures_raw = env.get("MCP_AUTH_BROKER_AUDIT_EXPAND_FAILURES", "true")
+        if expand_failures_raw not in {"true", "false"}:
+            raise ValueError("MCP_AUTH_BROKER_AUDIT_EXPAND_FAILURES must be one of: true, false")
+
+        response_cache_max_age = _parse_max_age_prefixes(
+            env.get("MCP_AUTH_BROKER_RESPONSE_CACHE_MAX_AGE", "")
+        )
+
         return cls(
-            environment=os.getenv("MCP_AUTH_BROKER_ENV", "dev"),
-            service_name=os.getenv("MCP_AUTH_BROKER_SERVICE_NAME", "mcp-auth-broker"),
-            contract_version=os.getenv("MCP_AUTH_BROKER_CONTRACT_VERSION", "v0.1.0"),
-            policy_version=os.getenv("MCP_AUTH_BROKER_POLICY_VERSION", "v0.1.0"),
+            environment=env.get("MCP_AUTH_BROKER_ENV", "dev"),
+            service_name=env.get("MCP_AUTH_BROKER_SERVICE_NAME", "mcp-auth-broker"),
+            contract_version=env.get("MCP_AUTH_BROKER_CONTRACT_VERSION", "v0.1.0"),
+            policy_version=env.get("MCP_AUTH_BROKER_POLICY_VERSION", "v0.1.0"),
             default_timeout_ms=timeout_ms,
             allowed_scopes=scopes,
             secret_provider_mode=secret_provider_mode,
@@ -94,4 +418,148 @@ class BrokerConfig:
             token_cache_skew_seconds=token_cache_skew_seconds,
             token_max_ttl_seconds=token_max_ttl_seconds,
             token_provider_timeout_seconds=token_provider_timeout_seconds,
+            token_cache_backend=token_cache_backend,
+            token_cache_address=token_cache_address,
+            token_cache_key=token_cache_key,
+            token_cache_l1_ttl_seconds=token_cache_l1_ttl_seconds,
+            prewarm_targets=prewarm_targets,
+            prewarm_timeout_seconds=prewarm_timeout_seconds,
+            mint_rate_per_second=mint_rate_per_second,
+            mint_burst=mint_burst,
+            circuit_failure_threshold=circuit_failure_threshold,
+            circuit_reset_timeout_seconds=circuit_reset_timeout_seconds,
+            downstream_mode=downstream_mode,
+            graph_batch_window_ms=graph_batch_window_ms,
+            downstream_max_response_bytes=downstream_max_response_bytes,
+            response_cache_max_bytes=response_cache_max_bytes,
+            response_cache_max_age=response_cache_max_age,
+            delta_state_path=env.get("MCP_AUTH_BROKER_DELTA_STATE_PATH", ":memory:"),
+            upload_source_root=env.get("MCP_AUTH_BROKER_UPLOAD_SOURCE_ROOT", ""),
+            config_reload_path=env.get("MCP_AUTH_BROKER_CONFIG_RELOAD_PATH", ""),
+            worker_threads=worker_threads,
+            audit_mode=audit_mode,
+            audit_expand_failures=expand_failures_raw == "true",
+            secret_file_root=secret_file_root,
+            secret_connect_url=secret_connect_url,
+            admission_max_in_flight=admission_max_in_flight,
+            admission_max_queue=admission_max_queue,
+            admission_target_queue_ms=admission_target_queue_ms,
+            admission_interval_ms=admission_interval_ms,
+            admission_fair_key=admission_fair_key,
+            admission_weights=admission_weights,
+            negative_cache_ttls=negative_cache_ttls,
+            negative_cache_max_entries=negative_cache_max_entries,
+            credential_registry_path=env.get("MCP_AUTH_BROKER_CREDENTIAL_REGISTRY", "").strip(),
+            credential_idle_seconds=credential_idle_seconds,
+            redact_audit_paths=_split_paths(env.get("MCP_AUTH_BROKER_REDACT_AUDIT_PATHS", "")),
+            redact_response_paths=_split_paths(
+                env.get("MCP_AUTH_BROKER_REDACT_RESPONSE_PATHS", "")
+            ),
+            upload_read_ahead_chunks=upload_read_ahead_chunks,
+            readiness_interval_seconds=readiness_interval_seconds,
+            readiness_stale_seconds=readiness_stale_seconds,
+            readiness_status_path=env.get("MCP_AUTH_BROKER_READINESS_STATUS_PATH", "").strip(),
+            slo_budgets_ms=slo_budgets_ms,
+            slo_window_seconds=slo_window_seconds,
+            slo_max_tenants=slo_max_tenants,
+            idempotency_ttl_seconds=idempotency_ttl_seconds,
+            idempotency_max_entries=idempotency_max_entries,
+            idempotency_max_bytes=idempotency_max_bytes,
+            idempotency_max_entry_bytes=idempotency_max_entry_bytes,
         )
+
+
+def _parse_prewarm_targets(raw: str) -> tuple[tuple[str, tuple[str, ...]], ...]:
+    # Format: "<tenant>:<scope>,<scope>;<tenant>:<scope>"
+    targets = []
+    for entry in raw.split(";"):
+        if not entry.strip():
+            continue
+        tenant_id, separator, scopes_raw = entry.partition(":")
+        scopes = tuple(scope.strip() for scope in scopes_raw.split(",") if scope.strip())
+        if not separator or not tenant_id.strip() or not scopes:
+            raise ValueError("MCP_AUTH_BROKER_PREWARM entries must follow <tenant>:<scope>,...")
+        targets.append((tenant_id.strip(), scopes))
+    return tuple(targets)
+
+
+def _parse_max_age_prefixes(raw: str) -> tuple[tuple[str, int], ...]:
+    # Format: "/v1.0/me=60,/v1.0/groups=300"
+    prefixes = []
+    for entry in raw.split(","):
+        if not entry.strip():
+            continue
+        prefix, separator, seconds_raw = entry.strip().rpartition("=")
+        if not separator or not prefix.startswith("/") or not seconds_raw.isdigit():
+            raise ValueError(
+                "MCP_AUTH_BROKER_RESPONSE_CACHE_MAX_AGE entries must follow /<path-prefix>=<seconds>"
+            )
+        prefixes.append((prefix, int(seconds_raw)))
+    return tuple(prefixes)
+
+
+def _parse_admission_weights(raw: str) -> tuple[tuple[str, int], ...]:
+    # Format: "agent-a=4,agent-b=2"; unlisted requesters have weight 1.
+    weights = []
+    for entry in raw.split(","):
+        if not entry.strip():
+            continue
+        requester_id, separator, weight_raw = entry.strip().rpartition("=")
+        if not separator or not requester_id or not weight_raw.isdigit() or int(weight_raw) < 1:
+            raise ValueError(
+                "MCP_AUTH_BROKER_ADMISSION_WEIGHTS entries must follow <requester_id>=<weight>"
+            )
+        weights.append((requester_id, int(weight_raw)))
+    return tuple(weights)
+
+
+def _parse_negative_cache_ttls(raw: str) -> tuple[tuple[str, int], ...]:
+    # Format: "secret.not_found=30,provider.auth_failed=60"; an empty value disables caching.
+    ttls = []
+    for entry in raw.split(","):
+        if not entry.strip():
+            continue
+        code, separator, seconds_raw = entry.strip().rpartition("=")
+        if not separator or "." not in code or not seconds_raw.isdigit():
+            raise ValueError(
+                "MCP_AUTH_BROKER_NEGATIVE_CACHE_TTLS entries must follow <error_code>=<seconds>"
+            )
+        ttls.append((code, int(seconds_raw)))
+    return tuple(ttls)
+
+
+def _parse_slo_budgets(raw: str) -> tuple[tuple[str, int], ...]:
+    # Format: "secret=1500,mint=3000,downstream=4000"; omitted stages are not tracked.
+    budgets = []
+    for entry in raw.split(","):
+        if not entry.strip():
+            continue
+        stage, separator, budget_raw = entry.strip().partition("=")
+        if not separator or stage not in {"secret", "mint", "downstream"}:
+            raise ValueError(
+                "MCP_AUTH_BROKER_SLO_BUDGETS_MS entries must follow "
+                "<secret|mint|downstream>=<milliseconds>"
+            )
+        if not budget_raw.isdigit() or int(budget_raw) <= 0:
+            raise ValueError("MCP_AUTH_BROKER_SLO_BUDGETS_MS budgets must be positive integers")
+        budgets.append((stage, int(budget_raw)))
+    return tuple(budgets)
+
+
+def _split_paths(raw: str) -> tuple[str, ...]:
+    return tuple(path.strip() for path in raw.split(",") if path.strip())
+
+
+def read_env_file(path: str) -> dict[str, str]:
+    """Parse ``KEY=VALUE`` lines; blank lines and ``#`` comments are ignored."""
+    values: dict[str, str] = {}
+    with open(path, encoding="utf-8") as handle:
+        for number, line in enumerate(handle, start=1):
+            stripped = line.strip()
+            if not stripped or stripped.startswith("#"):
+                continue
+            name, separator, value = stripped.partition("=")
+            if not separator or not name.strip():
+                raise ValueError(f"{path}:{number} must be KEY=VALUE")
+            values[name.strip()] = value.strip()
+    return values
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass
+
+from .graph_tokens import GraphTokenProvider, GraphTokenProviderError, TokenResult
+from .secrets import SecretProviderError, SecretReference
+
+WILDCARD_TENANT = "*"
+
+
+@dataclass(frozen=True, slots=True)
+class Credential:
+    client_id: str
+    secret_reference: SecretReference
+
+
+class CredentialRegistry:
+    """Maps tenant IDs to the app registration used to mint their tokens.
+
+    Lookups hit a dict index by exact tenant ID; the ``*`` entry, when present, is the
+    default for every other tenant.
+    """
+
+    def __init__(self, entries: Mapping[str, Credential]) -> None:
+        self._entries = dict(entries)
+        self._default = self._entries.pop(WILDCARD_TENANT, None)
+
+    def __len__(self) -> int:
+        return len(self._entries) + (self._default is not None)
+
+    def resolve(self, tenant_id: str) -> Credential | None:
+        return self._entries.get(tenant_id, self._default)
+
+    @classmethod
+    def from_file(cls, path: str) -> CredentialRegistry:
+        """Load ``{"<tenant-id>|*": {"client_id": "...", "secret_ref": "op://..."}}``."""
+        with open(path, encoding="utf-8") as handle:
+            try:
+                raw = json.load(handle)
+            except ValueError as exc:
+                raise ValueError(f"{path} must contain a JSON object") from exc
+        if not isinstance(raw, dict) or not raw:
+            raise ValueError(f"{path} must map tenant IDs to credentials")
+
+        entries = {}
+        for tenant_id, entry in raw.items():
+            client_id = entry.get("client_id") if isinstance(entry, dict) else None
+            secret_ref = entry.get("secret_ref") if isinstance(entry, dict) else None
+            if not isinstance(client_id, str) or not client_id.strip():
+                raise ValueError(f"{path}: {tenant_id} needs a client_id")
+            try:
+                reference = SecretReference.parse(str(secret_ref or ""))
+            except SecretProviderError as exc:
+                raise ValueError(f"{path}: {tenant_id} has an invalid secret_ref") from exc
+            entries[tenant_id] = Credential(client_id=client_id.strip(), secret_reference=reference)
+        return cls(entries)
+
+
+class TokenProviderPool:
+    """Routes ``get_token`` calls to one ``GraphTokenProvider`` per registered credential.
+
+    Providers, and with them their token caches, are created on first use for a credential
+    and closed and dropped after ``idle_seconds`` without requests. Tenants with no
+    registered credential are denied with ``policy.denied``.
+    """
+
+    def __init__(
+        self,
+        *,
+        registry: CredentialRegistry,
+        factory: Callable[[Credential], GraphTokenProvider],
+        idle_seconds: float = 900,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.registry = registry
+        self.factory = factory
+        self.idle_seconds = idle_seconds
+        self._clock = clock
+        self._providers: dict[Credential, tuple[GraphTokenProvider, float]] = {}
+        self._lock = threading.Lock()
+        self._swept_at = clock()
+
+    def __len__(self) -> int:
+        return len(self._providers)
+
+    def provider_for(self, tenant_id: str) -> GraphTokenProvider:
+        credential = self.registry.resolve(tenant_id)
+        if credential is None:
+            raise GraphTokenProviderError("policy.denied", "no credential is configured for tenant")
+        now = self._clock()
+        evicted: list[GraphTokenProvider] = []
+        with self._lock:
+            entry = self._providers.get(credential)
+            provider = entry[0] if entry is not None else self.factory(credential)
+            self._providers[credential] = (provider, now)
+            if now - self._swept_at >= self.idle_seconds:
+                evicted = self._evict_idle(now)
+        _close_all(evicted)
+        return provider
+
+    def get_token(
+        self,
+        *,
+        tenant_id: str,
+        resource: str,
+        scopes: list[str],
+        force_refresh: bool = False,
+        now_epoch: float | None = None,
+    ) -> TokenResult:
+        return self.provider_for(tenant_id).get_token(
+            tenant_id=tenant_id,
+            resource=resource,
+            scopes=scopes,
+            force_refresh=force_refresh,
+            now_epoch=now_epoch,
+        )
+
+    def update_allowlists(
+        self, *, allowed_resources: tuple[str, ...], allowed_scopes: tuple[str, ...]
+    ) -> int:
+        with self._lock:
+            providers = [provider for provider, _ in self._providers.values()]
+        return sum(
+            provider.update_allowlists(
+                allowed_resources=allowed_resources, allowed_scopes=allowed_scopes
+            )
+            for provider in providers
+        )
+
+    def evict_idle(self) -> int:
+        with self._lock:
+            evicted = self._evict_idle(self._clock())
+        _close_all(evicted)
+        return len(evicted)
+
+    def _evict_idle(self, now: float) -> list[GraphTokenProvider]:
+        idle = [
+            credential
+            for credential, (_, last_used) in self._providers.items()
+            if now - last_used >= self.idle_seconds
+        ]
+        self._swept_at = now
+        return [self._providers.pop(credential)[0] for credential in idle]
+
+
+def _close_all(providers: list[GraphTokenProvider]) -> None:
+    # Closing may touch the network, so it happens after the pool lock is released.
+    for provider in providers:
+        provider.close()
@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, replace
+from typing import Any
+
+from .downstream import GraphDownstreamClient, GraphRequest
+from .pagination import PageStream
+
+DELTA_LINK = "@odata.deltaLink"
+
+
+@dataclass(frozen=True)
+class DeltaSyncState:
+    tenant_id: str
+    requester_id: str
+    resource_path: str
+    resume_link: str
+    complete: bool
+    updated_at_epoch: float
+    sync_count: int
+
+
+@dataclass(frozen=True)
+class DeltaResult:
+    items: list[Any]
+    http_status: int
+    provider_request_id: str
+    summary: dict[str, Any]
+
+
+class DeltaStateStore:
+    """SQLite-backed store of Graph delta resume links keyed by tenant, requester and path."""
+
+    def __init__(self, path: str = ":memory:") -> None:
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._connection:
+            self._connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS delta_state (
+                    tenant_id TEXT NOT NULL,
+                    requester_id TEXT NOT NULL,
+                    resource_path TEXT NOT NULL,
+                    resume_link TEXT NOT NULL,
+                    complete INTEGER NOT NULL,
+                    updated_at_epoch REAL NOT NULL,
+                    sync_count INTEGER NOT NULL,
+                    PRIMARY KEY (tenant_id, requester_id, resource_path)
+                )
+                """
+            )
+
+    def get(self, tenant_id: str, requester_id: str, resource_path: str) -> DeltaSyncState | None:
+        rows = self._select(
+            "WHERE tenant_id = ? AND requester_id = ? AND resource_path = ?",
+            (tenant_id, requester_id, resource_path),
+        )
+        return rows[0] if rows else None
+
+    def put(
+        self,
+        *,
+        tenant_id: str,
+        requester_id: str,
+        resource_path: str,
+        resume_link: str,
+        complete: bool,
+        now_epoch: float | None = None,
+    ) -> None:
+        now = now_epoch if now_epoch is not None else time.time()
+        with self._lock, self._connection:
+            self._connection.execute(
+                """
+                INSERT INTO delta_state VALUES (?, ?, ?, ?, ?, ?, 1)
+                ON CONFLICT (tenant_id, requester_id, resource_path) DO UPDATE SET
+                    resume_link = excluded.resume_link,
+                    complete = excluded.complete,
+                    updated_at_epoch = excluded.updated_at_epoch,
+                    sync_count = sync_count + 1
+                """,
+                (tenant_id, requester_id, resource_path, resume_link, int(complete), now),
+            )
+
+    def states(
+        self, *, tenant_id: str | None = None, requester_id: str | None = None
+    ) -> list[DeltaSyncState]:
+        clauses, params = _filters(tenant_id, requester_id, None)
+        return self._select(clauses, params)
+
+    def reset(
+        self,
+        *,
+        tenant_id: str | None = None,
+        requester_id: str | None = None,
+        resource_path: str | None = None,
+    ) -> int:
+        clauses, params = _filters(tenant_id, requester_id, resource_path)
+        with self._lock, self._connection:
+            cursor = self._connection.execute(f"DELETE FROM delta_state {clauses}", params)
+            return cursor.rowcount
+
+    def _select(self, clauses: str, params: tuple[Any, ...]) -> list[DeltaSyncState]:
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT tenant_id, requester_id, resource_path, resume_link, complete, "
+                f"updated_at_epoch, sync_count FROM delta_state {clauses} "
+                "ORDER BY tenant_id, requester_id, resource_path",
+                params,
+            ).fetchall()
+        return [
+            DeltaSyncState(
+                tenant_id=row[0],
+                requester_id=row[1],
+                resource_path=row[2],
+                resume_link=row[3],
+                complete=bool(row[4]),
+                updated_at_epoch=row[5],
+                sync_count=row[6],
+            )
+            for row in rows
+        ]
+
+
+def run_delta_query(
+    client: GraphDownstreamClient,
+    store: DeltaStateStore,
+    request: GraphRequest,
+    *,
+    max_pages: int,
+    max_items: int,
+) -> DeltaResult:
+    """Fetch changes since the stored resume link and persist the new one.
+
+    A first call performs the full initial round. If Graph rejects a stored
+    link as expired (HTTP 410) the state is reset and a full round is run.
+    """
+    state = store.get(request.tenant_id, request.requester_id, request.path)
+    result = _delta_round(client, store, request, state, max_pages=max_pages, max_items=max_items)
+    if result is None:
+        store.reset(
+            tenant_id=request.tenant_id,
+            requester_id=request.requester_id,
+            resource_path=request.path,
+        )
+        result = _delta_round(
+            client, store, request, None, max_pages=max_pages, max_items=max_items
+        )
+        result.summary["resynced"] = True
+    return result
+
+
+def _delta_round(
+    client: GraphDownstreamClient,
+    store: DeltaStateStore,
+    request: GraphRequest,
+    state: DeltaSyncState | None,
+    *,
+    max_pages: int,
+    max_items: int,
+) -> DeltaResult | None:
+    first_request = request if state is None else replace(request, path=state.resume_link)
+    stream = PageStream(
+        client, first_request, max_pages=max_pages, max_items=max_items, trim_items=False
+    )
+    items: list[Any] = []
+    delta_link = None
+    http_status = 200
+    provider_request_id = ""
+    for page in stream:
+        http_status = page.status
+        provider_request_id = provider_request_id or page.provider_request_id
+        if page.status == 410 and state is not None:
+            return None
+        if isinstance(page.body, dict):
+            items.extend(page.body.get("value") or [])
+            delta_link = page.body.get(DELTA_LINK) or delta_link
+
+    # Resume from the delta link after a full round, or from the next page if we stopped early.
+    resume_link = stream.next_link if stream.truncated else delta_link
+    if http_status == 200 and resume_link:
+        store.put(
+            tenant_id=request.tenant_id,
+            requester_id=request.requester_id,
+            resource_path=request.path,
+            resume_link=resume_link,
+            complete=not stream.truncated,
+        )
+    return DeltaResult(
+        items=items,
+        http_status=http_status,
+        provider_request_id=provider_request_id,
+        summary={
+            "mode": "initial" if state is None or not state.complete else "incremental",
+            "changes": len(items),
+            "complete": not stream.truncated,
+        },
+    )
+
+
+def _filters(
+    tenant_id: str | None, requester_id: str | None, resource_path: str | None
+) -> tuple[str, tuple[str, ...]]:
+    clauses = []
+    params = []
+    for column, value in (
+        ("tenant_id", tenant_id),
+        ("requester_id", requester_id),
+        ("resource_path", resource_path),
+    ):
+        if value is not None:
+            clauses.append(f"{column} = ?")
+            params.append(value)
+    return ("WHERE " + " AND ".join(clauses) if clauses else ""), tuple(params)
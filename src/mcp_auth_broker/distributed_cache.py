@@ -0,0 +1,267 @@
+from __future__ import annotations
+
+import base64
+import hashlib
+import hmac
+import json
+import os
+import socket
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import replace
+
+from .graph_tokens import CacheKey, TokenRecord, build_token_record
+
+
+class TokenCacheCipherError(Exception):
+    pass
+
+
+class TokenCacheCipher:
+    """Authenticated encryption for cached token values using only the standard library.
+
+    Values are encrypted with an HMAC-SHA256 keystream and sealed with an
+    encrypt-then-MAC tag, so the shared store only ever holds opaque bytes. The tag also
+    covers ``associated_data``, so a value only opens under the context it was sealed for.
+    """
+
+    _NONCE_BYTES = 16
+    _TAG_BYTES = 32
+
+    def __init__(self, key: bytes) -> None:
+        if len(key) < 32:
+            raise ValueError("token cache key must be at least 32 bytes")
+        self._enc_key = hmac.new(key, b"mcp-auth-broker/enc", hashlib.sha256).digest()
+        self._mac_key = hmac.new(key, b"mcp-auth-broker/mac", hashlib.sha256).digest()
+
+    def encrypt(self, plaintext: bytes, associated_data: bytes = b"") -> bytes:
+        nonce = os.urandom(self._NONCE_BYTES)
+        ciphertext = _xor(plaintext, self._keystream(nonce, len(plaintext)))
+        return nonce + ciphertext + self._tag(nonce, ciphertext, associated_data)
+
+    def decrypt(self, sealed: bytes, associated_data: bytes = b"") -> bytes:
+        if len(sealed) < self._NONCE_BYTES + self._TAG_BYTES:
+            raise TokenCacheCipherError("sealed value is truncated")
+        nonce = sealed[: self._NONCE_BYTES]
+        ciphertext = sealed[self._NONCE_BYTES : -self._TAG_BYTES]
+        tag = sealed[-self._TAG_BYTES :]
+        expected = self._tag(nonce, ciphertext, associated_data)
+        if not hmac.compare_digest(tag, expected):
+            raise TokenCacheCipherError("sealed value failed authentication")
+        return _xor(ciphertext, self._keystream(nonce, len(ciphertext)))
+
+    def _tag(self, nonce: bytes, ciphertext: bytes, associated_data: bytes) -> bytes:
+        # Length-prefix the associated data so it can never run into the nonce.
+        material = len(associated_data).to_bytes(8, "big") + associated_data + nonce + ciphertext
+        return hmac.new(self._mac_key, material, hashlib.sha256).digest()
+
+    def _keystream(self, nonce: bytes, length: int) -> bytes:
+        blocks = []
+        for counter in range((length + 31) // 32):
+            block_input = nonce + counter.to_bytes(8, "big")
+            blocks.append(hmac.new(self._enc_key, block_input, hashlib.sha256).digest())
+        return b"".join(blocks)[:length]
+
+
+class NetworkTokenCacheBackend:
+    """Token cache shared by broker nodes through a line-oriented key-value store.
+
+    Wire protocol (one request and one reply line per command, values base64):
+
+    - ``GET <key>`` -> ``VALUE <b64>`` | ``MISS``
+    - ``SET <key> <ttl_ms> <b64>`` -> ``OK``
+    - ``SETNX <key> <ttl_ms> <b64>`` -> ``OK`` | ``EXISTS``
+    - ``DELEQ <key> <b64>`` -> ``OK`` | ``MISS``
+
+    Store failures degrade to local behavior: reads miss, writes are skipped and
+    leases are granted so a store outage never blocks minting. Sealed values are bound to
+    their store key, so a value copied under another key fails to open and reads as a
+    miss. The per-node L1 holds at most ``l1_max_entries`` records, oldest out first.
+    """
+
+    def __init__(
+        self,
+        *,
+        host: str,
+        port: int,
+        key: bytes,
+        namespace: str = "mcp-auth-broker",
+        l1_ttl_seconds: float = 5.0,
+        timeout_seconds: float = 1.0,
+        l1_max_entries: int = 10_000,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.namespace = namespace
+        self.l1_ttl_seconds = l1_ttl_seconds
+        self.timeout_seconds = timeout_seconds
+        self.l1_max_entries = l1_max_entries
+        self._cipher = TokenCacheCipher(key)
+        self._node_id = base64.b64encode(os.urandom(12)).decode("ascii")
+        self._l1: OrderedDict[CacheKey, tuple[TokenRecord, float]] = OrderedDict()
+        self._l1_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._socket: socket.socket | None = None
+        self._reader = None
+
+    def get_valid(
+        self,
+        *,
+        key: CacheKey,
+        now_epoch: float,
+        skew_seconds: int,
+    ) -> TokenRecord | None:
+        record = self._l1_get(key)
+        if record is None:
+            record = self._remote_get(key)
+            if record is not None:
+                self._l1_put(key, record)
+        if record is None:
+            return None
+        if record.expires_at_epoch <= now_epoch + skew_seconds:
+            return None
+        return record
+
+    def put(
+        self,
+        *,
+        key: CacheKey,
+        access_token: str,
+        token_type: str,
+        expires_in_seconds: int,
+        now_epoch: float,
+        max_ttl_seconds: int,
+    ) -> TokenRecord:
+        record = build_token_record(
+            access_token=access_token,
+            token_type=token_type,
+            expires_in_seconds=expires_in_seconds,
+            now_epoch=now_epoch,
+            max_ttl_seconds=max_ttl_seconds,
+        )
+        self._l1_put(key, replace(record, source="cache"))
+        ttl_ms = max(1, int((record.expires_at_epoch - now_epoch) * 1000))
+        store_key = self._store_key("token", key)
+        self._command(f"SET {store_key} {ttl_ms} {self._seal(record, store_key)}")
+        return record
+
+    def acquire_mint_lease(self, *, key: CacheKey, lease_seconds: float) -> bool:
+        ttl_ms = max(1, int(lease_seconds * 1000))
+        reply = self._command(f"SETNX {self._store_key('lease', key)} {ttl_ms} {self._owner()}")
+        return reply != "EXISTS"
+
+    def release_mint_lease(self, *, key: CacheKey) -> None:
+        self._command(f"DELEQ {self._store_key('lease', key)} {self._owner()}")
+
+    def invalidate(self, predicate: Callable[[CacheKey], bool]) -> int:
+        # Only the local L1 is pruned: store entries are shared with nodes whose allowlists
+        # may differ, and the provider's allowlist check runs before any cache lookup.
+        with self._l1_lock:
+            doomed = [key for key in self._l1 if predicate(key)]
+            for key in doomed:
+                del self._l1[key]
+        return len(doomed)
+
+    def ping(self) -> bool:
+        """Return whether the store answers a round trip."""
+        return self._command(f"GET {self.namespace}:ping") is not None
+
+    def close(self) -> None:
+        with self._lock:
+            self._disconnect()
+
+    def _l1_get(self, key: CacheKey) -> TokenRecord | None:
+        with self._l1_lock:
+            entry = self._l1.get(key)
+            if entry is None:
+                return None
+            record, l1_expires_at = entry
+            if l1_expires_at <= time.monotonic():
+                del self._l1[key]
+                return None
+            return record
+
+    def _l1_put(self, key: CacheKey, record: TokenRecord) -> None:
+        with self._l1_lock:
+            self._l1[key] = (record, time.monotonic() + self.l1_ttl_seconds)
+            self._l1.move_to_end(key)
+            while len(self._l1) > self.l1_max_entries:
+                self._l1.popitem(last=False)
+
+    def _remote_get(self, key: CacheKey) -> TokenRecord | None:
+        store_key = self._store_key("token", key)
+        reply = self._command(f"GET {store_key}")
+        if reply is None or not reply.startswith("VALUE "):
+            return None
+        try:
+            return self._unseal(reply[len("VALUE ") :], store_key)
+        except (TokenCacheCipherError, ValueError, KeyError, TypeError):
+            return None
+
+    def _seal(self, record: TokenRecord, store_key: str) -> str:
+        plaintext = json.dumps(
+            {
+                "access_token": record.access_token,
+                "token_type": record.token_type,
+                "expires_at_epoch": record.expires_at_epoch,
+            },
+            sort_keys=True,
+        ).encode("utf-8")
+        sealed = self._cipher.encrypt(plaintext, store_key.encode("ascii"))
+        return base64.b64encode(sealed).decode("ascii")
+
+    def _unseal(self, value: str, store_key: str) -> TokenRecord:
+        opened = self._cipher.decrypt(
+            base64.b64decode(value, validate=True), store_key.encode("ascii")
+        )
+        payload = json.loads(opened)
+        return TokenRecord(
+            access_token=str(payload["access_token"]),
+            token_type=str(payload["token_type"]),
+            expires_at_epoch=float(payload["expires_at_epoch"]),
+            source="cache",
+        )
+
+    def _owner(self) -> str:
+        return base64.b64encode(self._node_id.encode("ascii")).decode("ascii")
+
+    def _store_key(self, kind: str, key: CacheKey) -> str:
+        # Hash the key so tenant IDs and scopes never appear in the shared store.
+        tenant_id, client_id, scopes = key
+        material = "\x00".join([tenant_id, client_id, *scopes]).encode("utf-8")
+        return f"{self.namespace}:{kind}:{hashlib.sha256(material).hexdigest()}"
+
+    def _command(self, line: str) -> str | None:
+        with self._lock:
+            for _attempt in range(2):
+                try:
+                    if self._socket is None:
+                        self._connect()
+                    self._socket.sendall(line.encode("ascii") + b"\n")
+                    reply = self._reader.readline()
+                    if not reply:
+                        raise ConnectionError("token cache store closed the connection")
+                    return reply.decode("ascii").strip()
+                except OSError:
+                    self._disconnect()
+            return None
+
+    def _connect(self) -> None:
+        self._socket = socket.create_connection(
+            (self.host, self.port), timeout=self.timeout_seconds
+        )
+        self._reader = self._socket.makefile("rb")
+
+    def _disconnect(self) -> None:
+        if self._reader is not None:
+            self._reader.close()
+        if self._socket is not None:
+            self._socket.close()
+        self._socket = None
+        self._reader = None
+
+
+def _xor(left: bytes, right: bytes) -> bytes:
+    return bytes(a ^ b for a, b in zip(left, right))
@@ -0,0 +1,244 @@
+from __future__ import annotations
+
+import json
+import urllib.error
+import urllib.request
+import zlib
+from dataclasses import dataclass, field
+from typing import Any, BinaryIO, Protocol
+from uuid import uuid4
+
+from .metrics import MetricsRegistry
+
+ALLOWED_FORWARD_HEADERS = frozenset(
+    {"accept", "content-type", "if-match", "prefer", "consistency-level"}
+)
+BLOCKED_HEADERS = frozenset(
+    {"authorization", "proxy-authorization", "cookie", "set-cookie", "x-api-key"}
+)
+# Response headers surfaced to callers; everything else is dropped by default.
+RESPONSE_HEADER_ALLOWLIST = frozenset(
+    {"content-type", "etag", "location", "request-id", "retry-after", "preference-applied"}
+)
+DOWNSTREAM_TIMEOUT_MS = 4000
+DEFAULT_MAX_RESPONSE_BYTES = 16 * 1024 * 1024
+ACCEPT_ENCODING = "gzip, deflate"
+_READ_CHUNK_BYTES = 64 * 1024
+# 32 + MAX_WBITS lets zlib detect either a gzip or a zlib header.
+_AUTO_HEADER_WBITS = 32 + zlib.MAX_WBITS
+
+
+class GraphDownstreamError(Exception):
+    def __init__(
+        self, code: str, message: str, *, retry_after_seconds: float | None = None
+    ) -> None:
+        super().__init__(message)
+        self.code = code
+        self.message = message
+        self.retry_after_seconds = retry_after_seconds
+
+
+@dataclass(frozen=True)
+class GraphRequest:
+    tenant_id: str
+    requester_id: str
+    scopes: tuple[str, ...]
+    resource: str
+    access_token: str = field(repr=False)
+    method: str
+    path: str
+    headers: dict[str, str]
+    body: Any
+    timeout_seconds: float
+
+
+@dataclass(frozen=True)
+class GraphResponse:
+    status: int
+    headers: dict[str, str]
+    body: Any
+    provider_request_id: str
+    annotations: dict[str, Any] = field(default_factory=dict)
+
+
+class GraphDownstreamClient(Protocol):
+    def send(self, request: GraphRequest) -> GraphResponse: ...
+
+
+def normalize_forward_headers(headers: dict[str, Any] | None) -> dict[str, str]:
+    """Lowercase header names, strip blocked headers and reject anything not allowlisted."""
+    normalized: dict[str, str] = {}
+    unknown: list[str] = []
+    for name, value in (headers or {}).items():
+        lowered = str(name).lower()
+        if lowered in BLOCKED_HEADERS:
+            continue
+        if lowered not in ALLOWED_FORWARD_HEADERS:
+            unknown.append(lowered)
+            continue
+        normalized[lowered] = str(value)
+    if unknown:
+        raise ValueError(f"unsupported operation headers: {', '.join(sorted(unknown))}")
+    return normalized
+
+
+def resolve_url(resource: str, path: str) -> str:
+    """Build the request URL, refusing absolute URLs outside the allowlisted resource."""
+    if path.startswith("/"):
+        return resource.rstrip("/") + path
+    if path.startswith(resource.rstrip("/") + "/"):
+        return path
+    raise GraphDownstreamError("provider.bad_response", "downstream URL is outside resource")
+
+
+class HttpGraphDownstreamClient:
+    """Sends Graph calls over ``urllib``, requesting and decoding gzip/deflate responses.
+
+    Compressed bodies are inflated chunk by chunk and the decoded size is capped at
+    ``max_response_bytes`` so a small compressed payload cannot expand without bound.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_response_bytes: int = DEFAULT_MAX_RESPONSE_BYTES,
+        metrics: MetricsRegistry | None = None,
+    ) -> None:
+        self.max_response_bytes = max_response_bytes
+        self.metrics = metrics
+
+    def send(self, request: GraphRequest) -> GraphResponse:
+        data = None
+        headers = dict(request.headers)
+        if request.body is not None:
+            if isinstance(request.body, bytes):
+                data = request.body
+            else:
+                data = json.dumps(request.body).encode("utf-8")
+                headers.setdefault("content-type", "application/json")
+        headers["authorization"] = f"Bearer {request.access_token}"
+        headers["accept-encoding"] = ACCEPT_ENCODING
+        http_request = urllib.request.Request(
+            resolve_url(request.resource, request.path),
+            data=data,
+            method=request.method,
+            headers=headers,
+        )
+
+        try:
+            with urllib.request.urlopen(http_request, timeout=request.timeout_seconds) as response:
+                return self._read_response(response.status, response.headers, response)
+        except urllib.error.HTTPError as exc:
+            return self._read_response(exc.code, exc.headers, exc if exc.fp else None)
+        except TimeoutError as exc:
+            raise GraphDownstreamError("provider.timeout", "downstream call timed out") from exc
+        except urllib.error.URLError as exc:
+            raise GraphDownstreamError(
+                "provider.unavailable", "downstream provider unavailable"
+            ) from exc
+
+    def _read_response(
+        self, status: int, raw_headers: Any, stream: BinaryIO | None
+    ) -> GraphResponse:
+        headers = {str(name).lower(): str(value) for name, value in (raw_headers or {}).items()}
+        encoding = headers.get("content-encoding", "identity").strip().lower()
+        payload, wire_bytes = read_decoded(stream, encoding, max_bytes=self.max_response_bytes)
+        if encoding in ("gzip", "deflate"):
+            # The body handed back is already decoded, so its wire framing no longer applies.
+            headers.pop("content-encoding", None)
+            headers.pop("content-length", None)
+        if self.metrics is not None:
+            self.metrics.increment("downstream.bytes_received", wire_bytes, encoding=encoding)
+            self.metrics.increment("downstream.bytes_decoded", len(payload), encoding=encoding)
+            self.metrics.increment(
+                "downstream.compression_saved_bytes",
+                max(0, len(payload) - wire_bytes),
+                encoding=encoding,
+            )
+        return _to_response(status, headers, payload)
+
+
+def read_decoded(
+    stream: BinaryIO | None, encoding: str, *, max_bytes: int
+) -> tuple[bytearray, int]:
+    """Read ``stream`` in chunks, inflating gzip/deflate, and return ``(body, wire_bytes)``.
+
+    ``deflate`` bodies are expected zlib-wrapped, but raw deflate streams, which some servers
+    send instead, are accepted too. Raises ``provider.bad_response`` if the decoded body
+    would exceed ``max_bytes`` or the compressed stream is corrupt.
+    """
+    body = bytearray()
+    wire_bytes = 0
+    if stream is None:
+        return body, wire_bytes
+    if encoding not in ("gzip", "deflate", "identity", ""):
+        raise GraphDownstreamError("provider.bad_response", "unsupported content encoding")
+    decoder = zlib.decompressobj(_AUTO_HEADER_WBITS) if encoding in ("gzip", "deflate") else None
+    # Wire bytes fed to the decoder before it accepted the two-byte zlib header.
+    unverified = bytearray() if encoding == "deflate" else None
+    try:
+        while chunk := stream.read(_READ_CHUNK_BYTES):
+            wire_bytes += len(chunk)
+            if decoder is None:
+                body.extend(chunk)
+            elif unverified is None:
+                _inflate(decoder, chunk, body, max_bytes)
+            else:
+                unverified.extend(chunk)
+                try:
+                    _inflate(decoder, chunk, body, max_bytes)
+                except zlib.error:
+                    decoder = zlib.decompressobj(-zlib.MAX_WBITS)
+                    _inflate(decoder, bytes(unverified), body, max_bytes)
+                    unverified = None
+                else:
+                    if len(unverified) >= 2:
+                        unverified = None
+            if len(body) > max_bytes:
+                raise GraphDownstreamError(
+                    "provider.bad_response", "downstream response exceeds size limit"
+                )
+        if decoder is not None:
+            body.extend(decoder.flush())
+            if not decoder.eof:
+                raise GraphDownstreamError(
+                    "provider.bad_response", "downstream compressed body is truncated"
+                )
+    except zlib.error as exc:
+        raise GraphDownstreamError(
+            "provider.bad_response", "downstream compressed body is corrupt"
+        ) from exc
+    if len(body) > max_bytes:
+        raise GraphDownstreamError(
+            "provider.bad_response", "downstream response exceeds size limit"
+        )
+    return body, wire_bytes
+
+
+def _inflate(decoder: Any, chunk: bytes, body: bytearray, max_bytes: int) -> None:
+    # Bound each inflate step so a decompression bomb stops at the cap.
+    body.extend(decoder.decompress(chunk, max_bytes - len(body) + 1))
+    while decoder.unconsumed_tail and len(body) <= max_bytes:
+        body.extend(decoder.decompress(decoder.unconsumed_tail, max_bytes - len(body) + 1))
+
+
+def _to_response(status: int, headers: dict[str, str], payload: bytes) -> GraphResponse:
+    return GraphResponse(
+        status=status,
+        headers=headers,
+        body=decode_body(payload, headers.get("content-type", "")),
+        provider_request_id=headers.get("request-id") or str(uuid4()),
+    )
+
+
+def decode_body(payload: bytes | bytearray, content_type: str) -> Any:
+    if not payload:
+        return None
+    if "json" in content_type:
+        try:
+            return json.loads(payload)
+        except ValueError as exc:
+            raise GraphDownstreamError(
+                "provider.bad_response", "downstream returned invalid JSON"
+            ) from exc
+    return bytes(payload).decode("utf-8", errors="replace")
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Callable, Hashable
+
+
+class FairQueue:
+    """Per-flow FIFO queues served by deficit round robin, one unit of cost per item.
+
+    Each backlogged flow receives ``weight(flow)`` credits per round, so a flow with weight 2
+    is served twice as often as a flow with weight 1 while both have items waiting, and a
+    flow with a deep backlog cannot delay another flow by more than one round. Not
+    thread-safe: callers hold their own lock.
+    """
+
+    def __init__(self, weight: Callable[[Hashable], int] = lambda flow: 1) -> None:
+        self._weight = weight
+        self._queues: dict[Hashable, deque[object]] = {}
+        self._deficits: dict[Hashable, int] = {}
+        self._active: deque[Hashable] = deque()
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def depth(self, flow: Hashable) -> int:
+        queue = self._queues.get(flow)
+        return len(queue) if queue else 0
+
+    def push(self, flow: Hashable, item: object) -> None:
+        queue = self._queues.get(flow)
+        if queue is None:
+            queue = self._queues[flow] = deque()
+            self._deficits[flow] = 0
+            self._active.append(flow)
+        queue.append(item)
+        self._size += 1
+
+    def peek(self) -> object | None:
+        """Return the item ``pop`` would serve next, without removing it."""
+        if not self._active:
+            return None
+        flow = self._active[0]
+        if self._deficits[flow] < 1:
+            self._deficits[flow] += max(1, self._weight(flow))
+        return self._queues[flow][0]
+
+    def pop(self) -> object:
+        item = self.peek()
+        if item is None:
+            raise IndexError("pop from an empty FairQueue")
+        flow = self._active[0]
+        self._queues[flow].popleft()
+        self._size -= 1
+        self._deficits[flow] -= 1
+        if not self._queues[flow]:
+            self._drop_flow(flow)
+        elif self._deficits[flow] < 1:
+            self._active.rotate(-1)
+        return item
+
+    def remove(self, flow: Hashable, item: object) -> None:
+        queue = self._queues[flow]
+        queue.remove(item)
+        self._size -= 1
+        if not queue:
+            self._drop_flow(flow)
+
+    def _drop_flow(self, flow: Hashable) -> None:
+        # An idle flow keeps no credit, as in DRR: it cannot bank service while not queued.
+        del self._queues[flow]
+        del self._deficits[flow]
+        self._active.remove(flow)
@@ -1,17 +1,24 @@
 from __future__ import annotations
 
+import email.utils
 import json
+import sys
+import threading
 import time
 import urllib.error
 import urllib.parse
 import urllib.request
-from dataclasses import dataclass
+from collections.abc import Callable, Iterable, Sequence
+from dataclasses import dataclass, replace
+from functools import lru_cache
 from typing import Protocol
 
+from .negative_cache import NegativeCache
+from .rate_limit import MintRateLimiter
 from .secrets import SecretProvider, SecretProviderError, SecretReference
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class TokenRecord:
     access_token: str
     token_type: str
@@ -19,17 +26,45 @@ class TokenRecord:
     source: str
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class TokenResult:
-    token: str
-    metadata: dict[str, object]
+    """A resolved token and the request it answers; ``metadata`` is built only when read."""
+
+    record: TokenRecord
+    tenant_id: str
+    resource: str
+    scopes: Sequence[str]
+
+    @property
+    def token(self) -> str:
+        return self.record.access_token
+
+    @property
+    def metadata(self) -> dict[str, object]:
+        return {
+            "tenant_id": self.tenant_id,
+            "resource": self.resource,
+            "scopes": list(self.scopes),
+            "token_type": self.record.token_type,
+            "expires_at_epoch": int(self.record.expires_at_epoch),
+            "source": self.record.source,
+        }
+
+
+CacheKey = tuple[str, str, tuple[str, ...]]
+
+# Secret failures that mean "dependency degraded" rather than "secret is wrong".
+_SECRET_FALLBACK_CODES = frozenset({"secret.timeout", "secret.unavailable"})
 
 
 class GraphTokenProviderError(Exception):
-    def __init__(self, code: str, message: str) -> None:
+    def __init__(
+        self, code: str, message: str, *, retry_after_seconds: float | None = None
+    ) -> None:
         super().__init__(message)
         self.code = code
         self.message = message
+        self.retry_after_seconds = retry_after_seconds
 
 
 class GraphTokenMintClient(Protocol):
@@ -44,18 +79,75 @@ class GraphTokenMintClient(Protocol):
     ) -> tuple[str, str, int]: ...
 
 
-class GraphTokenCache:
+class TokenCacheBackend(Protocol):
+    def get_valid(
+        self,
+        *,
+        key: CacheKey,
+        now_epoch: float,
+        skew_seconds: int,
+    ) -> TokenRecord | None: ...
+
+    def put(
+        self,
+        *,
+        key: CacheKey,
+        access_token: str,
+        token_type: str,
+        expires_in_seconds: int,
+        now_epoch: float,
+        max_ttl_seconds: int,
+    ) -> TokenRecord: ...
+
+    def acquire_mint_lease(self, *, key: CacheKey, lease_seconds: float) -> bool: ...
+
+    def release_mint_lease(self, *, key: CacheKey) -> None: ...
+
+    def invalidate(self, predicate: Callable[[CacheKey], bool]) -> int: ...
+
+
+def canonical_scopes(scopes: Iterable[str]) -> tuple[str, ...]:
+    """Deduplicate and casefold scopes and sort them, so equivalent requests share a key."""
+    return _canonical_scopes(tuple(scopes))
+
+
+@lru_cache(maxsize=4096)
+def _canonical_scopes(scopes: tuple[str, ...]) -> tuple[str, ...]:
+    # Memoized and interned: every key for the same scope set shares one tuple of strings.
+    return tuple(
+        sorted({sys.intern(scope.strip().casefold()) for scope in scopes if scope.strip()})
+    )
+
+
+class _CacheStripe:
+    __slots__ = ("lock", "records", "leases")
+
     def __init__(self) -> None:
-        self._records: dict[tuple[str, str, tuple[str, ...]], TokenRecord] = {}
+        self.lock = threading.Lock()
+        self.records: dict[CacheKey, TokenRecord] = {}
+        self.leases: dict[CacheKey, float] = {}
+
+
+class GraphTokenCache:
+    """In-process token cache, lock-striped so concurrent workers rarely share a lock.
+
+    Records and mint leases are striped by cache key. Mint leases give single-flight
+    minting per key across threads of one process.
+    """
+
+    def __init__(self, *, stripes: int = 16) -> None:
+        self._stripes = tuple(_CacheStripe() for _ in range(max(1, stripes)))
 
     def get_valid(
         self,
         *,
-        key: tuple[str, str, tuple[str, ...]],
+        key: CacheKey,
         now_epoch: float,
         skew_seconds: int,
     ) -> TokenRecord | None:
-        record = self._records.get(key)
+        stripe = self._stripe(key)
+        with stripe.lock:
+            record = stripe.records.get(key)
         if record is None:
             return None
         if record.expires_at_epoch <= now_epoch + skew_seconds:
@@ -65,25 +157,90 @@ class GraphTokenCache:
     def put(
         self,
         *,
-        key: tuple[str, str, tuple[str, ...]],
+        key: CacheKey,
         access_token: str,
         token_type: str,
         expires_in_seconds: int,
         now_epoch: float,
         max_ttl_seconds: int,
     ) -> TokenRecord:
-        effective_ttl = max(1, min(expires_in_seconds, max_ttl_seconds))
-        record = TokenRecord(
+        record = build_token_record(
             access_token=access_token,
             token_type=token_type,
-            expires_at_epoch=now_epoch + effective_ttl,
-            source="minted",
+            expires_in_seconds=expires_in_seconds,
+            now_epoch=now_epoch,
+            max_ttl_seconds=max_ttl_seconds,
         )
-        self._records[key] = record
+        stripe = self._stripe(key)
+        with stripe.lock:
+            # Store the view cache hits return, so a hit never has to copy the record.
+            stripe.records[key] = TokenRecord(
+                record.access_token, record.token_type, record.expires_at_epoch, "cache"
+            )
         return record
 
+    def acquire_mint_lease(self, *, key: CacheKey, lease_seconds: float) -> bool:
+        stripe = self._stripe(key)
+        now = time.monotonic()
+        with stripe.lock:
+            if stripe.leases.get(key, 0.0) > now:
+                return False
+            stripe.leases[key] = now + lease_seconds
+            return True
+
+    def release_mint_lease(self, *, key: CacheKey) -> None:
+        stripe = self._stripe(key)
+        with stripe.lock:
+            stripe.leases.pop(key, None)
+
+    def invalidate(self, predicate: Callable[[CacheKey], bool]) -> int:
+        removed = 0
+        for stripe in self._stripes:
+            with stripe.lock:
+                doomed = [key for key in stripe.records if predicate(key)]
+                for key in doomed:
+                    del stripe.records[key]
+                removed += len(doomed)
+        return removed
+
+    def _stripe(self, key: CacheKey) -> _CacheStripe:
+        return self._stripes[hash(key) % len(self._stripes)]
+
+
+def build_token_record(
+    *,
+    access_token: str,
+    token_type: str,
+    expires_in_seconds: int,
+    now_epoch: float,
+    max_ttl_seconds: int,
+) -> TokenRecord:
+    effective_ttl = max(1, min(expires_in_seconds, max_ttl_seconds))
+    return TokenRecord(
+        access_token=access_token,
+        token_type=token_type,
+        expires_at_epoch=now_epoch + effective_ttl,
+        source="minted",
+    )
+
+
+TOKEN_AUTHORITY = "https://login.microsoftonline.com"
+
 
 class HttpGraphTokenMintClient:
+    def check(self, *, timeout_seconds: float) -> None:
+        """Verify the token authority answers, without minting or sending credentials."""
+        metadata_url = f"{TOKEN_AUTHORITY}/common/v2.0/.well-known/openid-configuration"
+        try:
+            with urllib.request.urlopen(metadata_url, timeout=timeout_seconds) as response:
+                response.read()
+        except TimeoutError as exc:
+            raise GraphTokenProviderError("provider.timeout", "token provider timeout") from exc
+        except urllib.error.URLError as exc:
+            raise GraphTokenProviderError(
+                "provider.unavailable", "token provider unavailable"
+            ) from exc
+
     def mint(
         self,
         *,
@@ -93,7 +250,7 @@ class HttpGraphTokenMintClient:
         scope: str,
         timeout_seconds: int,
     ) -> tuple[str, str, int]:
-        token_url = f"https://login.microsoftonline.com/{tenant_id}/oauth2/v2.0/token"
+        token_url = f"{TOKEN_AUTHORITY}/{tenant_id}/oauth2/v2.0/token"
         body = urllib.parse.urlencode(
             {
                 "grant_type": "client_credentials",
@@ -121,7 +278,11 @@ class HttpGraphTokenMintClient:
                 ) from exc
             if exc.code == 429:
                 raise GraphTokenProviderError(
-                    "provider.rate_limited", "token provider rate limited"
+                    "provider.rate_limited",
+                    "token provider rate limited",
+                    retry_after_seconds=parse_retry_after(
+                        exc.headers.get("Retry-After") if exc.headers else None
+                    ),
                 ) from exc
             raise GraphTokenProviderError(
                 "provider.unavailable", "token provider unavailable"
@@ -143,6 +304,21 @@ class HttpGraphTokenMintClient:
         return access_token, token_type, expires_in
 
 
+def parse_retry_after(value: str | None, *, now_epoch: float | None = None) -> float | None:
+    """Parse a ``Retry-After`` header given as delta-seconds or an HTTP-date."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    now = now_epoch if now_epoch is not None else time.time()
+    return max(0.0, retry_at.timestamp() - now)
+
+
 class GraphTokenProvider:
     def __init__(
         self,
@@ -151,12 +327,15 @@ class GraphTokenProvider:
         secret_reference: SecretReference,
         secret_provider: SecretProvider,
         mint_client: GraphTokenMintClient | None = None,
-        cache: GraphTokenCache | None = None,
+        cache: TokenCacheBackend | None = None,
         allowed_resources: tuple[str, ...] = ("https://graph.microsoft.com",),
         allowed_scopes: tuple[str, ...] = ("User.Read",),
         cache_skew_seconds: int = 60,
         max_ttl_seconds: int = 3000,
         timeout_seconds: int = 4,
+        lease_wait_seconds: float = 2.0,
+        rate_limiter: MintRateLimiter | None = None,
+        negative_cache: NegativeCache | None = None,
     ) -> None:
         self.client_id = client_id
         self.secret_reference = secret_reference
@@ -165,9 +344,31 @@ class GraphTokenProvider:
         self.cache = cache or GraphTokenCache()
         self.allowed_resources = allowed_resources
         self.allowed_scopes = allowed_scopes
+        self._canonical_allowed_scopes = frozenset(canonical_scopes(allowed_scopes))
         self.cache_skew_seconds = cache_skew_seconds
         self.max_ttl_seconds = max_ttl_seconds
         self.timeout_seconds = timeout_seconds
+        self.lease_wait_seconds = lease_wait_seconds
+        self.rate_limiter = rate_limiter
+        self.negative_cache = negative_cache
+
+    def update_allowlists(
+        self, *, allowed_resources: tuple[str, ...], allowed_scopes: tuple[str, ...]
+    ) -> int:
+        """Apply reloaded allowlists and drop cached tokens for scopes no longer allowed.
+
+        Other cached tokens stay warm. Returns the number of evicted entries.
+        """
+        self.allowed_resources = allowed_resources
+        self.allowed_scopes = allowed_scopes
+        allowed = self._canonical_allowed_scopes = frozenset(canonical_scopes(allowed_scopes))
+        return self.cache.invalidate(lambda key: not allowed.issuperset(key[2]))
+
+    def close(self) -> None:
+        """Release connections held by the token cache; the secret provider may be shared."""
+        close = getattr(self.cache, "close", None)
+        if close is not None:
+            close()
 
     def get_token(
         self,
@@ -179,33 +380,46 @@ class GraphTokenProvider:
         now_epoch: float | None = None,
     ) -> TokenResult:
         now = now_epoch if now_epoch is not None else time.time()
-        self._validate_allowlist(resource=resource, scopes=scopes)
+        # Validate, key and mint from the same canonical tuple, so the scopes checked against
+        # the allowlist are exactly the scopes the token is minted for.
+        canonical = canonical_scopes(scopes)
+        self._validate_allowlist(resource=resource, scopes=canonical)
 
-        key = (tenant_id, self.client_id, tuple(scopes))
+        key = (sys.intern(tenant_id), self.client_id, canonical)
         if not force_refresh:
             cached = self.cache.get_valid(
                 key=key, now_epoch=now, skew_seconds=self.cache_skew_seconds
             )
             if cached is not None:
-                return self._to_result(
-                    TokenRecord(
-                        access_token=cached.access_token,
-                        token_type=cached.token_type,
-                        expires_at_epoch=cached.expires_at_epoch,
-                        source="cache",
-                    ),
-                    tenant_id=tenant_id,
-                    resource=resource,
-                    scopes=scopes,
-                )
+                return TokenResult(cached, tenant_id, resource, scopes)
+
+        limiter_key = (tenant_id, self.client_id)
+        failed = self.negative_cache.get(limiter_key) if self.negative_cache else None
+        if failed is not None:
+            # The tenant failed deterministically moments ago; don't spend a mint on it.
+            fallback = self._cached_fallback(
+                key=key, now_epoch=now, tenant_id=tenant_id, resource=resource, scopes=scopes
+            )
+            if fallback is not None:
+                return fallback
+            raise GraphTokenProviderError(*failed)
+
+        leased = self.cache.acquire_mint_lease(key=key, lease_seconds=self._lease_seconds())
+        if not leased:
+            minted_elsewhere = self._await_peer_mint(key=key, now_epoch=now)
+            if minted_elsewhere is not None:
+                return TokenResult(minted_elsewhere, tenant_id, resource, scopes)
 
+        mint_attempted = False
         try:
+            self._acquire_mint_slot(limiter_key)
             client_secret = self.secret_provider.resolve(self.secret_reference)
+            mint_attempted = True
             access_token, token_type, expires_in = self.mint_client.mint(
                 tenant_id=tenant_id,
                 client_id=self.client_id,
                 client_secret=client_secret,
-                scope=" ".join(scopes),
+                scope=" ".join(key[2]),
                 timeout_seconds=self.timeout_seconds,
             )
             minted = self.cache.put(
@@ -216,56 +430,84 @@ class GraphTokenProvider:
                 now_epoch=now,
                 max_ttl_seconds=self.max_ttl_seconds,
             )
-            return self._to_result(minted, tenant_id=tenant_id, resource=resource, scopes=scopes)
+            return TokenResult(minted, tenant_id, resource, scopes)
         except SecretProviderError as exc:
+            if exc.code in _SECRET_FALLBACK_CODES:
+                fallback = self._cached_fallback(
+                    key=key, now_epoch=now, tenant_id=tenant_id, resource=resource, scopes=scopes
+                )
+                if fallback is not None:
+                    return fallback
             raise GraphTokenProviderError(exc.code, exc.message) from exc
         except GraphTokenProviderError as exc:
-            fallback = self.cache.get_valid(
-                key=key, now_epoch=now, skew_seconds=self.cache_skew_seconds
+            if (
+                mint_attempted
+                and exc.code == "provider.rate_limited"
+                and self.rate_limiter is not None
+            ):
+                self.rate_limiter.pause(limiter_key, exc.retry_after_seconds)
+            if mint_attempted and self.negative_cache is not None:
+                self.negative_cache.put(limiter_key, exc.code, exc.message)
+            fallback = self._cached_fallback(
+                key=key, now_epoch=now, tenant_id=tenant_id, resource=resource, scopes=scopes
             )
             if fallback is not None:
-                return self._to_result(
-                    TokenRecord(
-                        access_token=fallback.access_token,
-                        token_type=fallback.token_type,
-                        expires_at_epoch=fallback.expires_at_epoch,
-                        source="cache_fallback",
-                    ),
-                    tenant_id=tenant_id,
-                    resource=resource,
-                    scopes=scopes,
-                )
+                return fallback
             raise exc
+        finally:
+            if leased:
+                self.cache.release_mint_lease(key=key)
+
+    def _cached_fallback(
+        self,
+        *,
+        key: CacheKey,
+        now_epoch: float,
+        tenant_id: str,
+        resource: str,
+        scopes: list[str],
+    ) -> TokenResult | None:
+        # The normal lookup already missed inside the refresh skew; while minting is blocked,
+        # a token that has not yet expired beats failing the request.
+        fallback = self.cache.get_valid(key=key, now_epoch=now_epoch, skew_seconds=0)
+        if fallback is None:
+            return None
+        return TokenResult(replace(fallback, source="cache_fallback"), tenant_id, resource, scopes)
+
+    def _acquire_mint_slot(self, limiter_key: tuple[str, str]) -> None:
+        if self.rate_limiter is None:
+            return
+        wait_seconds = self.rate_limiter.try_acquire(limiter_key)
+        if wait_seconds is not None:
+            raise GraphTokenProviderError(
+                "provider.rate_limited",
+                "token mint paused by rate limiter",
+                retry_after_seconds=wait_seconds,
+            )
 
-    def _validate_allowlist(self, *, resource: str, scopes: list[str]) -> None:
+    def _lease_seconds(self) -> float:
+        # Cover secret resolution plus one mint attempt so a slow holder keeps its lease.
+        return float(self.timeout_seconds * 2)
+
+    def _await_peer_mint(self, *, key: CacheKey, now_epoch: float) -> TokenRecord | None:
+        deadline = time.monotonic() + self.lease_wait_seconds
+        while time.monotonic() < deadline:
+            time.sleep(0.05)
+            record = self.cache.get_valid(
+                key=key, now_epoch=now_epoch, skew_seconds=self.cache_skew_seconds
+            )
+            if record is not None:
+                return record
+        return None
+
+    def _validate_allowlist(self, *, resource: str, scopes: tuple[str, ...]) -> None:
         if resource not in self.allowed_resources:
             raise GraphTokenProviderError(
                 "policy.denied",
                 "provider resource is not allowlisted",
             )
 
-        disallowed_scopes = [scope for scope in scopes if scope not in self.allowed_scopes]
-        if disallowed_scopes:
+        if not scopes or not self._canonical_allowed_scopes.issuperset(scopes):
             raise GraphTokenProviderError(
                 "policy.invalid_scope", "requested scope is not allowlisted"
             )
-
-    def _to_result(
-        self,
-        record: TokenRecord,
-        *,
-        tenant_id: str,
-        resource: str,
-        scopes: list[str],
-    ) -> TokenResult:
-        return TokenResult(
-            token=record.access_token,
-            metadata={
-                "tenant_id": tenant_id,
-                "resource": resource,
-                "scopes": scopes,
-                "token_type": record.token_type,
-                "expires_at_epoch": int(record.expires_at_epoch),
-                "source": record.source,
-            },
-        )
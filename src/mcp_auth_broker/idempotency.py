@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import copy
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import Any
+
+# Failures a retry may fix. Responses carrying them are shared with callers that attached
+# while the request ran, but are never stored for later replay.
+TRANSIENT_ERROR_CODES = frozenset(
+    {
+        "secret.timeout",
+        "secret.unavailable",
+        "provider.timeout",
+        "provider.unavailable",
+        "provider.rate_limited",
+        "broker.overloaded",
+    }
+)
+
+
+def request_fingerprint(tool_name: str, request: dict[str, Any]) -> str:
+    material = json.dumps([tool_name, request], sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class _Execution:
+    __slots__ = ("fingerprint", "done", "response", "expires_at", "size")
+
+    def __init__(self, fingerprint: str) -> None:
+        self.fingerprint = fingerprint
+        self.done = threading.Event()
+        self.response: dict[str, Any] | None = None
+        self.expires_at = 0.0
+        self.size = 0
+
+
+class ReplayCache:
+    """Runs each idempotency key once and replays its response to retries.
+
+    A retry that arrives while the first execution is running waits for it and receives the
+    same response (``attached``); one that arrives later receives the stored response
+    (``replayed``) until ``ttl_seconds`` pass. A retry whose request differs from the
+    original is a ``conflict``. Completed entries are evicted oldest first beyond
+    ``max_entries`` or once their serialized sizes add up to more than ``max_bytes``; a
+    response larger than ``max_entry_bytes`` is never stored. Stored responses are copied
+    in and out, so callers may mutate theirs.
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl_seconds: float = 600,
+        max_entries: int = 10_000,
+        max_bytes: int = 64 * 1024 * 1024,
+        max_entry_bytes: int = 1024 * 1024,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self._clock = clock
+        self._entries: OrderedDict[Hashable, _Execution] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def stored_bytes(self) -> int:
+        return self._bytes
+
+    def execute(
+        self,
+        key: Hashable,
+        fingerprint: str,
+        run: Callable[[], dict[str, Any]],
+        *,
+        wait_seconds: float,
+    ) -> tuple[dict[str, Any] | None, str]:
+        """Return ``(response, outcome)``.
+
+        ``outcome`` is ``executed``, ``replayed``, ``attached``, ``conflict`` or ``timeout``
+        (the original was still running after ``wait_seconds``); the response is ``None``
+        for the last two.
+        """
+        while True:
+            with self._lock:
+                execution = self._entries.get(key)
+                if (
+                    execution is not None
+                    and execution.done.is_set()
+                    and execution.expires_at <= self._clock()
+                ):
+                    self._discard(key)
+                    execution = None
+                if execution is None:
+                    execution = self._entries[key] = _Execution(fingerprint)
+                    break
+            if execution.fingerprint != fingerprint:
+                return None, "conflict"
+            outcome = "replayed" if execution.done.is_set() else "attached"
+            if not execution.done.wait(wait_seconds):
+                return None, "timeout"
+            if execution.response is not None:
+                return copy.deepcopy(execution.response), outcome
+            # The original raised; run it again as the new first execution.
+
+        try:
+            response = run()
+        except BaseException:
+            with self._lock:
+                if self._entries.get(key) is execution:
+                    del self._entries[key]
+            execution.done.set()
+            raise
+
+        execution.response = copy.deepcopy(response)
+        # Sized outside the lock; only responses that may be stored are serialized.
+        size = _response_size(response) if _replayable(response) else None
+        with self._lock:
+            if size is not None and size <= self.max_entry_bytes:
+                execution.expires_at = self._clock() + self.ttl_seconds
+                if self._entries.get(key) is execution:
+                    execution.size = size
+                    self._bytes += size
+                self._evict()
+            elif self._entries.get(key) is execution:
+                del self._entries[key]
+        execution.done.set()
+        return response, "executed"
+
+    def _evict(self) -> None:
+        # Running executions are never evicted; they are bounded by concurrency.
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            oldest = next(
+                (key for key, entry in self._entries.items() if entry.done.is_set()), None
+            )
+            if oldest is None:
+                return
+            self._discard(oldest)
+
+    def _discard(self, key: Hashable) -> None:
+        self._bytes -= self._entries.pop(key).size
+
+
+def _response_size(response: dict[str, Any]) -> int:
+    return len(json.dumps(response, separators=(",", ":"), default=str))
+
+
+def _replayable(response: dict[str, Any]) -> bool:
+    error = response.get("error")
+    if response.get("status") != "error" or not isinstance(error, dict):
+        return True
+    return not error.get("retryable") and error.get("code") not in TRANSIENT_ERROR_CODES
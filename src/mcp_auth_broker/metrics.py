@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import threading
+from typing import Any
+
+MetricKey = tuple[str, tuple[tuple[str, str], ...]]
+
+
+class MetricsRegistry:
+    """In-process counters and gauges, labelled, safe to update from worker threads."""
+
+    def __init__(self) -> None:
+        self._counters: dict[MetricKey, float] = {}
+        self._gauges: dict[MetricKey, float] = {}
+        self._lock = threading.Lock()
+
+    def increment(self, name: str, value: float = 1, **labels: str) -> None:
+        key = _metric_key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def set_gauge(self, name: str, value: float, **labels: str) -> None:
+        key = _metric_key(name, labels)
+        with self._lock:
+            self._gauges[key] = value
+
+    def counter(self, name: str, **labels: str) -> float:
+        with self._lock:
+            return self._counters.get(_metric_key(name, labels), 0)
+
+    def gauge(self, name: str, **labels: str) -> float | None:
+        with self._lock:
+            return self._gauges.get(_metric_key(name, labels))
+
+    def snapshot(self) -> dict[str, list[dict[str, Any]]]:
+        with self._lock:
+            return {
+                "counters": _entries(self._counters),
+                "gauges": _entries(self._gauges),
+            }
+
+
+def _metric_key(name: str, labels: dict[str, str]) -> MetricKey:
+    return name, tuple(sorted((label, str(value)) for label, value in labels.items()))
+
+
+def _entries(values: dict[MetricKey, float]) -> list[dict[str, Any]]:
+    return [
+        {"name": name, "labels": dict(labels), "value": value}
+        for (name, labels), value in sorted(values.items())
+    ]
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable, Mapping
+
+from .secrets import SecretProvider, SecretProviderError, SecretReference
+
+# Failures that repeat identically until an operator fixes something: a missing or
+# inaccessible secret, or credentials the tenant's token endpoint rejects.
+DEFAULT_NEGATIVE_TTLS: dict[str, float] = {
+    "secret.not_found": 30,
+    "secret.access_denied": 30,
+    "provider.auth_failed": 30,
+}
+
+
+class NegativeCache:
+    """Remembers deterministic failures for a short, per-error-code TTL.
+
+    Only codes listed in ``ttl_by_code`` are cached. Entries are evicted oldest first once
+    ``max_entries`` is reached.
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl_by_code: Mapping[str, float] | None = None,
+        max_entries: int = 1024,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.ttl_by_code = dict(DEFAULT_NEGATIVE_TTLS if ttl_by_code is None else ttl_by_code)
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: OrderedDict[Hashable, tuple[float, str, str]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> tuple[str, str] | None:
+        """Return the cached ``(code, message)`` for ``key``, or ``None``."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= self._clock():
+                del self._entries[key]
+                return None
+            return entry[1], entry[2]
+
+    def put(self, key: Hashable, code: str, message: str) -> bool:
+        ttl = self.ttl_by_code.get(code, 0)
+        if ttl <= 0 or self.max_entries <= 0:
+            return False
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (self._clock() + ttl, code, message)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return True
+
+    def invalidate(self, predicate: Callable[[Hashable], bool] | None = None) -> int:
+        """Drop entries whose key matches ``predicate`` (all entries by default)."""
+        with self._lock:
+            keys = [key for key in self._entries if predicate is None or predicate(key)]
+            for key in keys:
+                del self._entries[key]
+        return len(keys)
+
+
+class NegativeCachingSecretProvider:
+    def __init__(self, inner: SecretProvider, cache: NegativeCache) -> None:
+        self.inner = inner
+        self.cache = cache
+
+    def resolve(self, reference: SecretReference) -> str:
+        key = reference.to_uri()
+        cached = self.cache.get(key)
+        if cached is not None:
+            raise SecretProviderError(code=cached[0], message=cached[1])
+        try:
+            return self.inner.resolve(reference)
+        except SecretProviderError as exc:
+            self.cache.put(key, exc.code, exc.message)
+            raise
+
+    def check(self) -> None:
+        self.inner.check()
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+from collections.abc import Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import replace
+from typing import Any
+
+from .downstream import GraphDownstreamClient, GraphRequest, GraphResponse
+
+NEXT_LINK = "@odata.nextLink"
+DEFAULT_MAX_PAGES = 10
+DEFAULT_MAX_ITEMS = 1000
+MAX_PAGES_LIMIT = 1000
+MAX_ITEMS_LIMIT = 100_000
+
+
+class PageStream:
+    """Follows ``@odata.nextLink`` lazily, prefetching one page ahead of the consumer.
+
+    At most the page being consumed and the page being fetched are alive at
+    once, so memory stays near one page regardless of collection size. Totals
+    are available on the instance once iteration finishes. With ``trim_items``
+    disabled, ``max_items`` only stops link-following and pages stay whole, so
+    ``next_link`` is always a lossless resume point.
+    """
+
+    def __init__(
+        self,
+        client: GraphDownstreamClient,
+        first_request: GraphRequest,
+        *,
+        max_pages: int = DEFAULT_MAX_PAGES,
+        max_items: int = DEFAULT_MAX_ITEMS,
+        trim_items: bool = True,
+    ) -> None:
+        self.client = client
+        self.first_request = first_request
+        self.max_pages = max_pages
+        self.max_items = max_items
+        self.trim_items = trim_items
+        self.pages = 0
+        self.items = 0
+        self.truncated = False
+        self.next_link: str | None = None
+
+    def __iter__(self) -> Iterator[GraphResponse]:
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="graph-prefetch")
+        pending: Future[GraphResponse] | None = executor.submit(
+            self.client.send, self.first_request
+        )
+        try:
+            while pending is not None:
+                page = pending.result()
+                pending = None
+                self.pages += 1
+                value, self.next_link = _page_parts(page)
+                if value is not None:
+                    remaining = self.max_items - self.items
+                    if self.trim_items and len(value) > remaining:
+                        value = value[:remaining]
+                        page = replace(page, body={**page.body, "value": value})
+                        self.truncated = True
+                    self.items += len(value)
+
+                has_more = page.status == 200 and self.next_link is not None
+                if (
+                    has_more
+                    and not self.truncated
+                    and self.items < self.max_items
+                    and self.pages < self.max_pages
+                ):
+                    pending = executor.submit(
+                        self.client.send, replace(self.first_request, path=self.next_link)
+                    )
+                elif has_more:
+                    self.truncated = True
+                yield page
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _page_parts(page: GraphResponse) -> tuple[list[Any] | None, str | None]:
+    if not isinstance(page.body, dict):
+        return None, None
+    value = page.body.get("value")
+    next_link = page.body.get(NEXT_LINK)
+    return (
+        value if isinstance(value, list) else None,
+        next_link if isinstance(next_link, str) else None,
+    )
@@ -1,19 +1,50 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Any
 
 from .config import BrokerConfig
+from .graph_tokens import canonical_scopes
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class PolicyDecision:
     decision: str
     reason: str
     metadata: dict[str, Any]
 
 
+@dataclass(frozen=True, slots=True)
+class CompiledPolicy:
+    """Policy inputs extracted from a ``BrokerConfig`` once, for lookups on every request.
+
+    Scopes are held in ``canonical_scopes`` form so matching is case-insensitive, as on the
+    token path.
+    """
+
+    policy_version: str
+    allowed_scopes: frozenset[str]
+    allowed_resources: frozenset[str]
+
+    def evaluate(self, request: dict[str, Any]) -> PolicyDecision:
+        return _evaluate(request, self)
+
+
+@lru_cache(maxsize=8)
+def compile_policy(config: BrokerConfig) -> CompiledPolicy:
+    return CompiledPolicy(
+        policy_version=config.policy_version,
+        allowed_scopes=frozenset(canonical_scopes(config.allowed_scopes)),
+        allowed_resources=frozenset(config.allowed_graph_resources),
+    )
+
+
 def evaluate_policy(request: dict[str, Any], config: BrokerConfig) -> PolicyDecision:
+    return compile_policy(config).evaluate(request)
+
+
+def _evaluate(request: dict[str, Any], policy: CompiledPolicy) -> PolicyDecision:
     requester = request.get("requester") or {}
     requester_id = requester.get("requester_id")
     if not requester_id:
@@ -21,7 +52,7 @@ def evaluate_policy(request: dict[str, Any], config: BrokerConfig) -> PolicyDeci
             decision="deny",
             reason="policy.missing_identity",
             metadata={
-                "policy_version": config.policy_version,
+                "policy_version": policy.policy_version,
                 "matched_rule_id": None,
                 "requester_id": "",
                 "tenant_id": _tenant_id(request),
@@ -30,25 +61,16 @@ def evaluate_policy(request: dict[str, Any], config: BrokerConfig) -> PolicyDeci
         )
 
     scopes = _requested_scopes(request)
-    unsupported_scopes = [scope for scope in scopes if scope not in config.allowed_scopes]
-    if unsupported_scopes:
-        return PolicyDecision(
-            decision="deny",
-            reason="policy.rule.deny.scope.not_permitted",
-            metadata={
-                "policy_version": config.policy_version,
-                "matched_rule_id": None,
-                "requester_id": requester_id,
-                "tenant_id": _tenant_id(request),
-                "scopes_evaluated": scopes,
-            },
-        )
+    if _resource(request) not in policy.allowed_resources:
+        return _deny(request, policy, "policy.rule.deny.resource.not_permitted", requester_id)
+    if not policy.allowed_scopes.issuperset(canonical_scopes(scopes)):
+        return _deny(request, policy, "policy.rule.deny.scope.not_permitted", requester_id)
 
     return PolicyDecision(
         decision="allow",
         reason="policy.rule.allow.graph.user.read",
         metadata={
-            "policy_version": config.policy_version,
+            "policy_version": policy.policy_version,
             "matched_rule_id": "allow-user-read",
             "requester_id": requester_id,
             "tenant_id": _tenant_id(request),
@@ -57,6 +79,27 @@ def evaluate_policy(request: dict[str, Any], config: BrokerConfig) -> PolicyDeci
     )
 
 
+def _deny(
+    request: dict[str, Any], policy: CompiledPolicy, reason: str, requester_id: str
+) -> PolicyDecision:
+    return PolicyDecision(
+        decision="deny",
+        reason=reason,
+        metadata={
+            "policy_version": policy.policy_version,
+            "matched_rule_id": None,
+            "requester_id": requester_id,
+            "tenant_id": _tenant_id(request),
+            "scopes_evaluated": _requested_scopes(request),
+        },
+    )
+
+
+def _resource(request: dict[str, Any]) -> str:
+    graph = request.get("graph") or {}
+    return str(graph.get("resource") or "")
+
+
 def _tenant_id(request: dict[str, Any]) -> str:
     graph = request.get("graph") or {}
     return str(graph.get("tenant_id") or "")
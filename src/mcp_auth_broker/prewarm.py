@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+
+from .graph_tokens import GraphTokenProvider, GraphTokenProviderError
+
+# on_failure(tenant_id, scopes, error_code)
+FailureListener = Callable[[str, tuple[str, ...], str], None]
+
+
+class TokenPrewarmer:
+    """Mints configured (tenant, scopes) tokens concurrently ahead of the first request.
+
+    A failed target is recorded in ``failed`` under its error code, or
+    ``provider.unavailable`` for unexpected errors, and reported to ``on_failure``.
+    """
+
+    def __init__(
+        self,
+        *,
+        token_provider: GraphTokenProvider | None,
+        resource: str,
+        targets: tuple[tuple[str, tuple[str, ...]], ...],
+        timeout_seconds: int,
+        max_workers: int = 8,
+        on_failure: FailureListener | None = None,
+    ) -> None:
+        self.token_provider = token_provider
+        self.resource = resource
+        self.targets = targets
+        self.timeout_seconds = timeout_seconds
+        self.max_workers = max_workers
+        self.on_failure = on_failure
+        self.warmed = 0
+        self.failed: dict[str, str] = {}
+        self._done = threading.Event()
+        self._deadline: float | None = None
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        if self.token_provider is None or not self.targets:
+            self._done.set()
+            return
+        self._deadline = time.monotonic() + self.timeout_seconds
+        threading.Thread(target=self._run, name="token-prewarm", daemon=True).start()
+
+    def state(self) -> str:
+        if self._done.is_set():
+            return "complete" if self._deadline is not None else "idle"
+        if self._deadline is None:
+            return "idle"
+        if time.monotonic() >= self._deadline:
+            return "timed_out"
+        return "pending"
+
+    def wait(self, timeout: float | None = None) -> bool:
+        return self._done.wait(timeout)
+
+    def _run(self) -> None:
+        workers = max(1, min(self.max_workers, len(self.targets)))
+        try:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="prewarm") as pool:
+                for tenant_id, scopes in self.targets:
+                    pool.submit(self._warm, tenant_id, scopes)
+        finally:
+            self._done.set()
+
+    def _warm(self, tenant_id: str, scopes: tuple[str, ...]) -> None:
+        try:
+            self.token_provider.get_token(
+                tenant_id=tenant_id,
+                resource=self.resource,
+                scopes=list(scopes),
+            )
+        except GraphTokenProviderError as exc:
+            self._record_failure(tenant_id, scopes, exc.code)
+            return
+        except Exception:
+            # Pool futures are never read, so anything not caught here would vanish.
+            self._record_failure(tenant_id, scopes, "provider.unavailable")
+            return
+        with self._lock:
+            self.warmed += 1
+
+    def _record_failure(self, tenant_id: str, scopes: tuple[str, ...], code: str) -> None:
+        with self._lock:
+            self.failed[tenant_id] = code
+        if self.on_failure is not None:
+            self.on_failure(tenant_id, scopes, code)
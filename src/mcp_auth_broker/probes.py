@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import json
+import time
+from dataclasses import dataclass
+from typing import Any
+
+from .config import BrokerConfig
+
+# Probe commands run every few seconds, so this module must stay free of server, provider
+# and transport imports (urllib, subprocess, sqlite3, thread pools).
+PROBE_COMMANDS = ("health", "ready", "tools")
+TOOL_NAME = "auth.graph.operation.execute.v1"
+
+
+@dataclass(frozen=True)
+class ToolDefinition:
+    name: str
+    description: str
+    input_schema: dict[str, Any]
+
+
+TOOLS = (
+    ToolDefinition(
+        name=TOOL_NAME,
+        description="Evaluate policy and execute approved Microsoft Graph operation.",
+        input_schema={
+            "type": "object",
+            "required": [
+                "contract_version",
+                "request_id",
+                "requester",
+                "graph",
+                "operation",
+            ],
+        },
+    ),
+)
+
+
+def health_status(config: BrokerConfig) -> dict[str, str]:
+    return {"status": "ok", "service": config.service_name}
+
+
+def readiness_status(
+    config: BrokerConfig,
+    prewarm_state: str,
+    dependencies: dict[str, dict[str, Any]] | None = None,
+) -> dict[str, Any]:
+    """Report readiness; ``dependencies`` are cached probe results, one entry per dependency.
+
+    The broker is not ready while prewarm is pending or any dependency is not ``ok``.
+    """
+    ready = prewarm_state != "pending" and all(
+        entry["status"] == "ok" for entry in (dependencies or {}).values()
+    )
+    status: dict[str, Any] = {
+        "status": "ready" if ready else "not_ready",
+        "environment": config.environment,
+        "prewarm": prewarm_state,
+    }
+    if dependencies:
+        status["dependencies"] = dependencies
+    return status
+
+
+def tool_catalog() -> list[dict[str, Any]]:
+    return [
+        {
+            "name": tool.name,
+            "description": tool.description,
+            "input_schema": tool.input_schema,
+        }
+        for tool in TOOLS
+    ]
+
+
+def published_readiness(config: BrokerConfig, now: float | None = None) -> dict[str, Any]:
+    """Return the readiness report a running server published to ``readiness_status_path``.
+
+    A missing or unreadable file reports ``not_ready`` with a ``pending`` ``status_file``
+    entry; one older than ``readiness_stale_seconds`` adds a ``stale`` entry instead.
+    """
+    try:
+        with open(config.readiness_status_path, encoding="utf-8") as handle:
+            document = json.load(handle)
+        published_at = float(document["published_at"])
+        readiness = document["readiness"]
+        dependencies = dict(readiness.get("dependencies") or {})
+        prewarm_state = str(readiness["prewarm"])
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return readiness_status(config, "idle", {"status_file": {"status": "pending"}})
+    age_seconds = (time.time() if now is None else now) - published_at
+    if config.readiness_stale_seconds and age_seconds > config.readiness_stale_seconds:
+        dependencies["status_file"] = {"status": "stale", "age_ms": int(age_seconds * 1000)}
+    return readiness_status(config, prewarm_state, dependencies)
+
+
+def run_probe(command: str, config: BrokerConfig | None = None) -> Any:
+    """Answer a CLI probe without building providers.
+
+    ``ready`` parses the full configuration and fails on invalid settings. When
+    ``readiness_status_path`` is set it reports the dependency state the serving process
+    published there; otherwise it answers from configuration alone, and since a probe runs
+    in its own process there is no prewarm in progress to report.
+    """
+    if command == "tools":
+        return tool_catalog()
+    config = config or BrokerConfig.from_env()
+    if command == "health":
+        return health_status(config)
+    if command == "ready":
+        if config.readiness_status_path:
+            return published_readiness(config)
+        return readiness_status(config, "idle")
+    raise ValueError(f"unsupported probe command: {command}")
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass
+
+
+@dataclass
+class _Bucket:
+    tokens: float
+    updated_at: float
+    paused_until: float = 0.0
+
+
+class MintRateLimiter:
+    """Token-bucket limiter for mint calls with server-directed pauses (``Retry-After``)."""
+
+    def __init__(
+        self,
+        *,
+        rate_per_second: float,
+        burst: int,
+        default_pause_seconds: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if rate_per_second <= 0:
+            raise ValueError("rate_per_second must be positive")
+        if burst < 1:
+            raise ValueError("burst must be at least 1")
+        self.rate_per_second = rate_per_second
+        self.burst = burst
+        self.default_pause_seconds = default_pause_seconds
+        self._clock = clock
+        self._buckets: dict[Hashable, _Bucket] = {}
+        self._lock = threading.Lock()
+
+    def try_acquire(self, key: Hashable) -> float | None:
+        """Take one token for ``key``; return ``None`` when allowed, else seconds to wait."""
+        with self._lock:
+            now = self._clock()
+            bucket = self._bucket(key, now)
+            if bucket.paused_until > now:
+                return bucket.paused_until - now
+            if bucket.tokens >= 1:
+                bucket.tokens -= 1
+                return None
+            return (1 - bucket.tokens) / self.rate_per_second
+
+    def pause(self, key: Hashable, retry_after_seconds: float | None) -> None:
+        seconds = retry_after_seconds
+        if seconds is None or seconds <= 0:
+            seconds = self.default_pause_seconds
+        with self._lock:
+            now = self._clock()
+            bucket = self._bucket(key, now)
+            bucket.paused_until = max(bucket.paused_until, now + seconds)
+            # Resume gently after the pause instead of releasing a full burst at once.
+            bucket.tokens = min(bucket.tokens, 1.0)
+
+    def _bucket(self, key: Hashable, now: float) -> _Bucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = _Bucket(tokens=float(self.burst), updated_at=now)
+            self._buckets[key] = bucket
+            return bucket
+        refill_from = max(bucket.updated_at, bucket.paused_until)
+        if now > refill_from:
+            bucket.tokens = min(
+                float(self.burst), bucket.tokens + (now - refill_from) * self.rate_per_second
+            )
+        bucket.updated_at = now
+        return bucket
@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass, field
+from typing import Any
+
+from .metrics import MetricsRegistry
+
+# A check returns optional detail for the readiness report and raises when the dependency
+# is unusable; exceptions carrying a ``code`` (provider errors) report that code.
+DependencyCheck = Callable[[], dict[str, Any] | None]
+
+
+@dataclass(frozen=True, slots=True)
+class ProbeResult:
+    ok: bool
+    checked_at: float
+    duration_ms: int
+    error_code: str | None = None
+    detail: dict[str, Any] = field(default_factory=dict)
+
+
+class ReadinessMonitor:
+    """Runs dependency checks in the background and serves their cached results.
+
+    Each dependency is probed on its own thread every ``interval_seconds``, so a hung check
+    only affects its own entry: once its last result is older than ``stale_seconds`` it is
+    reported as ``stale``. ``snapshot`` only reads cached results and never calls a check.
+    """
+
+    def __init__(
+        self,
+        *,
+        checks: Mapping[str, DependencyCheck],
+        interval_seconds: float,
+        stale_seconds: float,
+        metrics: MetricsRegistry | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.checks = dict(checks)
+        self.interval_seconds = interval_seconds
+        self.stale_seconds = stale_seconds
+        self.metrics = metrics
+        self._clock = clock
+        self._results: dict[str, ProbeResult] = {}
+        self._stop = threading.Event()
+
+    def start(self) -> None:
+        if self.interval_seconds <= 0:
+            return
+        for name in self.checks:
+            threading.Thread(
+                target=self._watch, args=(name,), name=f"readiness-{name}", daemon=True
+            ).start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def probe(self, name: str) -> ProbeResult:
+        """Run one check now and cache its result."""
+        started = self._clock()
+        detail: dict[str, Any] = {}
+        error_code = None
+        try:
+            detail = self.checks[name]() or {}
+        except Exception as exc:
+            error_code = getattr(exc, "code", "dependency.unavailable")
+        finished = self._clock()
+        result = ProbeResult(
+            ok=error_code is None,
+            checked_at=finished,
+            duration_ms=int((finished - started) * 1000),
+            error_code=error_code,
+            detail=detail,
+        )
+        self._results[name] = result
+        if self.metrics is not None:
+            self.metrics.increment(
+                "readiness.probes", dependency=name, outcome="ok" if result.ok else "failed"
+            )
+            self.metrics.set_gauge("readiness.dependency_ok", int(result.ok), dependency=name)
+        return result
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        now = self._clock()
+        report = {}
+        for name in self.checks:
+            result = self._results.get(name)
+            if result is None:
+                report[name] = {"status": "pending"}
+                continue
+            age_seconds = now - result.checked_at
+            if age_seconds > self.stale_seconds:
+                status = "stale"
+            else:
+                status = "ok" if result.ok else "failed"
+            entry: dict[str, Any] = {
+                "status": status,
+                "age_ms": int(age_seconds * 1000),
+                "duration_ms": result.duration_ms,
+                **result.detail,
+            }
+            if result.error_code is not None:
+                entry["error_code"] = result.error_code
+            report[name] = entry
+        return report
+
+    def _watch(self, name: str) -> None:
+        while not self._stop.is_set():
+            self.probe(name)
+            if self._stop.wait(self.interval_seconds):
+                return
+
+
+class ReadinessPublisher:
+    """Writes the server's readiness report to ``path`` for out-of-process probes.
+
+    The CLI ``ready`` probe runs in its own process and cannot see the serving process's
+    cached results, so it reads this file instead. The file is replaced atomically every
+    ``interval_seconds`` (once if that is ``0``) and removed on ``stop``.
+    """
+
+    def __init__(
+        self,
+        *,
+        path: str,
+        report: Callable[[], dict[str, Any]],
+        interval_seconds: float,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.path = path
+        self.report = report
+        self.interval_seconds = interval_seconds
+        self._clock = clock
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        self.publish()
+        if self.interval_seconds <= 0:
+            return
+        threading.Thread(target=self._watch, name="readiness-publish", daemon=True).start()
+
+    def stop(self) -> None:
+        with self._lock:
+            self._stop.set()
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+
+    def publish(self) -> None:
+        document = {"published_at": self._clock(), "readiness": self.report()}
+        temporary = f"{self.path}.{os.getpid()}.tmp"
+        with self._lock:
+            if self._stop.is_set():
+                return
+            try:
+                with open(temporary, "w", encoding="utf-8") as handle:
+                    json.dump(document, handle, sort_keys=True)
+                os.replace(temporary, self.path)
+            except OSError:
+                # The probe reports a missing or stale file as not ready.
+                pass
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            self.publish()
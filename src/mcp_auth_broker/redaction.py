@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+from typing import Any
+
+from .downstream import BLOCKED_HEADERS
+
+REDACTED = "[REDACTED]"
+
+# Sensitive keys that may appear at any depth of an audit payload.
+_CREDENTIAL_KEYS = ("access_token", "refresh_token", "client_secret", "secret_value")
+
+# Audit payloads carry the caller's raw ``operation``: blocked headers are stripped before
+# forwarding but would otherwise reach the audit log, and request bodies are caller content.
+DEFAULT_AUDIT_PATHS: tuple[str, ...] = (
+    *(f"operation.headers.{name}" for name in sorted(BLOCKED_HEADERS)),
+    "operation.body",
+    *(f"**.{key}" for key in _CREDENTIAL_KEYS),
+)
+DEFAULT_RESPONSE_PATHS: tuple[str, ...] = (
+    "result.execution.response_headers.set-cookie",
+    *(f"result.execution.response_body.{key}" for key in _CREDENTIAL_KEYS),
+    *(f"result.page.response_body.{key}" for key in _CREDENTIAL_KEYS),
+    "error.metadata.secret_value",
+)
+
+
+class _Node:
+    __slots__ = ("children", "wildcard", "deep", "loop", "terminal", "closure")
+
+    def __init__(self, *, loop: bool = False) -> None:
+        self.children: dict[str, _Node] = {}
+        self.wildcard: _Node | None = None
+        self.deep: _Node | None = None
+        self.loop = loop
+        self.terminal = False
+        self.closure: tuple[_Node, ...] = ()
+
+
+class _State:
+    """A set of trie nodes reached by one key path, with its transitions memoized."""
+
+    __slots__ = ("nodes", "terminal", "transitions")
+
+    def __init__(self, nodes: frozenset[_Node]) -> None:
+        self.nodes = nodes
+        self.terminal = any(node.terminal for node in nodes)
+        self.transitions: dict[str, _State | None] = {}
+
+
+# Transitions memoized per state; bounded because payload keys can be arbitrary data.
+_MAX_TRANSITIONS = 4096
+
+
+class RedactionEngine:
+    """Redacts values at dotted field paths, compiled once into a trie.
+
+    Path segments match keys case-insensitively (or list indexes); ``*`` matches any single
+    key and ``**`` any number of levels, so ``**.access_token`` matches that key anywhere.
+    ``redact`` walks only the subtrees a pattern can reach. Untouched containers are shared
+    with the input rather than copied, and the input is never modified.
+    """
+
+    def __init__(self, paths: Iterable[str], *, placeholder: str = REDACTED) -> None:
+        self.paths = tuple(paths)
+        self.placeholder = placeholder
+        self._root = _Node()
+        for path in self.paths:
+            self._add(path)
+        self._close(self._root, set())
+        self._states: dict[frozenset[_Node], _State] = {}
+        self._start = self._state(frozenset(self._root.closure))
+
+    def redact(self, value: Any) -> tuple[Any, list[dict[str, str]]]:
+        """Return a redacted copy of ``value`` and a ``redactions`` entry per replaced field."""
+        found: list[dict[str, str]] = []
+        return self._walk(value, self._start, "", found), found
+
+    def _state(self, nodes: frozenset[_Node]) -> _State:
+        state = self._states.get(nodes)
+        if state is None:
+            state = self._states.setdefault(nodes, _State(nodes))
+        return state
+
+    def _add(self, path: str) -> None:
+        segments = [segment.strip().casefold() for segment in path.split(".")]
+        if not path.strip() or not all(segments):
+            raise ValueError(f"invalid redaction path: {path!r}")
+        node = self._root
+        for segment in segments:
+            if segment == "**":
+                node.deep = node.deep or _Node(loop=True)
+                node = node.deep
+            elif segment == "*":
+                node.wildcard = node.wildcard or _Node()
+                node = node.wildcard
+            else:
+                node = node.children.setdefault(segment, _Node())
+        node.terminal = True
+
+    def _close(self, node: _Node, seen: set[int]) -> None:
+        # A node's closure adds the ``**`` node below it, which may match zero levels.
+        if id(node) in seen:
+            return
+        seen.add(id(node))
+        node.closure = (node,) if node.deep is None else (node, node.deep)
+        for child in (*node.children.values(), node.wildcard, node.deep):
+            if child is not None:
+                self._close(child, seen)
+
+    def _step(self, state: _State, key: str) -> _State | None:
+        try:
+            return state.transitions[key]
+        except KeyError:
+            pass
+        matched: set[_Node] = set()
+        for node in state.nodes:
+            if node.loop:
+                matched.add(node)
+            child = node.children.get(key)
+            if child is not None:
+                matched.update(child.closure)
+            if node.wildcard is not None:
+                matched.update(node.wildcard.closure)
+        following = self._state(frozenset(matched)) if matched else None
+        if len(state.transitions) < _MAX_TRANSITIONS:
+            state.transitions[key] = following
+        return following
+
+    def _walk(self, value: Any, state: _State, path: str, found: list[dict[str, str]]) -> Any:
+        if isinstance(value, dict):
+            items: Iterable[tuple[Any, Any]] = value.items()
+        elif isinstance(value, list):
+            items = enumerate(value)
+        else:
+            return value
+
+        copy: Any = None
+        for key, child in items:
+            if child is None:
+                continue
+            label = key if isinstance(key, str) else str(key)
+            matched = self._step(state, label.casefold())
+            if matched is None:
+                continue
+            if matched.terminal:
+                replacement: Any = self.placeholder
+                found.append({"field": f"{path}.{label}" if path else label, "reason": "sensitive"})
+            elif isinstance(child, (dict, list)):
+                replacement = self._walk(
+                    child, matched, f"{path}.{label}" if path else label, found
+                )
+                if replacement is child:
+                    continue
+            else:
+                continue
+            if copy is None:
+                copy = dict(value) if isinstance(value, dict) else list(value)
+            copy[key] = replacement
+        return value if copy is None else copy
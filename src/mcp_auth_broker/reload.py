@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import os
+import signal
+import threading
+from collections.abc import Mapping
+from typing import TYPE_CHECKING, Any
+
+from .config import BrokerConfig, read_env_file
+
+if TYPE_CHECKING:
+    from .server import MCPAuthBrokerServer
+
+# Settings that can change without a restart; everything else is wired into long-lived
+# components at startup and is reported back as requiring a restart.
+RELOADABLE_FIELDS = (
+    "allowed_scopes",
+    "allowed_graph_resources",
+    "policy_version",
+    "default_timeout_ms",
+    "response_cache_max_age",
+    "audit_mode",
+    "audit_expand_failures",
+)
+
+
+class ConfigReloader:
+    """Rebuilds ``BrokerConfig`` from the environment plus an optional env file and applies it.
+
+    Triggered by ``SIGHUP`` (see ``install_signal_handler``) or by polling the env file's
+    modification time (``start``). An invalid file is rejected and the running configuration
+    stays in place.
+    """
+
+    def __init__(
+        self,
+        server: MCPAuthBrokerServer,
+        *,
+        env_file: str = "",
+        environ: Mapping[str, str] | None = None,
+        poll_interval_seconds: float = 2.0,
+    ) -> None:
+        self.server = server
+        self.env_file = env_file
+        self.environ = environ
+        self.poll_interval_seconds = poll_interval_seconds
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._mtime = self._file_mtime()
+
+    def load(self) -> BrokerConfig:
+        environ = dict(os.environ if self.environ is None else self.environ)
+        if self.env_file:
+            environ.update(read_env_file(self.env_file))
+        return BrokerConfig.from_env(environ)
+
+    def reload(self) -> dict[str, Any]:
+        with self._lock:
+            try:
+                config = self.load()
+            except (OSError, ValueError) as exc:
+                self.server.metrics.increment("config.reloads", outcome="rejected")
+                return {"status": "rejected", "error": str(exc)}
+            return self.server.reload_config(config)
+
+    def install_signal_handler(self, signum: int = signal.SIGHUP) -> None:
+        # Reload off the signal frame so the handler never waits on a lock the
+        # interrupted thread may hold.
+        signal.signal(
+            signum,
+            lambda *_: threading.Thread(target=self.reload, name="config-reload").start(),
+        )
+
+    def start(self) -> None:
+        if not self.env_file:
+            return
+        threading.Thread(target=self._watch, name="config-watch", daemon=True).start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.poll_interval_seconds):
+            mtime = self._file_mtime()
+            if mtime != self._mtime:
+                self._mtime = mtime
+                self.reload()
+
+    def _file_mtime(self) -> int | None:
+        if not self.env_file:
+            return None
+        try:
+            return os.stat(self.env_file).st_mtime_ns
+        except OSError:
+            return None
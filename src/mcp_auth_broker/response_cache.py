@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass, replace
+
+from .downstream import GraphDownstreamClient, GraphRequest, GraphResponse
+from .graph_tokens import canonical_scopes
+
+DEFAULT_VARY_HEADERS = ("accept", "consistency-level", "prefer")
+
+ResponseCacheKey = tuple[str, str, tuple[str, ...], str, tuple[tuple[str, str], ...]]
+
+
+@dataclass(frozen=True)
+class _Entry:
+    status: int
+    headers: dict[str, str]
+    body_json: bytes
+    provider_request_id: str
+    etag: str | None
+    stored_at: float
+    size: int
+
+
+class GraphResponseCache:
+    """Bounded cache for idempotent downstream GETs with ETag revalidation.
+
+    Entries are keyed by tenant, requester scope set, path and vary headers.
+    Fresh entries (younger than the max-age of the longest matching path
+    prefix) are served directly; stale entries with an ETag are revalidated
+    with ``If-None-Match``. Bodies are stored serialized so callers never share
+    mutable state with the cache and the memory budget is exact.
+    """
+
+    def __init__(
+        self,
+        inner: GraphDownstreamClient,
+        *,
+        max_bytes: int,
+        max_age_by_prefix: tuple[tuple[str, int], ...] = (),
+        vary_headers: tuple[str, ...] = DEFAULT_VARY_HEADERS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.inner = inner
+        self.max_bytes = max_bytes
+        self.set_max_age_by_prefix(max_age_by_prefix)
+        self.vary_headers = vary_headers
+        self._clock = clock
+        self._entries: OrderedDict[ResponseCacheKey, _Entry] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def send(self, request: GraphRequest) -> GraphResponse:
+        if request.method != "GET" or request.body is not None or _is_delta(request.path):
+            return self.inner.send(request)
+
+        key = self._key(request)
+        max_age = self._max_age(request.path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+
+        now = self._clock()
+        if entry is not None and now - entry.stored_at < max_age:
+            return _from_entry(entry, "hit")
+
+        upstream_request = request
+        if entry is not None and entry.etag:
+            upstream_request = replace(
+                request, headers={**request.headers, "if-none-match": entry.etag}
+            )
+        response = self.inner.send(upstream_request)
+
+        if response.status == 304 and entry is not None:
+            refreshed = replace(entry, stored_at=now)
+            self._store(key, refreshed)
+            return _from_entry(refreshed, "revalidated")
+
+        status = "miss"
+        if response.status == 200 and _storable(response) and (max_age > 0 or _etag(response)):
+            body_json = json.dumps(response.body).encode("utf-8")
+            stored = self._store(
+                key,
+                _Entry(
+                    status=response.status,
+                    headers=dict(response.headers),
+                    body_json=body_json,
+                    provider_request_id=response.provider_request_id,
+                    etag=_etag(response),
+                    stored_at=now,
+                    size=len(body_json) + sum(len(k) + len(v) for k, v in response.headers.items()),
+                ),
+            )
+            if not stored:
+                status = "bypass"
+        return replace(response, annotations={**response.annotations, "cache_status": status})
+
+    def set_max_age_by_prefix(self, max_age_by_prefix: tuple[tuple[str, int], ...]) -> None:
+        self.max_age_by_prefix = tuple(
+            sorted(max_age_by_prefix, key=lambda item: len(item[0]), reverse=True)
+        )
+
+    def invalidate(self, predicate: Callable[[ResponseCacheKey], bool]) -> int:
+        with self._lock:
+            doomed = [key for key in self._entries if predicate(key)]
+            for key in doomed:
+                self._bytes -= self._entries.pop(key).size
+            return len(doomed)
+
+    def _key(self, request: GraphRequest) -> ResponseCacheKey:
+        vary = tuple((name, request.headers.get(name, "")) for name in self.vary_headers)
+        return (
+            request.resource,
+            request.tenant_id,
+            canonical_scopes(request.scopes),
+            request.path,
+            vary,
+        )
+
+    def _max_age(self, path: str) -> int:
+        for prefix, max_age in self.max_age_by_prefix:
+            if path.startswith(prefix):
+                return max_age
+        return 0
+
+    def _store(self, key: ResponseCacheKey, entry: _Entry) -> bool:
+        if entry.size > self.max_bytes:
+            return False
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous.size
+            self._entries[key] = entry
+            self._bytes += entry.size
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+        return True
+
+
+def _is_delta(path: str) -> bool:
+    # Delta rounds depend on stored sync state, so replaying a cached page would lose changes.
+    return "/delta" in path.split("?", 1)[0]
+
+
+def _etag(response: GraphResponse) -> str | None:
+    return response.headers.get("etag") or None
+
+
+def _storable(response: GraphResponse) -> bool:
+    cache_control = response.headers.get("cache-control", "").lower()
+    return "no-store" not in cache_control
+
+
+def _from_entry(entry: _Entry, cache_status: str) -> GraphResponse:
+    return GraphResponse(
+        status=entry.status,
+        headers=dict(entry.headers),
+        body=json.loads(entry.body_json),
+        provider_request_id=entry.provider_request_id,
+        annotations={"cache_status": cache_status},
+    )
@@ -1,9 +1,10 @@
 from __future__ import annotations
 
+import json
 import os
-import subprocess
+import threading
 from dataclasses import dataclass
-from typing import Protocol
+from typing import Any, Protocol
 
 
 class SecretProviderError(Exception):
@@ -50,18 +51,28 @@ class OnePasswordSecretProvider:
         self.op_binary = op_binary
 
     def resolve(self, reference: SecretReference) -> str:
+        return self._run("read", reference.to_uri())
+
+    def check(self) -> None:
+        """Verify the CLI is installed and the service account token is accepted."""
+        self._run("whoami")
+
+    def _run(self, *args: str) -> str:
         if not self.token:
             raise SecretProviderError(
                 code="secret.access_denied",
                 message="OP_SERVICE_ACCOUNT_TOKEN is required",
             )
 
+        # Imported here so configuration and probe paths never load subprocess machinery.
+        import subprocess
+
         env = dict(os.environ)
         env["OP_SERVICE_ACCOUNT_TOKEN"] = self.token
 
         try:
             completed = subprocess.run(
-                [self.op_binary, "read", reference.to_uri()],
+                [self.op_binary, *args],
                 check=False,
                 capture_output=True,
                 text=True,
@@ -98,3 +109,227 @@ class OnePasswordSecretProvider:
             code="secret.unavailable",
             message="secret provider unavailable",
         )
+
+
+class FileSecretProvider:
+    """Reads secrets mounted as files, such as Kubernetes secret volumes or the CSI driver.
+
+    ``op://vault/item/field`` resolves to ``<root>/vault/item/field``. Values are cached and
+    re-read only when the file's modification time changes, so rotated mounts are picked up
+    without a restart.
+    """
+
+    def __init__(self, root: str) -> None:
+        self.root = os.path.realpath(root)
+        self._cache: dict[str, tuple[int, str]] = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, reference: SecretReference) -> str:
+        path = self._path(reference)
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+            cached = self._cache.get(path)
+            if cached is not None and cached[0] == mtime_ns:
+                return cached[1]
+            with open(path, encoding="utf-8") as handle:
+                value = handle.read().strip()
+        except FileNotFoundError as exc:
+            raise SecretProviderError(
+                code="secret.not_found",
+                message="secret reference not found",
+            ) from exc
+        except PermissionError as exc:
+            raise SecretProviderError(
+                code="secret.access_denied",
+                message="secret access denied",
+            ) from exc
+        except (OSError, UnicodeDecodeError) as exc:
+            raise SecretProviderError(
+                code="secret.unavailable",
+                message="secret provider unavailable",
+            ) from exc
+        with self._lock:
+            self._cache[path] = (mtime_ns, value)
+        return value
+
+    def _path(self, reference: SecretReference) -> str:
+        parts = (reference.vault, reference.item, reference.field)
+        if any(part in {".", ".."} or os.sep in part for part in parts):
+            raise SecretProviderError(
+                code="bad_request.invalid_field",
+                message="secret reference must not contain path segments",
+            )
+        return os.path.join(self.root, *parts)
+
+    def check(self) -> None:
+        """Verify the mount root exists and can be listed."""
+        if not os.path.isdir(self.root) or not os.access(self.root, os.R_OK | os.X_OK):
+            raise SecretProviderError(
+                code="secret.unavailable",
+                message="secret mount root is not readable",
+            )
+
+
+class OnePasswordConnectSecretProvider:
+    """Resolves references through a 1Password Connect server over kept-alive connections.
+
+    Vault and item IDs are looked up once by title and cached, so a warm resolve costs a
+    single request. Up to ``max_connections`` requests run in parallel, each on its own
+    pooled connection; a connection that errors is dropped rather than returned.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        token: str | None = None,
+        timeout_seconds: float = 5.0,
+        max_connections: int = 4,
+    ) -> None:
+        from urllib.parse import urlsplit
+
+        parsed = urlsplit(base_url)
+        if parsed.scheme not in {"http", "https"} or not parsed.hostname:
+            raise ValueError("1Password Connect URL must be an http(s) URL")
+        self.scheme = parsed.scheme
+        self.host = parsed.hostname
+        self.port = parsed.port
+        self.token = token or os.getenv("OP_CONNECT_TOKEN", "")
+        self.timeout_seconds = timeout_seconds
+        self._slots = threading.BoundedSemaphore(max(1, max_connections))
+        self._idle: list[Any] = []
+        self._lock = threading.Lock()
+        self._vault_ids: dict[str, str] = {}
+        self._item_ids: dict[tuple[str, str], str] = {}
+
+    def resolve(self, reference: SecretReference) -> str:
+        if not self.token:
+            raise SecretProviderError(
+                code="secret.access_denied",
+                message="OP_CONNECT_TOKEN is required",
+            )
+
+        vault_id = self._vault_ids.get(reference.vault)
+        if vault_id is None:
+            vault_id = self._lookup_id("/v1/vaults", reference.vault)
+            self._vault_ids[reference.vault] = vault_id
+        item_key = (vault_id, reference.item)
+        item_id = self._item_ids.get(item_key)
+        if item_id is None:
+            item_id = self._lookup_id(f"/v1/vaults/{vault_id}/items", reference.item)
+            self._item_ids[item_key] = item_id
+
+        item = self._get(f"/v1/vaults/{vault_id}/items/{item_id}")
+        for field in item.get("fields") or []:
+            if reference.field in (field.get("label"), field.get("id")) and "value" in field:
+                return str(field["value"])
+        raise SecretProviderError(
+            code="secret.not_found",
+            message="secret reference not found",
+        )
+
+    def check(self) -> None:
+        """Verify the Connect server is reachable and accepts the token."""
+        if not self.token:
+            raise SecretProviderError(
+                code="secret.access_denied",
+                message="OP_CONNECT_TOKEN is required",
+            )
+        self._get("/v1/vaults")
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection in idle:
+            connection.close()
+
+    def _lookup_id(self, path: str, title: str) -> str:
+        from urllib.parse import quote
+
+        # Connect filters are SCIM expressions whose string literals are JSON strings, so a
+        # quote in a title cannot end the literal and add clauses of its own.
+        query = quote(f"title eq {json.dumps(title, ensure_ascii=False)}")
+        matches = self._get(f"{path}?filter={query}")
+        if not isinstance(matches, list) or not matches:
+            raise SecretProviderError(
+                code="secret.not_found",
+                message="secret reference not found",
+            )
+        match = matches[0]
+        if not isinstance(match, dict) or "id" not in match:
+            raise SecretProviderError(
+                code="secret.unavailable",
+                message="secret provider returned an invalid response",
+            )
+        return str(match["id"])
+
+    def _get(self, path: str) -> Any:
+        if not self._slots.acquire(timeout=self.timeout_seconds):
+            raise SecretProviderError(
+                code="secret.timeout",
+                message="secret provider timed out",
+            )
+        try:
+            status, body = self._request(path)
+        finally:
+            self._slots.release()
+
+        if status == 404:
+            raise SecretProviderError(
+                code="secret.not_found",
+                message="secret reference not found",
+            )
+        if status in {401, 403}:
+            raise SecretProviderError(
+                code="secret.access_denied",
+                message="secret access denied",
+            )
+        if status != 200:
+            raise SecretProviderError(
+                code="secret.unavailable",
+                message="secret provider unavailable",
+            )
+        try:
+            return json.loads(body)
+        except ValueError as exc:
+            raise SecretProviderError(
+                code="secret.unavailable",
+                message="secret provider returned an invalid response",
+            ) from exc
+
+    def _request(self, path: str) -> tuple[int, bytes]:
+        import http.client
+
+        headers = {"authorization": f"Bearer {self.token}", "accept": "application/json"}
+        with self._lock:
+            connection = self._idle.pop() if self._idle else None
+        # One retry covers a kept-alive connection the server closed while idle.
+        for attempt in range(2):
+            if connection is None:
+                connection_class = (
+                    http.client.HTTPSConnection
+                    if self.scheme == "https"
+                    else http.client.HTTPConnection
+                )
+                connection = connection_class(self.host, self.port, timeout=self.timeout_seconds)
+            try:
+                connection.request("GET", path, headers=headers)
+                response = connection.getresponse()
+                status, body = response.status, response.read()
+                break
+            except TimeoutError as exc:
+                connection.close()
+                raise SecretProviderError(
+                    code="secret.timeout",
+                    message="secret provider timed out",
+                ) from exc
+            except (OSError, http.client.HTTPException) as exc:
+                connection.close()
+                connection = None
+                if attempt:
+                    raise SecretProviderError(
+                        code="secret.unavailable",
+                        message="secret provider unavailable",
+                    ) from exc
+        with self._lock:
+            self._idle.append(connection)
+        return status, body
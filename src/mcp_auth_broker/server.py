@@ -1,24 +1,66 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import os
+import threading
+from collections.abc import Callable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, replace
 from typing import Any
 from uuid import uuid4
 
-from .audit import AuditEmitter
+from .admission import AdmissionController, AdmissionRejected
+from .audit import AuditEmitter, AuditTrail
+from .batching import GraphBatchCoalescer
+from .circuit import CircuitBreaker, CircuitBreakingMintClient, CircuitBreakingSecretProvider
 from .config import BrokerConfig
-from .graph_tokens import GraphTokenProvider
-from .graph_tokens import GraphTokenProviderError
-from .policy import evaluate_policy
-from .secrets import OnePasswordSecretProvider, SecretProvider
+from .credentials import Credential, CredentialRegistry, TokenProviderPool
+from .delta import DeltaStateStore, run_delta_query
+from .distributed_cache import NetworkTokenCacheBackend
+from .downstream import DOWNSTREAM_TIMEOUT_MS, RESPONSE_HEADER_ALLOWLIST
+from .downstream import GraphDownstreamClient, GraphDownstreamError, GraphRequest
+from .downstream import HttpGraphDownstreamClient, normalize_forward_headers
+from .graph_tokens import GraphTokenCache, GraphTokenProvider, TokenCacheBackend, TokenResult
+from .graph_tokens import GraphTokenProviderError, HttpGraphTokenMintClient, canonical_scopes
+from .idempotency import ReplayCache, request_fingerprint
+from .metrics import MetricsRegistry
+from .negative_cache import NegativeCache, NegativeCachingSecretProvider
+from .pagination import DEFAULT_MAX_ITEMS, DEFAULT_MAX_PAGES, MAX_ITEMS_LIMIT, MAX_PAGES_LIMIT
+from .pagination import PageStream
+from .policy import CompiledPolicy, PolicyDecision, compile_policy
+from .prewarm import TokenPrewarmer
+from .probes import TOOL_NAME, health_status, readiness_status, tool_catalog
+from .rate_limit import MintRateLimiter
+from .readiness import DependencyCheck, ReadinessMonitor, ReadinessPublisher
+from .redaction import DEFAULT_AUDIT_PATHS, DEFAULT_RESPONSE_PATHS, RedactionEngine
+from .reload import RELOADABLE_FIELDS, ConfigReloader
+from .response_cache import GraphResponseCache
+from .secrets import (
+    FileSecretProvider,
+    OnePasswordConnectSecretProvider,
+    OnePasswordSecretProvider,
+    SecretProvider,
+)
+from .slo import VIOLATION_RATIO_TRIGGER, SloTimedDownstreamClient, SloTimedMintClient
+from .slo import SloTimedSecretProvider, SloTracker
+from .uploads import CHUNK_ALIGNMENT, DEFAULT_CHUNK_SIZE, MAX_CHUNK_SIZE, FileUploadSource
+from .uploads import HttpUploadTransport, UploadSource, UploadTransport, run_upload_session
 
-TOOL_NAME = "auth.graph.operation.execute.v1"
+_UNBUILT: Any = object()
 
 
 @dataclass(frozen=True)
-class ToolDefinition:
-    name: str
-    description: str
-    input_schema: dict[str, Any]
+class _RuntimeState:
+    config: BrokerConfig
+    policy: CompiledPolicy
+
+
+@dataclass(frozen=True)
+class _AuthorizedRequest:
+    request_id: str
+    trace_id: str
+    policy_decision: PolicyDecision
+    token_result: TokenResult | None
+    audit: AuditTrail
 
 
 class MCPAuthBrokerServer:
@@ -27,66 +69,428 @@ class MCPAuthBrokerServer:
         config: BrokerConfig | None = None,
         audit: AuditEmitter | None = None,
         secret_provider: SecretProvider | None = None,
-        token_provider: GraphTokenProvider | None = None,
+        token_provider: GraphTokenProvider | TokenProviderPool | None = None,
+        metrics: MetricsRegistry | None = None,
+        downstream_client: GraphDownstreamClient | None = None,
+        delta_store: DeltaStateStore | None = None,
+        upload_transport: UploadTransport | None = None,
     ) -> None:
-        self.config = config or BrokerConfig.from_env()
+        config = config or BrokerConfig.from_env()
+        # Swapped as one reference on reload so a request never sees a config/policy mix.
+        self._state = _RuntimeState(config=config, policy=compile_policy(config))
+        self._reload_lock = threading.Lock()
+        self._pool: ThreadPoolExecutor | None = None
+        self._pool_lock = threading.Lock()
         self.audit = audit or AuditEmitter()
-        self.secret_provider = secret_provider or self._build_secret_provider()
-        self.token_provider = token_provider or self._build_token_provider()
-        self._tools = [
-            ToolDefinition(
-                name=TOOL_NAME,
-                description="Evaluate policy and execute approved Microsoft Graph operation.",
-                input_schema={
-                    "type": "object",
-                    "required": [
-                        "contract_version",
-                        "request_id",
-                        "requester",
-                        "graph",
-                        "operation",
-                    ],
-                },
+        self.metrics = metrics or MetricsRegistry()
+        # Providers are built on first use so callers that never mint pay nothing for them.
+        self._provider_lock = threading.Lock()
+        self.slo = (
+            SloTracker(
+                budgets_ms=dict(config.slo_budgets_ms),
+                window_seconds=config.slo_window_seconds,
+                max_tenants=config.slo_max_tenants,
+                on_breach=self._on_slo_breach,
             )
-        ]
+            if config.slo_window_seconds > 0
+            else None
+        )
+        self._secret_provider = secret_provider or _UNBUILT
+        self._token_provider = token_provider or _UNBUILT
+        self.downstream_client = downstream_client or self._build_downstream_client()
+        self.delta_store = delta_store or DeltaStateStore(self.config.delta_state_path)
+        self.upload_transport = upload_transport or HttpUploadTransport()
+        self.response_redactor = RedactionEngine(
+            (*DEFAULT_RESPONSE_PATHS, *self.config.redact_response_paths)
+        )
+        if self.audit.redactor is None:
+            self.audit.redactor = RedactionEngine(
+                (*DEFAULT_AUDIT_PATHS, *self.config.redact_audit_paths)
+            )
+        # Shared by the secret layer (keyed by reference URI) and token minting (by tenant).
+        self.negative_cache = NegativeCache(
+            ttl_by_code=dict(self.config.negative_cache_ttls),
+            max_entries=self.config.negative_cache_max_entries,
+        )
+        self.replay_cache = (
+            ReplayCache(
+                ttl_seconds=self.config.idempotency_ttl_seconds,
+                max_entries=self.config.idempotency_max_entries,
+                max_bytes=self.config.idempotency_max_bytes,
+                max_entry_bytes=self.config.idempotency_max_entry_bytes,
+            )
+            if self.config.idempotency_ttl_seconds > 0
+            else None
+        )
+        self.admission = AdmissionController(
+            max_in_flight=self.config.admission_max_in_flight,
+            max_queue=self.config.admission_max_queue,
+            target_seconds=self.config.admission_target_queue_ms / 1000,
+            interval_seconds=self.config.admission_interval_ms / 1000,
+            weights=dict(self.config.admission_weights),
+            metrics=self.metrics,
+        )
+        self.prewarmer = TokenPrewarmer(
+            token_provider=self.token_provider if self.config.prewarm_targets else None,
+            resource=self.config.allowed_graph_resources[0],
+            targets=self.config.prewarm_targets,
+            timeout_seconds=self.config.prewarm_timeout_seconds,
+            on_failure=self._on_prewarm_failure,
+        )
+        self.prewarmer.start()
+        # Only dependencies the broker builds itself are probed; injected ones are the
+        # caller's to monitor.
+        self._cache_probe: NetworkTokenCacheBackend | None = None
+        self.readiness_monitor = ReadinessMonitor(
+            checks=self._readiness_checks(
+                probe_secrets=secret_provider is None, probe_tokens=token_provider is None
+            ),
+            interval_seconds=self.config.readiness_interval_seconds,
+            stale_seconds=self.config.readiness_stale_seconds,
+            metrics=self.metrics,
+        )
+        self.readiness_publisher: ReadinessPublisher | None = None
+        if self.config.readiness_status_path:
+            self.readiness_publisher = ReadinessPublisher(
+                path=self.config.readiness_status_path,
+                report=self.readiness,
+                interval_seconds=self.config.readiness_interval_seconds,
+            )
+        self.reloader = ConfigReloader(self, env_file=self.config.config_reload_path)
+        self.reloader.start()
+
+    @property
+    def config(self) -> BrokerConfig:
+        return self._state.config
+
+    def start(self) -> None:
+        """Start background dependency probes and the readiness status file.
+
+        Probes reach real dependencies, so a constructed server stays quiet until a serving
+        entry point calls this; ``shutdown`` stops them again.
+        """
+        self.readiness_monitor.start()
+        if self.readiness_publisher is not None:
+            self.readiness_publisher.start()
+
+    @property
+    def secret_provider(self) -> SecretProvider | None:
+        with self._provider_lock:
+            if self._secret_provider is _UNBUILT:
+                self._secret_provider = self._build_secret_provider()
+            return self._secret_provider
+
+    @property
+    def token_provider(self) -> GraphTokenProvider | TokenProviderPool | None:
+        secret_provider = self.secret_provider
+        with self._provider_lock:
+            if self._token_provider is _UNBUILT:
+                self._token_provider = self._build_token_provider(secret_provider)
+            return self._token_provider
 
     def health(self) -> dict[str, str]:
-        return {"status": "ok", "service": self.config.service_name}
+        return health_status(self.config)
 
-    def readiness(self) -> dict[str, str]:
-        return {"status": "ready", "environment": self.config.environment}
+    def readiness(self) -> dict[str, Any]:
+        return readiness_status(
+            self.config, self.prewarmer.state(), self.readiness_monitor.snapshot()
+        )
+
+    def slo_report(self) -> dict[str, dict[str, Any]]:
+        """Per-stage latency against the contract's budgets, overall and per tenant."""
+        return self.slo.report() if self.slo is not None else {}
 
     def discover_tools(self) -> list[dict[str, Any]]:
+        return tool_catalog()
+
+    def delta_sync_states(
+        self, *, tenant_id: str | None = None, requester_id: str | None = None
+    ) -> list[dict[str, Any]]:
         return [
             {
-                "name": tool.name,
-                "description": tool.description,
-                "input_schema": tool.input_schema,
+                "tenant_id": state.tenant_id,
+                "requester_id": state.requester_id,
+                "resource_path": state.resource_path,
+                "complete": state.complete,
+                "updated_at_epoch": state.updated_at_epoch,
+                "sync_count": state.sync_count,
             }
-            for tool in self._tools
+            for state in self.delta_store.states(tenant_id=tenant_id, requester_id=requester_id)
         ]
 
+    def reset_delta_sync(
+        self,
+        *,
+        tenant_id: str | None = None,
+        requester_id: str | None = None,
+        resource_path: str | None = None,
+    ) -> int:
+        return self.delta_store.reset(
+            tenant_id=tenant_id, requester_id=requester_id, resource_path=resource_path
+        )
+
+    def reload_config(self, config: BrokerConfig) -> dict[str, Any]:
+        """Swap in reloadable settings from ``config`` while keeping warm caches.
+
+        Cached tokens and downstream responses are evicted only where the new allowlists
+        no longer permit them. Remembered failures in the negative cache are all dropped.
+        Changes to other settings are reported, not applied.
+        """
+        with self._reload_lock:
+            current = self.config
+            changed = [
+                name
+                for name in RELOADABLE_FIELDS
+                if getattr(config, name) != getattr(current, name)
+            ]
+            restart_required = [
+                name
+                for name in current.__dataclass_fields__
+                if name not in RELOADABLE_FIELDS and getattr(config, name) != getattr(current, name)
+            ]
+            updated = replace(current, **{name: getattr(config, name) for name in changed})
+            self._state = _RuntimeState(config=updated, policy=compile_policy(updated))
+
+            # Remembered failures may be what the new configuration fixes.
+            invalidated = {
+                "token_cache": 0,
+                "response_cache": 0,
+                "negative_cache": self.negative_cache.invalidate(),
+            }
+            if self._token_provider not in (None, _UNBUILT):
+                invalidated["token_cache"] = self._token_provider.update_allowlists(
+                    allowed_resources=updated.allowed_graph_resources,
+                    allowed_scopes=updated.allowed_scopes,
+                )
+            if isinstance(self.downstream_client, GraphResponseCache):
+                invalidated["response_cache"] = self._reload_response_cache(updated)
+
+        result = {
+            "status": "reloaded" if changed else "unchanged",
+            "policy_version": updated.policy_version,
+            "changed": changed,
+            "restart_required": restart_required,
+            "invalidated": invalidated,
+        }
+        self.metrics.increment("config.reloads", outcome=result["status"])
+        self.audit.emit(
+            config=updated,
+            event_type="config.reloaded",
+            request={},
+            trace_id="",
+            payload=result,
+        )
+        return result
+
     def execute_tool(self, tool_name: str, request: dict[str, Any]) -> dict[str, Any]:
+        return self._run_once(
+            tool_name,
+            request,
+            lambda: self._admitted(request, lambda: self._execute_tool(tool_name, request)),
+        )
+
+    def _run_once(
+        self, tool_name: str, request: dict[str, Any], run: Callable[[], dict[str, Any]]
+    ) -> dict[str, Any]:
+        """Run ``run`` once per ``(requester_id, request_id)`` and replay it to retries."""
+        key = _idempotency_key(request)
+        if self.replay_cache is None or key is None:
+            return run()
+        response, outcome = self.replay_cache.execute(
+            key,
+            request_fingerprint(tool_name, request),
+            run,
+            wait_seconds=self._queue_deadline_seconds(request),
+        )
+        if outcome == "executed":
+            return response
+        if outcome == "conflict":
+            response = self._error_response(
+                request_id=key[1],
+                code="bad_request.idempotency_conflict",
+                message="request_id was already used for a different request",
+                metadata={"request_id": key[1]},
+            )
+        elif outcome == "timeout":
+            response = self._error_response(
+                request_id=key[1],
+                code="broker.in_progress",
+                message="The original request is still running; retry later",
+                metadata={"request_id": key[1]},
+                retryable=True,
+            )
+        self.metrics.increment("idempotency.replays", outcome=outcome)
+        self.audit.emit(
+            config=self.config,
+            event_type="request.replayed",
+            request=request,
+            trace_id=str(uuid4()),
+            payload={
+                "outcome": outcome,
+                "status": response["status"],
+                "error_code": (response.get("error") or {}).get("code"),
+            },
+        )
+        return response
+
+    def _admitted(
+        self, request: dict[str, Any], run: Callable[[], dict[str, Any]]
+    ) -> dict[str, Any]:
+        try:
+            with self.admission.admit(
+                self._queue_deadline_seconds(request), self._admission_flow(request)
+            ):
+                return self._redact_response(run())
+        except AdmissionRejected as exc:
+            return self._shed_response(request, exc)
+
+    def _execute_tool(self, tool_name: str, request: dict[str, Any]) -> dict[str, Any]:
+        authorized, error_response = self._authorize(tool_name, request)
+        if error_response is not None:
+            return error_response
+
+        execution, downstream_error = self._execute_downstream(
+            request=request,
+            token_result=authorized.token_result,
+        )
+        return self._complete(request, authorized, execution, downstream_error)
+
+    def submit_tool(self, tool_name: str, request: dict[str, Any]) -> Future[dict[str, Any]]:
+        """Run ``execute_tool`` on the shared worker pool (``config.worker_threads`` threads)."""
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.config.worker_threads, thread_name_prefix="broker-worker"
+                )
+            return self._pool.submit(self.execute_tool, tool_name, request)
+
+    def shutdown(self, wait: bool = True) -> None:
+        self.reloader.stop()
+        self.readiness_monitor.stop()
+        if self.readiness_publisher is not None:
+            self.readiness_publisher.stop()
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait)
+
+    def execute_upload(
+        self, tool_name: str, request: dict[str, Any], source: UploadSource
+    ) -> dict[str, Any]:
+        """Execute an ``operation.upload`` call whose content arrives as a stream, not a file."""
+        return self._run_once(
+            tool_name,
+            request,
+            lambda: self._admitted(
+                request, lambda: self._execute_upload_stream(tool_name, request, source)
+            ),
+        )
+
+    def _execute_upload_stream(
+        self, tool_name: str, request: dict[str, Any], source: UploadSource
+    ) -> dict[str, Any]:
+        authorized, error_response = self._authorize(tool_name, request, streamed_upload=True)
+        if error_response is not None:
+            return error_response
+
+        execution, downstream_error = self._execute_downstream(
+            request=request,
+            token_result=authorized.token_result,
+            upload_source=source,
+        )
+        return self._complete(request, authorized, execution, downstream_error)
+
+    def stream_tool(self, tool_name: str, request: dict[str, Any]) -> Iterator[dict[str, Any]]:
+        """Execute a tool call, yielding ``partial`` page envelopes before the final response.
+
+        Non-paginated operations yield only the final response. The admission slot is held
+        until the stream is exhausted or closed.
+        """
+        try:
+            with self.admission.admit(
+                self._queue_deadline_seconds(request), self._admission_flow(request)
+            ):
+                for response in self._stream_tool(tool_name, request):
+                    yield self._redact_response(response)
+        except AdmissionRejected as exc:
+            yield self._shed_response(request, exc)
+
+    def _stream_tool(self, tool_name: str, request: dict[str, Any]) -> Iterator[dict[str, Any]]:
+        authorized, error_response = self._authorize(tool_name, request)
+        if error_response is not None:
+            yield error_response
+            return
+
+        operation = request["operation"]
+        if (
+            not operation.get("paginate")
+            or operation.get("delta")
+            or self.downstream_client is None
+            or authorized.token_result is None
+        ):
+            execution, downstream_error = self._execute_downstream(
+                request=request,
+                token_result=authorized.token_result,
+            )
+            yield self._complete(request, authorized, execution, downstream_error)
+            return
+
+        stream = self._page_stream(request, authorized.token_result)
+        first_request_id = None
+        last_status = 200
+        try:
+            for index, page in enumerate(stream):
+                first_request_id = first_request_id or page.provider_request_id
+                last_status = page.status
+                yield {
+                    "contract_version": self.config.contract_version,
+                    "request_id": authorized.request_id,
+                    "status": "partial",
+                    "result": {
+                        "page": {
+                            "index": index,
+                            "provider_request_id": page.provider_request_id,
+                            "http_status": page.status,
+                            "response_body": page.body,
+                        }
+                    },
+                }
+        except GraphDownstreamError as exc:
+            yield self._complete(request, authorized, None, exc)
+            return
+
+        execution = {
+            "mode": "broker_downstream_execution",
+            "provider": "microsoft_graph",
+            "provider_request_id": first_request_id or str(uuid4()),
+            "http_status": last_status,
+            "response_headers": {},
+            "response_body": None,
+            "pagination": _pagination_summary(stream),
+        }
+        yield self._complete(request, authorized, execution, None)
+
+    def _authorize(
+        self, tool_name: str, request: dict[str, Any], *, streamed_upload: bool = False
+    ) -> tuple[_AuthorizedRequest | None, dict[str, Any] | None]:
         request_id = str(request.get("request_id", ""))
         if tool_name != TOOL_NAME:
-            return self._error_response(
+            return None, self._error_response(
                 request_id=request_id,
                 code="bad_request.unsupported_operation",
                 message="Unsupported tool name",
                 metadata={"tool_name": tool_name},
             )
 
-        validation_error = self._validate_request(request)
+        validation_error = self._validate_request(request, streamed_upload=streamed_upload)
         if validation_error is not None:
-            return validation_error
+            return None, validation_error
 
         trace_id = str(uuid4())
-        self.audit.emit(
-            config=self.config,
-            event_type="request.received",
-            request=request,
-            trace_id=trace_id,
-            payload={
+        audit = self.audit.trail(config=self.config, request=request, trace_id=trace_id)
+        audit.record(
+            "request.received",
+            {
                 "tool_name": tool_name,
                 "contract_version": request["contract_version"],
                 "tenant_id": request["graph"].get("tenant_id", ""),
@@ -94,13 +498,10 @@ class MCPAuthBrokerServer:
             },
         )
 
-        policy_decision = evaluate_policy(request, self.config)
-        self.audit.emit(
-            config=self.config,
-            event_type="policy.decided",
-            request=request,
-            trace_id=trace_id,
-            payload={
+        policy_decision = self._state.policy.evaluate(request)
+        audit.record(
+            "policy.decided",
+            {
                 "decision": policy_decision.decision,
                 "reason": policy_decision.reason,
                 "policy_version": policy_decision.metadata["policy_version"],
@@ -115,55 +516,78 @@ class MCPAuthBrokerServer:
                 message="Access denied by policy",
                 metadata={"reason_code": policy_decision.reason},
             )
-            self.audit.emit(
-                config=self.config,
-                event_type="result.emitted",
-                request=request,
-                trace_id=trace_id,
-                payload={
+            audit.record(
+                "result.emitted",
+                {
                     "status": "error",
                     "error_code": response["error"]["code"],
                     "duration_ms": 0,
                 },
             )
-            return response
+            return None, response
 
         token_result, token_error = self._resolve_graph_token(
             request_id=request_id,
             graph=request["graph"],
         )
         if token_error is not None:
-            self.audit.emit(
-                config=self.config,
-                event_type="result.emitted",
-                request=request,
-                trace_id=trace_id,
-                payload={
+            audit.record(
+                "result.emitted",
+                {
                     "status": "error",
                     "error_code": token_error["error"]["code"],
                     "duration_ms": 0,
                 },
                 redactions=[{"field": "error.metadata.secret_value", "reason": "sensitive"}],
             )
-            return token_error
+            return None, token_error
 
-        self.audit.emit(
-            config=self.config,
-            event_type="provider.called",
-            request=request,
+        return _AuthorizedRequest(
+            request_id=request_id,
             trace_id=trace_id,
-            payload={
+            policy_decision=policy_decision,
+            token_result=token_result,
+            audit=audit,
+        ), None
+
+    def _complete(
+        self,
+        request: dict[str, Any],
+        authorized: _AuthorizedRequest,
+        execution: dict[str, Any] | None,
+        downstream_error: GraphDownstreamError | None,
+    ) -> dict[str, Any]:
+        authorized.audit.record(
+            "provider.called",
+            {
                 "provider": "microsoft_graph",
                 "operation": request["operation"],
                 "timeout_ms": request.get("timeout_ms", self.config.default_timeout_ms),
                 "attempt": 1,
-                "outcome": "success",
+                "outcome": _provider_outcome(downstream_error),
             },
         )
+        if downstream_error is not None:
+            response = self._error_response(
+                request_id=authorized.request_id,
+                code=downstream_error.code,
+                message=downstream_error.message,
+                metadata={"tenant_id": request["graph"].get("tenant_id", "")},
+            )
+            authorized.audit.record(
+                "result.emitted",
+                {
+                    "status": "error",
+                    "error_code": downstream_error.code,
+                    "duration_ms": 0,
+                },
+            )
+            return response
 
+        policy_decision = authorized.policy_decision
         response = {
             "contract_version": self.config.contract_version,
-            "request_id": request_id,
+            "request_id": authorized.request_id,
             "status": "ok",
             "result": {
                 "policy": {
@@ -171,30 +595,18 @@ class MCPAuthBrokerServer:
                     "reason": policy_decision.reason,
                     "metadata": policy_decision.metadata,
                 },
-                "execution": {
-                    "mode": "broker_downstream_execution",
-                    "provider": "microsoft_graph",
-                    "provider_request_id": str(uuid4()),
-                    "http_status": 200,
-                    "response_headers": {},
-                    "response_body": {
-                        "ok": True,
-                        "token_metadata": token_result,
-                    },
-                },
+                "execution": execution,
                 "redactions": [],
             },
         }
-        self.audit.emit(
-            config=self.config,
-            event_type="result.emitted",
-            request=request,
-            trace_id=trace_id,
-            payload={"status": "ok", "error_code": None, "duration_ms": 0},
+        authorized.audit.record(
+            "result.emitted", {"status": "ok", "error_code": None, "duration_ms": 0}
         )
         return response
 
-    def _validate_request(self, request: dict[str, Any]) -> dict[str, Any] | None:
+    def _validate_request(
+        self, request: dict[str, Any], *, streamed_upload: bool = False
+    ) -> dict[str, Any] | None:
         allowed_top_level_fields = {
             "contract_version",
             "request_id",
@@ -245,8 +657,101 @@ class MCPAuthBrokerServer:
                 metadata={"timeout_ms": timeout},
             )
 
+        operation = request["operation"]
+        if not isinstance(operation, dict):
+            return self._error_response(
+                request_id=str(request.get("request_id", "")),
+                code="bad_request.invalid_field",
+                message="operation must be an object",
+                metadata={"fields": ["operation"]},
+            )
+        try:
+            normalize_forward_headers(operation.get("headers"))
+        except ValueError:
+            return self._error_response(
+                request_id=str(request.get("request_id", "")),
+                code="bad_request.invalid_field",
+                message="Unsupported operation headers",
+                metadata={"fields": ["operation.headers"]},
+            )
+
+        invalid_paging_fields = _invalid_paging_fields(operation)
+        if invalid_paging_fields:
+            return self._error_response(
+                request_id=str(request.get("request_id", "")),
+                code="bad_request.invalid_field",
+                message="Invalid pagination settings",
+                metadata={"fields": invalid_paging_fields},
+            )
+
+        invalid_upload_fields = _invalid_upload_fields(operation, streamed_upload)
+        upload = operation.get("upload")
+        if (
+            not invalid_upload_fields
+            and isinstance(upload, dict)
+            and "source_path" in upload
+            and self._upload_source_path(upload["source_path"]) is None
+        ):
+            invalid_upload_fields = ["operation.upload.source_path"]
+        if invalid_upload_fields:
+            return self._error_response(
+                request_id=str(request.get("request_id", "")),
+                code="bad_request.invalid_field",
+                message="Invalid upload settings",
+                metadata={"fields": invalid_upload_fields},
+            )
+
         return None
 
+    def _redact_response(self, response: dict[str, Any]) -> dict[str, Any]:
+        redacted, found = self.response_redactor.redact(response)
+        if not found:
+            return redacted
+        # Successful responses list redactions under ``result``; others at the top level.
+        holder = redacted["result"] if "redactions" in redacted.get("result", {}) else redacted
+        holder["redactions"] = [*holder.get("redactions", []), *found]
+        return redacted
+
+    def _queue_deadline_seconds(self, request: dict[str, Any]) -> float:
+        timeout_ms = request.get("timeout_ms")
+        if not isinstance(timeout_ms, int) or isinstance(timeout_ms, bool) or timeout_ms <= 0:
+            timeout_ms = self.config.default_timeout_ms
+        return timeout_ms / 1000
+
+    def _admission_flow(self, request: dict[str, Any]) -> tuple[str, str]:
+        requester = request.get("requester")
+        requester_id = requester.get("requester_id") if isinstance(requester, dict) else None
+        tenant_id = ""
+        if self.config.admission_fair_key == "requester_tenant":
+            graph = request.get("graph")
+            tenant_id = graph.get("tenant_id") if isinstance(graph, dict) else None
+        return str(requester_id or ""), str(tenant_id or "")
+
+    def _shed_response(
+        self, request: dict[str, Any], rejected: AdmissionRejected
+    ) -> dict[str, Any]:
+        self.metrics.increment("admission.shed", reason=rejected.reason)
+        payload = {
+            "reason": rejected.reason,
+            "queue_ms": rejected.queue_ms,
+            "in_flight": self.admission.in_flight,
+            "queue_depth": self.admission.queue_depth,
+        }
+        self.audit.emit(
+            config=self.config,
+            event_type="request.shed",
+            request=request,
+            trace_id=str(uuid4()),
+            payload=payload,
+        )
+        return self._error_response(
+            request_id=str(request.get("request_id", "")),
+            code="broker.overloaded",
+            message="Broker is overloaded; retry later",
+            metadata={"reason": rejected.reason, "queue_ms": rejected.queue_ms},
+            retryable=True,
+        )
+
     def _error_response(
         self,
         *,
@@ -254,6 +759,7 @@ class MCPAuthBrokerServer:
         code: str,
         message: str,
         metadata: dict[str, Any],
+        retryable: bool = False,
     ) -> dict[str, Any]:
         return {
             "contract_version": self.config.contract_version,
@@ -262,7 +768,7 @@ class MCPAuthBrokerServer:
             "error": {
                 "code": code,
                 "message": message,
-                "retryable": False,
+                "retryable": retryable,
                 "category": code.split(".")[0],
                 "metadata": metadata,
             },
@@ -270,27 +776,395 @@ class MCPAuthBrokerServer:
         }
 
     def _build_secret_provider(self) -> SecretProvider | None:
+        provider: SecretProvider
         if self.config.secret_provider_mode == "1password":
-            return OnePasswordSecretProvider()
-        return None
+            provider = CircuitBreakingSecretProvider(
+                self._timed_secrets(OnePasswordSecretProvider()),
+                self._build_circuit_breaker("1password"),
+            )
+        elif self.config.secret_provider_mode == "connect":
+            provider = CircuitBreakingSecretProvider(
+                self._timed_secrets(
+                    OnePasswordConnectSecretProvider(self.config.secret_connect_url)
+                ),
+                self._build_circuit_breaker("1password"),
+            )
+        elif self.config.secret_provider_mode == "file":
+            provider = self._timed_secrets(FileSecretProvider(self.config.secret_file_root))
+        else:
+            return None
+        return NegativeCachingSecretProvider(provider, self.negative_cache)
 
-    def _build_token_provider(self) -> GraphTokenProvider | None:
-        if (
-            self.secret_provider is None
-            or self.config.graph_secret_reference is None
-            or not self.config.graph_client_id
-        ):
+    def _timed_secrets(self, provider: SecretProvider) -> SecretProvider:
+        # Timed innermost, so circuit-open and negative-cache rejections are not samples.
+        return provider if self.slo is None else SloTimedSecretProvider(provider, self.slo)
+
+    def _build_token_provider(
+        self, secret_provider: SecretProvider | None
+    ) -> GraphTokenProvider | TokenProviderPool | None:
+        if secret_provider is None:
+            return None
+        if self.config.credential_registry_path:
+            return TokenProviderPool(
+                registry=CredentialRegistry.from_file(self.config.credential_registry_path),
+                factory=lambda credential: self._build_credential_token_provider(
+                    secret_provider, credential
+                ),
+                idle_seconds=self.config.credential_idle_seconds,
+            )
+        if self.config.graph_secret_reference is None or not self.config.graph_client_id:
             return None
+        return self._build_credential_token_provider(
+            secret_provider,
+            Credential(
+                client_id=self.config.graph_client_id,
+                secret_reference=self.config.graph_secret_reference,
+            ),
+        )
 
+    def _build_credential_token_provider(
+        self, secret_provider: SecretProvider, credential: Credential
+    ) -> GraphTokenProvider:
         return GraphTokenProvider(
-            client_id=self.config.graph_client_id,
-            secret_reference=self.config.graph_secret_reference,
-            secret_provider=self.secret_provider,
+            client_id=credential.client_id,
+            secret_reference=credential.secret_reference,
+            secret_provider=secret_provider,
+            mint_client=CircuitBreakingMintClient(
+                HttpGraphTokenMintClient()
+                if self.slo is None
+                else SloTimedMintClient(HttpGraphTokenMintClient(), self.slo),
+                self._build_circuit_breaker("token_endpoint"),
+            ),
+            cache=self._build_token_cache(),
             allowed_resources=self.config.allowed_graph_resources,
             allowed_scopes=self.config.allowed_scopes,
             cache_skew_seconds=self.config.token_cache_skew_seconds,
             max_ttl_seconds=self.config.token_max_ttl_seconds,
             timeout_seconds=self.config.token_provider_timeout_seconds,
+            rate_limiter=MintRateLimiter(
+                rate_per_second=self.config.mint_rate_per_second,
+                burst=self.config.mint_burst,
+            ),
+            negative_cache=self.negative_cache,
+        )
+
+    def _build_downstream_client(self) -> GraphDownstreamClient | None:
+        if self.config.downstream_mode != "graph":
+            return None
+        client: GraphDownstreamClient = HttpGraphDownstreamClient(
+            max_response_bytes=self.config.downstream_max_response_bytes,
+            metrics=self.metrics,
+        )
+        if self.slo is not None:
+            client = SloTimedDownstreamClient(client, self.slo)
+        if self.config.graph_batch_window_ms > 0:
+            client = GraphBatchCoalescer(
+                client, window_seconds=self.config.graph_batch_window_ms / 1000
+            )
+        if self.config.response_cache_max_bytes > 0:
+            client = GraphResponseCache(
+                client,
+                max_bytes=self.config.response_cache_max_bytes,
+                max_age_by_prefix=self.config.response_cache_max_age,
+            )
+        return client
+
+    def _readiness_checks(
+        self, *, probe_secrets: bool, probe_tokens: bool
+    ) -> dict[str, DependencyCheck]:
+        config = self.config
+        if config.readiness_interval_seconds <= 0 or config.secret_provider_mode == "none":
+            return {}
+        checks: dict[str, DependencyCheck] = {}
+        if probe_secrets:
+            checks["secret_provider"] = self._check_secret_provider
+        has_credentials = config.credential_registry_path or (
+            config.graph_secret_reference is not None and config.graph_client_id
+        )
+        if probe_tokens and has_credentials:
+            checks["token_endpoint"] = self._check_token_endpoint
+            checks["token_cache"] = self._check_token_cache
+        return checks
+
+    def _check_secret_provider(self) -> dict[str, Any]:
+        self.secret_provider.check()
+        return {"mode": self.config.secret_provider_mode}
+
+    def _check_token_endpoint(self) -> None:
+        HttpGraphTokenMintClient().check(timeout_seconds=self.config.token_provider_timeout_seconds)
+
+    def _check_token_cache(self) -> dict[str, Any]:
+        if self.config.token_cache_backend != "network" or not self.config.token_cache_address:
+            return {"backend": "memory"}
+        # A dedicated connection, so probes never wait behind token traffic.
+        if self._cache_probe is None:
+            host, port = self.config.token_cache_address
+            self._cache_probe = NetworkTokenCacheBackend(
+                host=host, port=port, key=self.config.token_cache_key
+            )
+        if not self._cache_probe.ping():
+            raise ConnectionError("token cache store unreachable")
+        return {"backend": "network"}
+
+    def _build_circuit_breaker(self, dependency: str) -> CircuitBreaker:
+        return CircuitBreaker(
+            dependency=dependency,
+            failure_threshold=self.config.circuit_failure_threshold,
+            reset_timeout_seconds=self.config.circuit_reset_timeout_seconds,
+            on_state_change=self._on_circuit_state_change,
+        )
+
+    def _on_circuit_state_change(
+        self, dependency: str, key: str, previous_state: str, new_state: str
+    ) -> None:
+        self.metrics.increment(
+            "circuit_breaker.transitions", dependency=dependency, state=new_state
+        )
+        self.metrics.set_gauge(
+            "circuit_breaker.open",
+            1 if new_state == "open" else 0,
+            dependency=dependency,
+            key=key,
+        )
+        self.audit.emit(
+            config=self.config,
+            event_type="circuit.state_changed",
+            request={},
+            trace_id="",
+            payload={
+                "dependency": dependency,
+                "key": key,
+                "previous_state": previous_state,
+                "state": new_state,
+            },
+        )
+
+    def _on_prewarm_failure(self, tenant_id: str, scopes: tuple[str, ...], code: str) -> None:
+        self.metrics.increment("prewarm.failures", tenant=tenant_id, code=code)
+        self.audit.emit(
+            config=self.config,
+            event_type="token.prewarm_failed",
+            request={},
+            trace_id="",
+            payload={"tenant_id": tenant_id, "scopes": list(scopes), "error_code": code},
+        )
+
+    def _on_slo_breach(self, stage: str, tenant_id: str, ratio: float, breached: bool) -> None:
+        self.metrics.set_gauge("slo.budget_breached", int(breached), stage=stage, tenant=tenant_id)
+        if breached:
+            self.metrics.increment("slo.breaches", stage=stage, tenant=tenant_id)
+        self.audit.emit(
+            config=self.config,
+            event_type="slo.budget_breached" if breached else "slo.budget_recovered",
+            request={},
+            trace_id="",
+            payload={
+                "stage": stage,
+                "tenant_id": tenant_id,
+                "budget_ms": dict(self.config.slo_budgets_ms)[stage],
+                "violation_ratio": ratio,
+                "trigger_ratio": VIOLATION_RATIO_TRIGGER,
+                "window_seconds": self.config.slo_window_seconds,
+            },
+        )
+
+    def _build_token_cache(self) -> TokenCacheBackend:
+        if self.config.token_cache_backend == "network" and self.config.token_cache_address:
+            host, port = self.config.token_cache_address
+            return NetworkTokenCacheBackend(
+                host=host,
+                port=port,
+                key=self.config.token_cache_key,
+                l1_ttl_seconds=self.config.token_cache_l1_ttl_seconds,
+            )
+        return GraphTokenCache()
+
+    def _execute_downstream(
+        self,
+        *,
+        request: dict[str, Any],
+        token_result: TokenResult | None,
+        upload_source: UploadSource | None = None,
+    ) -> tuple[dict[str, Any] | None, GraphDownstreamError | None]:
+        if self.downstream_client is None or token_result is None:
+            return {
+                "mode": "broker_downstream_execution",
+                "provider": "microsoft_graph",
+                "provider_request_id": str(uuid4()),
+                "http_status": 200,
+                "response_headers": {},
+                "response_body": {
+                    "ok": True,
+                    "token_metadata": token_result.metadata if token_result else None,
+                },
+            }, None
+
+        if "upload" in request["operation"]:
+            return self._execute_upload(
+                request=request, token_result=token_result, source=upload_source
+            )
+        if request["operation"].get("delta"):
+            return self._execute_delta(request=request, token_result=token_result)
+        if request["operation"].get("paginate"):
+            return self._execute_paginated(request=request, token_result=token_result)
+
+        try:
+            downstream_response = self.downstream_client.send(
+                self._graph_request(request, token_result)
+            )
+        except GraphDownstreamError as exc:
+            return None, exc
+
+        return {
+            "mode": "broker_downstream_execution",
+            "provider": "microsoft_graph",
+            "provider_request_id": downstream_response.provider_request_id,
+            "http_status": downstream_response.status,
+            "response_headers": {
+                name: value
+                for name, value in downstream_response.headers.items()
+                if name in RESPONSE_HEADER_ALLOWLIST
+            },
+            "response_body": downstream_response.body,
+            **downstream_response.annotations,
+        }, None
+
+    def _execute_paginated(
+        self,
+        *,
+        request: dict[str, Any],
+        token_result: TokenResult,
+    ) -> tuple[dict[str, Any] | None, GraphDownstreamError | None]:
+        # Non-streaming callers get one bounded body; stream_tool emits pages instead.
+        stream = self._page_stream(request, token_result)
+        items: list[Any] = []
+        first_request_id = None
+        last_status = 200
+        try:
+            for page in stream:
+                first_request_id = first_request_id or page.provider_request_id
+                last_status = page.status
+                if isinstance(page.body, dict) and isinstance(page.body.get("value"), list):
+                    items.extend(page.body["value"])
+        except GraphDownstreamError as exc:
+            return None, exc
+
+        return {
+            "mode": "broker_downstream_execution",
+            "provider": "microsoft_graph",
+            "provider_request_id": first_request_id or str(uuid4()),
+            "http_status": last_status,
+            "response_headers": {},
+            "response_body": {"value": items},
+            "pagination": _pagination_summary(stream),
+        }, None
+
+    def _execute_delta(
+        self,
+        *,
+        request: dict[str, Any],
+        token_result: TokenResult,
+    ) -> tuple[dict[str, Any] | None, GraphDownstreamError | None]:
+        operation = request["operation"]
+        try:
+            result = run_delta_query(
+                self.downstream_client,
+                self.delta_store,
+                self._graph_request(request, token_result),
+                max_pages=operation.get("max_pages", DEFAULT_MAX_PAGES),
+                max_items=operation.get("max_items", DEFAULT_MAX_ITEMS),
+            )
+        except GraphDownstreamError as exc:
+            return None, exc
+
+        return {
+            "mode": "broker_downstream_execution",
+            "provider": "microsoft_graph",
+            "provider_request_id": result.provider_request_id or str(uuid4()),
+            "http_status": result.http_status,
+            "response_headers": {},
+            "response_body": {"value": result.items},
+            "delta": result.summary,
+        }, None
+
+    def _execute_upload(
+        self,
+        *,
+        request: dict[str, Any],
+        token_result: TokenResult,
+        source: UploadSource | None,
+    ) -> tuple[dict[str, Any] | None, GraphDownstreamError | None]:
+        upload = request["operation"]["upload"]
+        try:
+            if source is None:
+                source = FileUploadSource(self._upload_source_path(upload["source_path"]) or "")
+            result = run_upload_session(
+                self.downstream_client,
+                self.upload_transport,
+                self._graph_request(request, token_result),
+                source,
+                chunk_size=upload.get("chunk_size", DEFAULT_CHUNK_SIZE),
+                read_ahead_chunks=self.config.upload_read_ahead_chunks,
+            )
+        except GraphDownstreamError as exc:
+            return None, exc
+        except OSError:
+            return None, GraphDownstreamError("provider.bad_response", "upload source unreadable")
+
+        return {
+            "mode": "broker_downstream_execution",
+            "provider": "microsoft_graph",
+            "provider_request_id": result.provider_request_id or str(uuid4()),
+            "http_status": result.http_status,
+            "response_headers": {},
+            "response_body": result.body,
+            "upload": result.summary,
+        }, None
+
+    def _reload_response_cache(self, config: BrokerConfig) -> int:
+        cache = self.downstream_client
+        cache.set_max_age_by_prefix(config.response_cache_max_age)
+        resources = frozenset(config.allowed_graph_resources)
+        scopes = frozenset(canonical_scopes(config.allowed_scopes))
+        return cache.invalidate(
+            lambda key: key[0] not in resources or not scopes.issuperset(key[2])
+        )
+
+    def _upload_source_path(self, source_path: str) -> str | None:
+        # Only files beneath the configured root may be read; symlinks are resolved first.
+        if not self.config.upload_source_root:
+            return None
+        root = os.path.realpath(self.config.upload_source_root)
+        resolved = os.path.realpath(os.path.join(root, source_path))
+        if os.path.commonpath([root, resolved]) != root or not os.path.isfile(resolved):
+            return None
+        return resolved
+
+    def _page_stream(self, request: dict[str, Any], token_result: TokenResult) -> PageStream:
+        operation = request["operation"]
+        return PageStream(
+            self.downstream_client,
+            self._graph_request(request, token_result),
+            max_pages=operation.get("max_pages", DEFAULT_MAX_PAGES),
+            max_items=operation.get("max_items", DEFAULT_MAX_ITEMS),
+        )
+
+    def _graph_request(self, request: dict[str, Any], token_result: TokenResult) -> GraphRequest:
+        graph = request["graph"]
+        operation = request["operation"]
+        timeout_ms = request.get("timeout_ms", self.config.default_timeout_ms)
+        scopes = graph.get("scopes") if isinstance(graph.get("scopes"), list) else []
+        return GraphRequest(
+            tenant_id=str(graph.get("tenant_id") or ""),
+            requester_id=str(request["requester"].get("requester_id") or ""),
+            scopes=tuple(str(scope) for scope in scopes),
+            resource=str(graph.get("resource") or ""),
+            access_token=token_result.token,
+            method=str(operation.get("method") or "GET").upper(),
+            path=str(operation.get("path") or ""),
+            headers=normalize_forward_headers(operation.get("headers")),
+            body=operation.get("body"),
+            timeout_seconds=min(timeout_ms, DOWNSTREAM_TIMEOUT_MS) / 1000,
         )
 
     def _resolve_graph_token(
@@ -298,7 +1172,7 @@ class MCPAuthBrokerServer:
         *,
         request_id: str,
         graph: dict[str, Any],
-    ) -> tuple[dict[str, Any] | None, dict[str, Any] | None]:
+    ) -> tuple[TokenResult | None, dict[str, Any] | None]:
         if self.token_provider is None:
             return None, None
 
@@ -313,7 +1187,7 @@ class MCPAuthBrokerServer:
                 resource=resource,
                 scopes=scopes,
             )
-            return token_result.metadata, None
+            return token_result, None
         except GraphTokenProviderError as exc:
             metadata: dict[str, Any] = {
                 "tenant_id": tenant_id,
@@ -324,6 +1198,8 @@ class MCPAuthBrokerServer:
                 metadata["reason_code"] = "policy.rule.deny.provider.not_permitted"
             if exc.code == "policy.invalid_scope":
                 metadata["reason_code"] = "policy.rule.deny.scope.not_permitted"
+            if exc.retry_after_seconds is not None:
+                metadata["retry_after_seconds"] = round(exc.retry_after_seconds, 3)
 
             return None, self._error_response(
                 request_id=request_id,
@@ -331,3 +1207,76 @@ class MCPAuthBrokerServer:
                 message=exc.message,
                 metadata=metadata,
             )
+
+
+def _provider_outcome(error: GraphDownstreamError | None) -> str:
+    if error is None:
+        return "success"
+    if error.code == "provider.timeout":
+        return "timeout"
+    return "error"
+
+
+def _pagination_summary(stream: PageStream) -> dict[str, Any]:
+    return {
+        "pages": stream.pages,
+        "items": stream.items,
+        "truncated": stream.truncated,
+        "next_link": stream.next_link if stream.truncated else None,
+    }
+
+
+def _invalid_paging_fields(operation: dict[str, Any]) -> list[str]:
+    paging_flags = [flag for flag in ("paginate", "delta") if flag in operation]
+    if not paging_flags:
+        return []
+    invalid = []
+    for flag in paging_flags:
+        if not isinstance(operation[flag], bool):
+            invalid.append(f"operation.{flag}")
+    enabled = any(operation[flag] is True for flag in paging_flags)
+    if enabled and str(operation.get("method") or "GET").upper() != "GET":
+        invalid.append("operation.method")
+    for field_name, limit in (("max_pages", MAX_PAGES_LIMIT), ("max_items", MAX_ITEMS_LIMIT)):
+        value = operation.get(field_name, 1)
+        if isinstance(value, bool) or not isinstance(value, int) or not 1 <= value <= limit:
+            invalid.append(f"operation.{field_name}")
+    return invalid
+
+
+def _invalid_upload_fields(operation: dict[str, Any], streamed_upload: bool) -> list[str]:
+    if "upload" not in operation:
+        return ["operation.upload"] if streamed_upload else []
+    upload = operation["upload"]
+    if not isinstance(upload, dict) or set(upload) - {"source_path", "chunk_size"}:
+        return ["operation.upload"]
+    invalid = []
+    if str(operation.get("method") or "GET").upper() != "POST":
+        invalid.append("operation.method")
+    if not str(operation.get("path") or "").endswith("/createUploadSession"):
+        invalid.append("operation.path")
+    source_path = upload.get("source_path")
+    if streamed_upload == ("source_path" in upload) or (
+        source_path is not None and not isinstance(source_path, str)
+    ):
+        invalid.append("operation.upload.source_path")
+    chunk_size = upload.get("chunk_size", DEFAULT_CHUNK_SIZE)
+    if (
+        isinstance(chunk_size, bool)
+        or not isinstance(chunk_size, int)
+        or not CHUNK_ALIGNMENT <= chunk_size <= MAX_CHUNK_SIZE
+        or chunk_size % CHUNK_ALIGNMENT
+    ):
+        invalid.append("operation.upload.chunk_size")
+    return invalid
+
+
+def _idempotency_key(request: dict[str, Any]) -> tuple[str, str] | None:
+    requester = request.get("requester")
+    requester_id = requester.get("requester_id") if isinstance(requester, dict) else None
+    request_id = request.get("request_id")
+    if not isinstance(requester_id, str) or not isinstance(request_id, str):
+        return None
+    if not requester_id or not request_id:
+        return None
+    return requester_id, request_id
@@ -0,0 +1,285 @@
+from __future__ import annotations
+
+import math
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from collections.abc import Callable, Mapping
+from typing import Any
+
+from .downstream import GraphDownstreamClient, GraphRequest, GraphResponse
+from .graph_tokens import GraphTokenMintClient
+from .secrets import SecretProvider, SecretReference
+
+# Per-attempt budgets from docs/spec/non-functional-contracts.md.
+DEFAULT_LATENCY_BUDGETS_MS = {"secret": 1500, "mint": 3000, "downstream": 4000}
+# Revisit trigger: a stage breaking its budget in more than 5% of requests.
+VIOLATION_RATIO_TRIGGER = 0.05
+# Fewer samples than this in the window never raise a signal.
+MIN_SAMPLES = 20
+ALL_TENANTS = "*"
+
+# Log-scale buckets: bucket ``i`` holds latencies up to ``_GROWTH ** i`` ms, so quantiles are
+# within 15% of the true value from 1ms up to several minutes.
+_GROWTH = 1.15
+_LOG_GROWTH = math.log(_GROWTH)
+_BUCKETS = 96
+
+BreachCallback = Callable[[str, str, float, bool], None]
+
+
+class LatencyWindow:
+    """Sliding-window latency histogram with a budget-violation count.
+
+    The window is a ring of ``slices`` fixed-size histograms, each covering
+    ``window_seconds / slices``; the oldest slice is cleared and reused as time advances, so
+    memory does not grow with the number of samples.
+    """
+
+    __slots__ = (
+        "budget_ms",
+        "slice_seconds",
+        "_epochs",
+        "_counts",
+        "_totals",
+        "_over",
+        "_epoch",
+        "_samples",
+        "_violations",
+    )
+
+    def __init__(self, *, budget_ms: float, window_seconds: float, slices: int) -> None:
+        self.budget_ms = budget_ms
+        self.slice_seconds = window_seconds / slices
+        self._epochs = [-1] * slices
+        self._counts = [array("I", bytes(4 * _BUCKETS)) for _ in range(slices)]
+        self._totals = [0] * slices
+        self._over = [0] * slices
+        # Window totals as of slice ``_epoch``, kept current so the hot path never re-sums.
+        self._epoch = -1
+        self._samples = 0
+        self._violations = 0
+
+    def record(self, latency_ms: float, now: float) -> None:
+        epoch = self._advance(now)
+        slot = epoch % len(self._epochs)
+        if self._epochs[slot] != epoch:
+            # The slot holds a slice that already left the window; reuse it.
+            self._epochs[slot] = epoch
+            self._counts[slot] = array("I", bytes(4 * _BUCKETS))
+            self._totals[slot] = 0
+            self._over[slot] = 0
+        self._counts[slot][_bucket(latency_ms)] += 1
+        self._totals[slot] += 1
+        self._samples += 1
+        if latency_ms > self.budget_ms:
+            self._over[slot] += 1
+            self._violations += 1
+
+    def totals(self, now: float) -> tuple[int, int]:
+        """Return ``(samples, budget violations)`` inside the window."""
+        self._advance(now)
+        return self._samples, self._violations
+
+    def quantile(self, q: float, now: float) -> float | None:
+        live = self._live(now)
+        samples = sum(self._totals[slot] for slot in live)
+        if not samples:
+            return None
+        rank = max(1, math.ceil(q * samples))
+        seen = 0
+        for bucket in range(_BUCKETS):
+            seen += sum(self._counts[slot][bucket] for slot in live)
+            if seen >= rank:
+                return round(_GROWTH**bucket, 1)
+        return round(_GROWTH ** (_BUCKETS - 1), 1)
+
+    def _advance(self, now: float) -> int:
+        epoch = int(now // self.slice_seconds)
+        if epoch != self._epoch:
+            self._epoch = epoch
+            live = self._live(now)
+            self._samples = sum(self._totals[slot] for slot in live)
+            self._violations = sum(self._over[slot] for slot in live)
+        return epoch
+
+    def _live(self, now: float) -> list[int]:
+        oldest = int(now // self.slice_seconds) - len(self._epochs)
+        return [slot for slot, epoch in enumerate(self._epochs) if epoch > oldest]
+
+
+def _bucket(latency_ms: float) -> int:
+    if latency_ms <= 1:
+        return 0
+    return min(_BUCKETS - 1, math.ceil(math.log(latency_ms) / _LOG_GROWTH))
+
+
+class SloTracker:
+    """Tracks per-stage latency against its budget, overall and per tenant.
+
+    ``on_breach(stage, tenant_id, ratio, breached)`` fires when a window's violation ratio
+    crosses ``VIOLATION_RATIO_TRIGGER`` in either direction; ``tenant_id`` is
+    ``ALL_TENANTS`` for the stage as a whole. At most ``max_tenants`` tenants are tracked
+    per stage, least recently seen first out.
+    """
+
+    def __init__(
+        self,
+        *,
+        budgets_ms: Mapping[str, float] = DEFAULT_LATENCY_BUDGETS_MS,
+        window_seconds: float = 300,
+        slices: int = 6,
+        max_tenants: int = 256,
+        on_breach: BreachCallback | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.budgets_ms = dict(budgets_ms)
+        self.window_seconds = window_seconds
+        self.slices = slices
+        self.max_tenants = max_tenants
+        self.on_breach = on_breach
+        self._clock = clock
+        self._windows: dict[str, OrderedDict[str, LatencyWindow]] = {
+            stage: OrderedDict() for stage in self.budgets_ms
+        }
+        self._breached: set[tuple[str, str]] = set()
+        self._lock = threading.Lock()
+
+    def observe(self, stage: str, tenant_id: str, seconds: float) -> None:
+        windows = self._windows.get(stage)
+        if windows is None:
+            return
+        now = self._clock()
+        latency_ms = seconds * 1000
+        transitions = []
+        with self._lock:
+            keys = (ALL_TENANTS, tenant_id) if tenant_id else (ALL_TENANTS,)
+            for key in keys:
+                window = windows.get(key)
+                if window is None:
+                    window = windows[key] = LatencyWindow(
+                        budget_ms=self.budgets_ms[stage],
+                        window_seconds=self.window_seconds,
+                        slices=self.slices,
+                    )
+                    if len(windows) > self.max_tenants + 1:
+                        self._evict(stage, windows)
+                else:
+                    windows.move_to_end(key)
+                window.record(latency_ms, now)
+                transition = self._update_breach(stage, key, window, now)
+                if transition is not None:
+                    transitions.append(transition)
+        if self.on_breach is not None:
+            for transition in transitions:
+                self.on_breach(*transition)
+
+    def report(self) -> dict[str, dict[str, Any]]:
+        """Summarize every stage, with per-tenant entries for tenants seen in the window."""
+        now = self._clock()
+        with self._lock:
+            return {
+                stage: {
+                    "budget_ms": self.budgets_ms[stage],
+                    **self._summary(stage, ALL_TENANTS, windows.get(ALL_TENANTS), now),
+                    "tenants": {
+                        key: self._summary(stage, key, window, now)
+                        for key, window in windows.items()
+                        if key != ALL_TENANTS and window.totals(now)[0]
+                    },
+                }
+                for stage, windows in self._windows.items()
+            }
+
+    def _summary(
+        self, stage: str, key: str, window: LatencyWindow | None, now: float
+    ) -> dict[str, Any]:
+        samples, violations = window.totals(now) if window is not None else (0, 0)
+        return {
+            "samples": samples,
+            "violation_ratio": round(violations / samples, 4) if samples else 0.0,
+            "breached": (stage, key) in self._breached,
+            "p50_ms": window.quantile(0.5, now) if window is not None else None,
+            "p95_ms": window.quantile(0.95, now) if window is not None else None,
+            "p99_ms": window.quantile(0.99, now) if window is not None else None,
+        }
+
+    def _update_breach(
+        self, stage: str, key: str, window: LatencyWindow, now: float
+    ) -> tuple[str, str, float, bool] | None:
+        samples, violations = window.totals(now)
+        ratio = violations / samples
+        breached = samples >= MIN_SAMPLES and ratio > VIOLATION_RATIO_TRIGGER
+        if breached == ((stage, key) in self._breached):
+            return None
+        if breached:
+            self._breached.add((stage, key))
+        else:
+            self._breached.discard((stage, key))
+        return stage, key, round(ratio, 4), breached
+
+    def _evict(self, stage: str, windows: OrderedDict[str, LatencyWindow]) -> None:
+        for key in windows:
+            if key != ALL_TENANTS:
+                del windows[key]
+                self._breached.discard((stage, key))
+                return
+
+
+class SloTimedSecretProvider:
+    """Times secret resolution for the ``secret`` stage; references carry no tenant."""
+
+    def __init__(self, inner: SecretProvider, tracker: SloTracker) -> None:
+        self.inner = inner
+        self.tracker = tracker
+
+    def resolve(self, reference: SecretReference) -> str:
+        started = time.perf_counter()
+        try:
+            return self.inner.resolve(reference)
+        finally:
+            self.tracker.observe("secret", "", time.perf_counter() - started)
+
+    def check(self) -> None:
+        self.inner.check()
+
+
+class SloTimedMintClient:
+    def __init__(self, inner: GraphTokenMintClient, tracker: SloTracker) -> None:
+        self.inner = inner
+        self.tracker = tracker
+
+    def mint(
+        self,
+        *,
+        tenant_id: str,
+        client_id: str,
+        client_secret: str,
+        scope: str,
+        timeout_seconds: int,
+    ) -> tuple[str, str, int]:
+        started = time.perf_counter()
+        try:
+            return self.inner.mint(
+                tenant_id=tenant_id,
+                client_id=client_id,
+                client_secret=client_secret,
+                scope=scope,
+                timeout_seconds=timeout_seconds,
+            )
+        finally:
+            self.tracker.observe("mint", tenant_id, time.perf_counter() - started)
+
+
+class SloTimedDownstreamClient:
+    def __init__(self, inner: GraphDownstreamClient, tracker: SloTracker) -> None:
+        self.inner = inner
+        self.tracker = tracker
+
+    def send(self, request: GraphRequest) -> GraphResponse:
+        started = time.perf_counter()
+        try:
+            return self.inner.send(request)
+        finally:
+            self.tracker.observe("downstream", request.tenant_id, time.perf_counter() - started)
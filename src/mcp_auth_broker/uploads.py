@@ -0,0 +1,285 @@
+from __future__ import annotations
+
+import json
+import os
+import queue
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass, replace
+from typing import Any, Protocol
+
+from .downstream import GraphDownstreamClient, GraphDownstreamError, GraphRequest
+from .graph_tokens import parse_retry_after
+
+# Graph requires upload ranges in multiples of 320 KiB, up to 60 MiB per request.
+CHUNK_ALIGNMENT = 320 * 1024
+MAX_CHUNK_SIZE = 60 * 1024 * 1024
+DEFAULT_CHUNK_SIZE = 10 * CHUNK_ALIGNMENT
+
+
+class UploadSource(Protocol):
+    total_size: int
+
+    def chunks(self, chunk_size: int) -> Iterator[bytes]: ...
+
+
+class FileUploadSource:
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.total_size = os.path.getsize(path)
+
+    def chunks(self, chunk_size: int) -> Iterator[bytes]:
+        with open(self.path, "rb") as handle:
+            while chunk := handle.read(chunk_size):
+                yield chunk
+
+
+class StreamUploadSource:
+    """Re-frames an incoming byte stream (for example MCP chunks) into fixed-size ranges."""
+
+    def __init__(self, parts: Iterable[bytes], total_size: int) -> None:
+        self.parts = parts
+        self.total_size = total_size
+
+    def chunks(self, chunk_size: int) -> Iterator[bytes]:
+        buffer = bytearray()
+        for part in self.parts:
+            buffer.extend(part)
+            while len(buffer) >= chunk_size:
+                yield bytes(buffer[:chunk_size])
+                del buffer[:chunk_size]
+        if buffer:
+            yield bytes(buffer)
+
+
+class UploadTransport(Protocol):
+    def put_range(
+        self, url: str, data: bytes, *, start: int, total: int, timeout_seconds: float
+    ) -> tuple[int, Any]: ...
+
+    def status(self, url: str, *, timeout_seconds: float) -> tuple[int, Any]: ...
+
+
+class HttpUploadTransport:
+    """Sends ranges to the pre-authenticated upload URL; no bearer token is attached.
+
+    Throttling and server errors (408, 429, 5xx) raise ``GraphDownstreamError`` carrying the
+    response's ``Retry-After``; other statuses are returned to the caller.
+    """
+
+    def put_range(
+        self, url: str, data: bytes, *, start: int, total: int, timeout_seconds: float
+    ) -> tuple[int, Any]:
+        request = urllib.request.Request(
+            url,
+            data=data,
+            method="PUT",
+            headers={
+                "content-length": str(len(data)),
+                "content-range": f"bytes {start}-{start + len(data) - 1}/{total}",
+            },
+        )
+        return self._send(request, timeout_seconds)
+
+    def status(self, url: str, *, timeout_seconds: float) -> tuple[int, Any]:
+        return self._send(urllib.request.Request(url, method="GET"), timeout_seconds)
+
+    def _send(self, request: urllib.request.Request, timeout_seconds: float) -> tuple[int, Any]:
+        try:
+            with urllib.request.urlopen(request, timeout=timeout_seconds) as response:
+                return response.status, _json_or_none(response.read())
+        except urllib.error.HTTPError as exc:
+            if exc.code in (408, 429) or exc.code >= 500:
+                raise GraphDownstreamError(
+                    "provider.rate_limited" if exc.code == 429 else "provider.unavailable",
+                    f"upload endpoint returned {exc.code}",
+                    retry_after_seconds=parse_retry_after(
+                        exc.headers.get("Retry-After") if exc.headers else None
+                    ),
+                ) from exc
+            return exc.code, _json_or_none(exc.read() if exc.fp else b"")
+        except TimeoutError as exc:
+            raise GraphDownstreamError("provider.timeout", "upload range timed out") from exc
+        except urllib.error.URLError as exc:
+            raise GraphDownstreamError(
+                "provider.unavailable", "upload endpoint unavailable"
+            ) from exc
+
+
+@dataclass(frozen=True)
+class UploadResult:
+    http_status: int
+    body: Any
+    provider_request_id: str
+    summary: dict[str, Any]
+
+
+def run_upload_session(
+    client: GraphDownstreamClient,
+    transport: UploadTransport,
+    create_request: GraphRequest,
+    source: UploadSource,
+    *,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    read_ahead_chunks: int = 4,
+    max_retries: int = 3,
+    backoff_seconds: float = 0.5,
+    max_backoff_seconds: float = 30.0,
+    sleep: Callable[[float], None] = time.sleep,
+) -> UploadResult:
+    """Create a Graph upload session and stream ``source`` into it range by range.
+
+    A reader thread keeps up to ``read_ahead_chunks`` ranges buffered while the
+    current range is in flight, so memory is bounded by
+    ``(read_ahead_chunks + 1) * chunk_size``. Ranges are sent in order, as Graph
+    upload sessions require. A failed range is retried, up to ``max_retries`` times
+    per range, from whatever offset the session reports in ``nextExpectedRanges``.
+    Before each retry it waits for the endpoint's ``Retry-After``, or else an exponential
+    backoff from ``backoff_seconds`` with jitter; a wait longer than
+    ``max_backoff_seconds`` fails the upload instead.
+    """
+    session = client.send(
+        replace(
+            create_request,
+            method="POST",
+            body=create_request.body or {"item": {"@microsoft.graph.conflictBehavior": "replace"}},
+        )
+    )
+    upload_url = session.body.get("uploadUrl") if isinstance(session.body, dict) else None
+    if session.status not in (200, 201) or not isinstance(upload_url, str):
+        raise GraphDownstreamError("provider.bad_response", "upload session was not created")
+    if not upload_url.startswith("https://"):
+        raise GraphDownstreamError("provider.bad_response", "upload URL must use https")
+
+    offset = 0
+    chunks_sent = 0
+    retries = 0
+    status, body = 0, None
+    for chunk in _read_ahead(source.chunks(chunk_size), read_ahead_chunks):
+        chunk_start = offset
+        range_retries = 0
+        while True:
+            try:
+                status, body = transport.put_range(
+                    upload_url,
+                    chunk,
+                    start=chunk_start,
+                    total=source.total_size,
+                    timeout_seconds=create_request.timeout_seconds,
+                )
+                if status in (200, 201, 202):
+                    break
+                if status < 500 and status not in (408, 429):
+                    raise GraphDownstreamError("provider.bad_response", "upload range was rejected")
+                retry_after = None
+            except GraphDownstreamError as exc:
+                if exc.code == "provider.bad_response" or range_retries >= max_retries:
+                    raise
+                retry_after = exc.retry_after_seconds
+            else:
+                if range_retries >= max_retries:
+                    raise GraphDownstreamError("provider.unavailable", "upload range failed")
+            if retry_after is not None and retry_after > max_backoff_seconds:
+                raise GraphDownstreamError(
+                    "provider.rate_limited",
+                    "upload endpoint asked to wait too long",
+                    retry_after_seconds=retry_after,
+                )
+            sleep(
+                retry_after
+                if retry_after is not None
+                else _backoff(range_retries, backoff_seconds, max_backoff_seconds)
+            )
+            range_retries += 1
+            retries += 1
+            expected = _next_expected_offset(transport, upload_url, create_request)
+            if expected is None or expected < chunk_start or expected > chunk_start + len(chunk):
+                raise GraphDownstreamError("provider.unavailable", "upload session lost progress")
+            if expected == chunk_start + len(chunk):
+                status, body = 202, None
+                break
+            chunk = chunk[expected - chunk_start :]
+            chunk_start = expected
+        offset = chunk_start + len(chunk)
+        chunks_sent += 1
+
+    if status not in (200, 201):
+        raise GraphDownstreamError("provider.bad_response", "upload session did not complete")
+    return UploadResult(
+        http_status=status,
+        body=body,
+        provider_request_id=session.provider_request_id,
+        summary={"bytes": offset, "chunks": chunks_sent, "retries": retries},
+    )
+
+
+def _backoff(attempt: int, base_seconds: float, max_seconds: float) -> float:
+    # Exponential with "equal jitter": at least half the step, so retries never bunch at zero.
+    step = min(max_seconds, base_seconds * 2**attempt)
+    return step / 2 + random.uniform(0, step / 2)
+
+
+def _read_ahead(chunks: Iterator[bytes], depth: int) -> Iterator[bytes]:
+    buffered: queue.Queue[Any] = queue.Queue(maxsize=max(1, depth))
+    done = object()
+    stop = threading.Event()
+
+    def _put(item: Any) -> bool:
+        # Never block forever: the consumer may have stopped reading.
+        while not stop.is_set():
+            try:
+                buffered.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _reader() -> None:
+        try:
+            for chunk in chunks:
+                if not _put(chunk):
+                    return
+            _put(done)
+        except BaseException as exc:  # surfaced to the consumer below
+            _put(exc)
+
+    threading.Thread(target=_reader, name="upload-read-ahead", daemon=True).start()
+    try:
+        while True:
+            item = buffered.get()
+            if item is done:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stop.set()
+
+
+def _next_expected_offset(
+    transport: UploadTransport, upload_url: str, create_request: GraphRequest
+) -> int | None:
+    try:
+        status, body = transport.status(upload_url, timeout_seconds=create_request.timeout_seconds)
+    except GraphDownstreamError:
+        return None
+    if status != 200 or not isinstance(body, dict):
+        return None
+    ranges = body.get("nextExpectedRanges") or []
+    if not ranges:
+        return None
+    start = str(ranges[0]).split("-", 1)[0]
+    return int(start) if start.isdigit() else None
+
+
+def _json_or_none(payload: bytes) -> Any:
+    if not payload:
+        return None
+    try:
+        return json.loads(payload)
+    except ValueError:
+        return None
@@ -0,0 +1,233 @@
+import threading
+import time
+from dataclasses import replace
+
+import pytest
+
+from mcp_auth_broker import MCPAuthBrokerServer
+from mcp_auth_broker.admission import AdmissionController, AdmissionRejected
+from mcp_auth_broker.audit import AuditEmitter
+from mcp_auth_broker.config import BrokerConfig
+from mcp_auth_broker.graph_tokens import GraphTokenCache, GraphTokenProvider
+from mcp_auth_broker.metrics import MetricsRegistry
+from mcp_auth_broker.secrets import SecretReference
+from mcp_auth_broker.server import TOOL_NAME
+
+
+def _controller(**overrides) -> AdmissionController:
+    settings = {
+        "max_in_flight": 1,
+        "max_queue": 4,
+        "target_seconds": 0.01,
+        "interval_seconds": 0.02,
+    }
+    settings.update(overrides)
+    return AdmissionController(**settings)
+
+
+def _hold_slot(controller: AdmissionController, release: threading.Event) -> threading.Event:
+    admitted = threading.Event()
+
+    def _run() -> None:
+        with controller.admit(5):
+            admitted.set()
+            release.wait(5)
+
+    threading.Thread(target=_run, daemon=True).start()
+    assert admitted.wait(5)
+    return admitted
+
+
+def _queue_behind(controller: AdmissionController, deadline: float = 5, hold: float = 0) -> list:
+    outcome: list = []
+
+    def _run() -> None:
+        try:
+            with controller.admit(deadline):
+                outcome.append("admitted")
+                time.sleep(hold)
+        except AdmissionRejected as exc:
+            outcome.append(exc.reason)
+
+    thread = threading.Thread(target=_run, daemon=True)
+    thread.start()
+    outcome.append(thread)
+    return outcome
+
+
+def _wait_for_queue(controller: AdmissionController, depth: int) -> None:
+    deadline = time.monotonic() + 5
+    while controller.queue_depth != depth and time.monotonic() < deadline:
+        time.sleep(0.001)
+    assert controller.queue_depth == depth
+
+
+def test_admission_rejects_when_queue_is_full_and_sheds_past_deadline():
+    controller = _controller(max_queue=1, target_seconds=1, interval_seconds=1)
+    release = threading.Event()
+    _hold_slot(controller, release)
+
+    queued = _queue_behind(controller, deadline=0.05)
+    _wait_for_queue(controller, 1)
+    with pytest.raises(AdmissionRejected) as full:
+        with controller.admit(5):
+            pass
+    queued[0].join(5)
+    release.set()
+
+    assert full.value.reason == "queue_full"
+    assert queued[1:] == ["deadline"]
+    assert controller.queue_depth == 0
+
+
+def test_admission_drops_queued_requests_after_sustained_queue_delay():
+    controller = _controller()
+    release = threading.Event()
+    _hold_slot(controller, release)
+    first = _queue_behind(controller, hold=0.03)
+    _wait_for_queue(controller, 1)
+    second = _queue_behind(controller)
+    _wait_for_queue(controller, 2)
+    third = _queue_behind(controller)
+    _wait_for_queue(controller, 3)
+
+    time.sleep(0.03)
+    release.set()
+    for queued in (first, second, third):
+        queued[0].join(5)
+
+    # The first waiter starts the interval; once it elapses, waiters over target are dropped.
+    assert first[1:] == ["admitted"]
+    assert second[1:] == ["queue_delay"]
+    assert third[1:] == ["queue_delay"]
+    # An admission without queueing ends the dropping state.
+    with controller.admit(5):
+        assert controller.in_flight == 1
+    assert controller.in_flight == 0
+
+
+def test_admission_serves_requesters_fairly_and_reports_per_requester_waits():
+    metrics = MetricsRegistry()
+    controller = _controller(max_queue=8, target_seconds=10, interval_seconds=10, metrics=metrics)
+    release = threading.Event()
+    _hold_slot(controller, release)
+    admitted: list[str] = []
+    threads = []
+    for index, requester_id in enumerate(["noisy"] * 4 + ["quiet"]):
+
+        def _run(name: str = f"{requester_id}-{index}", flow=(requester_id, "")) -> None:
+            with controller.admit(5, flow):
+                admitted.append(name)
+
+        threads.append(threading.Thread(target=_run, daemon=True))
+        threads[-1].start()
+        _wait_for_queue(controller, index + 1)
+
+    assert controller.flow_depth(("noisy", "")) == 4
+    assert metrics.gauge("admission.queue_depth", requester="quiet", tenant="") == 1
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert admitted == ["noisy-0", "quiet-4", "noisy-1", "noisy-2", "noisy-3"]
+    assert metrics.counter("admission.dequeued", requester="noisy", tenant="") == 4
+    assert metrics.counter("admission.queue_wait_ms", requester="quiet", tenant="") > 0
+    assert metrics.gauge("admission.queue_depth", requester="noisy", tenant="") == 0
+
+
+class _FakeSecretProvider:
+    def resolve(self, reference: SecretReference) -> str:
+        return "secret"
+
+
+class _BlockingMintClient:
+    def __init__(self) -> None:
+        self.entered = threading.Event()
+        self.release = threading.Event()
+
+    def mint(self, *, tenant_id, client_id, client_secret, scope, timeout_seconds):
+        self.entered.set()
+        self.release.wait(5)
+        return "token-abc", "Bearer", 3600
+
+
+def _config() -> BrokerConfig:
+    config = BrokerConfig(
+        environment="test",
+        service_name="mcp-auth-broker",
+        contract_version="v0.1.0",
+        policy_version="v0.1.0",
+        default_timeout_ms=10000,
+        allowed_scopes=("User.Read",),
+        secret_provider_mode="none",
+        graph_secret_reference=None,
+        graph_client_id="",
+        allowed_graph_resources=("https://graph.microsoft.com",),
+        token_cache_skew_seconds=60,
+        token_max_ttl_seconds=3000,
+        token_provider_timeout_seconds=4,
+    )
+    return replace(config, admission_max_in_flight=1, admission_max_queue=0)
+
+
+def _request(request_id: str) -> dict:
+    return {
+        "contract_version": "v0.1.0",
+        "request_id": request_id,
+        "requester": {"requester_id": "user-1", "identity_assurance": "verified"},
+        "graph": {
+            "tenant_id": "tenant-1",
+            "resource": "https://graph.microsoft.com",
+            "scopes": ["User.Read"],
+        },
+        "operation": {"action": "downstream_call", "method": "GET", "path": "/v1.0/me"},
+    }
+
+
+def test_config_requires_spare_workers_for_the_admission_queue():
+    config = BrokerConfig.from_env(
+        {
+            "MCP_AUTH_BROKER_WORKER_THREADS": "8",
+            "MCP_AUTH_BROKER_ADMISSION_MAX_IN_FLIGHT": "6",
+        }
+    )
+    assert config.admission_max_in_flight == 6
+    with pytest.raises(ValueError, match="WORKER_THREADS"):
+        BrokerConfig.from_env(
+            {
+                "MCP_AUTH_BROKER_WORKER_THREADS": "8",
+                "MCP_AUTH_BROKER_ADMISSION_MAX_IN_FLIGHT": "8",
+            }
+        )
+
+
+def test_server_sheds_overload_with_retryable_error_metric_and_audit_event():
+    mint_client = _BlockingMintClient()
+    audit = AuditEmitter(emit_to_stdout=False)
+    server = MCPAuthBrokerServer(
+        config=_config(),
+        audit=audit,
+        token_provider=GraphTokenProvider(
+            client_id="client-1",
+            secret_reference=SecretReference.parse("op://vault/item/field"),
+            secret_provider=_FakeSecretProvider(),
+            mint_client=mint_client,
+            cache=GraphTokenCache(),
+        ),
+    )
+    first = server.submit_tool(TOOL_NAME, _request("req-1"))
+    try:
+        assert mint_client.entered.wait(5)
+        shed = server.execute_tool(TOOL_NAME, _request("req-2"))
+    finally:
+        mint_client.release.set()
+        server.shutdown()
+
+    assert first.result(5)["status"] == "ok"
+    assert shed["error"]["code"] == "broker.overloaded"
+    assert shed["error"]["retryable"] is True
+    assert shed["error"]["metadata"]["reason"] == "queue_full"
+    assert server.metrics.counter("admission.shed", reason="queue_full") == 1
+    shed_events = [event for event in audit.events if event["event_type"] == "request.shed"]
+    assert shed_events[0]["request_id"] == "req-2"
+    assert shed_events[0]["payload"]["in_flight"] == 1
@@ -0,0 +1,95 @@
+from dataclasses import replace
+
+from mcp_auth_broker import MCPAuthBrokerServer
+from mcp_auth_broker.audit import AuditEmitter
+from mcp_auth_broker.config import BrokerConfig
+from mcp_auth_broker.server import TOOL_NAME
+
+_LIFECYCLE = ["request.received", "policy.decided", "provider.called", "result.emitted"]
+
+
+def _config(**overrides) -> BrokerConfig:
+    config = BrokerConfig(
+        environment="test",
+        service_name="mcp-auth-broker",
+        contract_version="v0.1.0",
+        policy_version="v0.1.0",
+        default_timeout_ms=10000,
+        allowed_scopes=("User.Read",),
+        secret_provider_mode="none",
+        graph_secret_reference=None,
+        graph_client_id="",
+        allowed_graph_resources=("https://graph.microsoft.com",),
+        token_cache_skew_seconds=60,
+        token_max_ttl_seconds=3000,
+        token_provider_timeout_seconds=4,
+        audit_mode="compact",
+    )
+    return replace(config, **overrides)
+
+
+def _request(scope: str = "User.Read") -> dict:
+    return {
+        "contract_version": "v0.1.0",
+        "request_id": "req-123",
+        "requester": {"requester_id": "user-1", "identity_assurance": "verified"},
+        "graph": {
+            "tenant_id": "tenant-1",
+            "resource": "https://graph.microsoft.com",
+            "scopes": [scope],
+        },
+        "operation": {"action": "downstream_call", "method": "GET", "path": "/v1.0/me"},
+    }
+
+
+def test_compact_mode_emits_one_event_carrying_every_stage_payload():
+    audit = AuditEmitter(emit_to_stdout=False)
+    server = MCPAuthBrokerServer(config=_config(), audit=audit)
+
+    response = server.execute_tool(TOOL_NAME, _request())
+
+    assert response["status"] == "ok"
+    assert [event["event_type"] for event in audit.events] == ["request.completed"]
+    event = audit.events[0]
+    assert event["request_id"] == "req-123"
+    assert event["requester_id"] == "user-1"
+    assert list(event["payload"]) == _LIFECYCLE
+    assert event["payload"]["request.received"]["requested_scopes"] == ["User.Read"]
+    assert event["payload"]["policy.decided"]["decision"] == "allow"
+    assert event["payload"]["provider.called"]["outcome"] == "success"
+    assert event["payload"]["result.emitted"] == {
+        "status": "ok",
+        "error_code": None,
+        "duration_ms": 0,
+    }
+
+
+def test_compact_mode_expands_failed_flows_into_separate_events():
+    audit = AuditEmitter(emit_to_stdout=False)
+    server = MCPAuthBrokerServer(config=_config(), audit=audit)
+
+    server.execute_tool(TOOL_NAME, _request("Mail.Read"))
+
+    assert [event["event_type"] for event in audit.events] == [
+        "request.received",
+        "policy.decided",
+        "result.emitted",
+    ]
+    assert len({event["trace_id"] for event in audit.events}) == 1
+    occurred = [event["occurred_at"] for event in audit.events]
+    assert occurred == sorted(occurred)
+
+
+def test_compact_mode_can_consolidate_failed_flows_too():
+    audit = AuditEmitter(emit_to_stdout=False)
+    server = MCPAuthBrokerServer(
+        config=_config(audit_expand_failures=False),
+        audit=audit,
+    )
+
+    server.execute_tool(TOOL_NAME, _request("Mail.Read"))
+
+    assert [event["event_type"] for event in audit.events] == ["request.completed"]
+    payload = audit.events[0]["payload"]
+    assert payload["policy.decided"]["decision"] == "deny"
+    assert payload["result.emitted"]["error_code"] == "policy.denied"
@@ -0,0 +1,220 @@
+import pytest
+
+from mcp_auth_broker import MCPAuthBrokerServer
+from mcp_auth_broker.audit import AuditEmitter
+from mcp_auth_broker.circuit import CircuitBreaker, CircuitBreakingMintClient
+from mcp_auth_broker.circuit import CircuitBreakingSecretProvider
+from mcp_auth_broker.graph_tokens import GraphTokenCache, GraphTokenProvider
+from mcp_auth_broker.graph_tokens import GraphTokenProviderError
+from mcp_auth_broker.secrets import SecretProviderError, SecretReference
+from mcp_auth_broker.config import BrokerConfig
+
+_REFERENCE = SecretReference.parse("op://vault/item/field")
+
+
+def _config() -> BrokerConfig:
+    return BrokerConfig(
+        environment="test",
+        service_name="mcp-auth-broker",
+        contract_version="v0.1.0",
+        policy_version="v0.1.0",
+        default_timeout_ms=10000,
+        allowed_scopes=("User.Read",),
+        secret_provider_mode="none",
+        graph_secret_reference=None,
+        graph_client_id="",
+        allowed_graph_resources=("https://graph.microsoft.com",),
+        token_cache_skew_seconds=60,
+        token_max_ttl_seconds=3000,
+        token_provider_timeout_seconds=4,
+    )
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class _FlakySecretProvider:
+    def __init__(self) -> None:
+        self.calls = 0
+        self.healthy = False
+
+    def resolve(self, reference):
+        self.calls += 1
+        if not self.healthy:
+            raise SecretProviderError(code="secret.timeout", message="secret provider timed out")
+        return "secret"
+
+
+class _ScriptedMintClient:
+    def __init__(self) -> None:
+        self.calls = 0
+        self.error_code: str | None = None
+
+    def mint(self, *, tenant_id, client_id, client_secret, scope, timeout_seconds):
+        self.calls += 1
+        if self.error_code is not None:
+            raise GraphTokenProviderError(self.error_code, "failed")
+        return "token-abc", "Bearer", 3600
+
+
+def _expect_secret_error(provider) -> str:
+    try:
+        provider.resolve(_REFERENCE)
+    except SecretProviderError as exc:
+        return exc.code
+    raise AssertionError("expected secret provider error")
+
+
+def test_breaker_opens_fails_fast_and_recovers_through_half_open():
+    clock = _Clock()
+    transitions = []
+    breaker = CircuitBreaker(
+        dependency="1password",
+        failure_threshold=2,
+        reset_timeout_seconds=10,
+        clock=clock,
+        on_state_change=lambda *args: transitions.append(args[2:]),
+    )
+    inner = _FlakySecretProvider()
+    provider = CircuitBreakingSecretProvider(inner, breaker)
+
+    assert _expect_secret_error(provider) == "secret.timeout"
+    assert _expect_secret_error(provider) == "secret.timeout"
+    assert _expect_secret_error(provider) == "secret.unavailable"
+    assert inner.calls == 2
+    assert breaker.state(_REFERENCE.to_uri()) == "open"
+
+    clock.now = 11
+    inner.healthy = True
+    assert provider.resolve(_REFERENCE) == "secret"
+
+    assert breaker.state(_REFERENCE.to_uri()) == "closed"
+    assert transitions == [("closed", "open"), ("open", "half_open"), ("half_open", "closed")]
+
+
+def test_breaker_ignores_deterministic_failures():
+    breaker = CircuitBreaker(dependency="token_endpoint", failure_threshold=1)
+    inner = _ScriptedMintClient()
+    inner.error_code = "provider.auth_failed"
+    client = CircuitBreakingMintClient(inner, breaker)
+
+    for _ in range(3):
+        try:
+            client.mint(
+                tenant_id="tenant-1",
+                client_id="client-1",
+                client_secret="secret",
+                scope="User.Read",
+                timeout_seconds=1,
+            )
+        except GraphTokenProviderError as exc:
+            assert exc.code == "provider.auth_failed"
+
+    assert inner.calls == 3
+    assert breaker.state("tenant-1") == "closed"
+
+
+def test_unexpected_error_during_half_open_probe_releases_the_probe_slot():
+    clock = _Clock()
+    breaker = CircuitBreaker(
+        dependency="token_endpoint", failure_threshold=1, reset_timeout_seconds=10, clock=clock
+    )
+    inner = _ScriptedMintClient()
+    client = CircuitBreakingMintClient(inner, breaker)
+
+    def _mint() -> None:
+        client.mint(
+            tenant_id="tenant-1",
+            client_id="client-1",
+            client_secret="secret",
+            scope="User.Read",
+            timeout_seconds=1,
+        )
+
+    inner.error_code = "provider.timeout"
+    with pytest.raises(GraphTokenProviderError):
+        _mint()
+    assert breaker.state("tenant-1") == "open"
+
+    clock.now = 11
+    inner.mint = lambda **kwargs: {}["missing"]
+    with pytest.raises(KeyError):
+        _mint()
+    assert breaker.state("tenant-1") == "open"
+
+    clock.now = 22
+    inner = _ScriptedMintClient()
+    client.inner = inner
+    _mint()
+    assert inner.calls == 1
+    assert breaker.state("tenant-1") == "closed"
+
+
+def test_open_mint_breaker_serves_cached_token_per_tenant():
+    breaker = CircuitBreaker(dependency="token_endpoint", failure_threshold=1)
+    inner = _ScriptedMintClient()
+    provider = GraphTokenProvider(
+        client_id="client-1",
+        secret_reference=_REFERENCE,
+        secret_provider=CircuitBreakingSecretProvider(_FlakySecretProvider(), breaker),
+        mint_client=CircuitBreakingMintClient(inner, breaker),
+        cache=GraphTokenCache(),
+    )
+    provider.secret_provider.inner.healthy = True
+    provider.get_token(
+        tenant_id="tenant-1",
+        resource="https://graph.microsoft.com",
+        scopes=["User.Read"],
+        now_epoch=1000,
+    )
+    inner.error_code = "provider.unavailable"
+
+    first = provider.get_token(
+        tenant_id="tenant-1",
+        resource="https://graph.microsoft.com",
+        scopes=["User.Read"],
+        force_refresh=True,
+        now_epoch=1010,
+    )
+    second = provider.get_token(
+        tenant_id="tenant-1",
+        resource="https://graph.microsoft.com",
+        scopes=["User.Read"],
+        force_refresh=True,
+        now_epoch=1020,
+    )
+
+    assert first.metadata["source"] == "cache_fallback"
+    assert second.metadata["source"] == "cache_fallback"
+    assert inner.calls == 2
+    assert breaker.state("tenant-1") == "open"
+    assert breaker.state("tenant-2") == "closed"
+
+
+def test_server_reports_breaker_transitions_in_audit_and_metrics():
+    audit = AuditEmitter(emit_to_stdout=False)
+    server = MCPAuthBrokerServer(config=_config(), audit=audit)
+    breaker = server._build_circuit_breaker("token_endpoint")
+
+    for _ in range(server.config.circuit_failure_threshold):
+        breaker.record_failure("tenant-1")
+
+    assert audit.events[-1]["event_type"] == "circuit.state_changed"
+    assert audit.events[-1]["payload"] == {
+        "dependency": "token_endpoint",
+        "key": "tenant-1",
+        "previous_state": "closed",
+        "state": "open",
+    }
+    assert server.metrics.gauge("circuit_breaker.open", dependency="token_endpoint", key="tenant-1")
+    assert (
+        server.metrics.counter(
+            "circuit_breaker.transitions", dependency="token_endpoint", state="open"
+        )
+        == 1
+    )
@@ -0,0 +1,101 @@
+import json
+import threading
+import time
+from collections import Counter, defaultdict
+
+from mcp_auth_broker import MCPAuthBrokerServer
+from mcp_auth_broker.audit import AuditEmitter
+from mcp_auth_broker.config import BrokerConfig
+from mcp_auth_broker.graph_tokens import GraphTokenCache, GraphTokenProvider
+from mcp_auth_broker.secrets import SecretReference
+from mcp_auth_broker.server import TOOL_NAME
+
+_LIFECYCLE = ["request.received", "policy.decided", "provider.called", "result.emitted"]
+
+
+class _FakeSecretProvider:
+    def resolve(self, reference: SecretReference) -> str:
+        return "secret"
+
+
+class _SlowMintClient:
+    def __init__(self) -> None:
+        self.calls = Counter()
+        self.lock = threading.Lock()
+
+    def mint(self, *, tenant_id, client_id, client_secret, scope, timeout_seconds):
+        time.sleep(0.02)
+        with self.lock:
+            self.calls[tenant_id] += 1
+        return f"token-{tenant_id}", "Bearer", 3600
+
+
+def _config() -> BrokerConfig:
+    return BrokerConfig(
+        environment="test",
+        service_name="mcp-auth-broker",
+        contract_version="v0.1.0",
+        policy_version="v0.1.0",
+        default_timeout_ms=10000,
+        allowed_scopes=("User.Read",),
+        secret_provider_mode="none",
+        graph_secret_reference=None,
+        graph_client_id="",
+        allowed_graph_resources=("https://graph.microsoft.com",),
+        token_cache_skew_seconds=60,
+        token_max_ttl_seconds=3000,
+        token_provider_timeout_seconds=4,
+        worker_threads=16,
+    )
+
+
+def _request(index: int) -> dict:
+    return {
+        "contract_version": "v0.1.0",
+        "request_id": f"req-{index}",
+        "requester": {"requester_id": f"user-{index % 7}", "identity_assurance": "verified"},
+        "graph": {
+            "tenant_id": f"tenant-{index % 4}",
+            "resource": "https://graph.microsoft.com",
+            "scopes": ["User.Read"],
+        },
+        "operation": {"action": "downstream_call", "method": "GET", "path": "/v1.0/me"},
+    }
+
+
+def test_worker_pool_keeps_audit_events_whole_and_mints_once_per_key(capsys):
+    mint_client = _SlowMintClient()
+    audit = AuditEmitter()
+    server = MCPAuthBrokerServer(
+        config=_config(),
+        audit=audit,
+        token_provider=GraphTokenProvider(
+            client_id="client-1",
+            secret_reference=SecretReference.parse("op://vault/item/field"),
+            secret_provider=_FakeSecretProvider(),
+            mint_client=mint_client,
+            cache=GraphTokenCache(stripes=4),
+        ),
+    )
+
+    try:
+        futures = [server.submit_tool(TOOL_NAME, _request(index)) for index in range(400)]
+        responses = [future.result(timeout=30) for future in futures]
+    finally:
+        server.shutdown()
+
+    assert all(response["status"] == "ok" for response in responses)
+    assert dict(mint_client.calls) == {f"tenant-{n}": 1 for n in range(4)}
+
+    lines = capsys.readouterr().out.splitlines()
+    printed = [json.loads(line) for line in lines]
+    assert len(printed) == len(audit.events) == 400 * len(_LIFECYCLE)
+    assert [event["event_id"] for event in printed] == [e["event_id"] for e in audit.events]
+
+    by_trace = defaultdict(list)
+    for event in audit.events:
+        by_trace[event["trace_id"]].append(event)
+    assert len(by_trace) == 400
+    for events in by_trace.values():
+        assert [event["event_type"] for event in events] == _LIFECYCLE
+        assert len({event["request_id"] for event in events}) == 1
@@ -0,0 +1,153 @@
+import json
+
+import pytest
+
+from mcp_auth_broker import MCPAuthBrokerServer
+from mcp_auth_broker.audit import AuditEmitter
+from mcp_auth_broker.config import BrokerConfig
+from mcp_auth_broker.credentials import Credential, CredentialRegistry, TokenProviderPool
+from mcp_auth_broker.graph_tokens import GraphTokenCache, GraphTokenProvider
+from mcp_auth_broker.graph_tokens import GraphTokenProviderError
+from mcp_auth_broker.secrets import SecretReference
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class _FakeSecretProvider:
+    def resolve(self, reference: SecretReference) -> str:
+        return f"secret-for-{reference.item}"
+
+
+class _MintClient:
+    def __init__(self) -> None:
+        self.calls: list[tuple[str, str, str]] = []
+
+    def mint(self, *, tenant_id, client_id, client_secret, scope, timeout_seconds):
+        self.calls.append((tenant_id, client_id, client_secret))
+        return f"token-{client_id}-{tenant_id}", "Bearer", 3600
+
+
+def _write_registry(tmp_path) -> str:
+    path = tmp_path / "credentials.json"
+    path.write_text(
+        json.dumps(
+            {
+                "tenant-a": {"client_id": "app-a", "secret_ref": "op://vault/app-a/secret"},
+                "*": {"client_id": "app-shared", "secret_ref": "op://vault/shared/secret"},
+            }
+        )
+    )
+    return str(path)
+
+
+def _pool(registry: CredentialRegistry, mint_client: _MintClient, clock=None):
+    def _factory(credential: Credential) -> GraphTokenProvider:
+        return GraphTokenProvider(
+            client_id=credential.client_id,
+            secret_reference=credential.secret_reference,
+            secret_provider=_FakeSecretProvider(),
+            mint_client=mint_client,
+            cache=GraphTokenCache(),
+        )
+
+    return TokenProviderPool(
+        registry=registry, factory=_factory, idle_seconds=60, clock=clock or _Clock()
+    )
+
+
+def _get(pool: TokenProviderPool, tenant_id: str):
+    return pool.get_token(
+        tenant_id=tenant_id,
+        resource="https://graph.microsoft.com",
+        scopes=["User.Read"],
+        now_epoch=1000,
+    )
+
+
+def test_registry_loads_tenants_and_wildcard_default(tmp_path):
+    registry = CredentialRegistry.from_file(_write_registry(tmp_path))
+
+    assert len(registry) == 2
+    assert registry.resolve("tenant-a").client_id == "app-a"
+    assert registry.resolve("tenant-z").client_id == "app-shared"
+    assert CredentialRegistry({}).resolve("tenant-a") is None
+
+    invalid = tmp_path / "invalid.json"
+    invalid.write_text(json.dumps({"tenant-a": {"client_id": "app-a", "secret_ref": "x"}}))
+    with pytest.raises(ValueError):
+        CredentialRegistry.from_file(str(invalid))
+
+
+def test_pool_routes_tenants_to_per_credential_providers(tmp_path):
+    mint_client = _MintClient()
+    pool = _pool(CredentialRegistry.from_file(_write_registry(tmp_path)), mint_client)
+
+    assert _get(pool, "tenant-a").token == "token-app-a-tenant-a"
+    assert _get(pool, "tenant-b").token == "token-app-shared-tenant-b"
+    assert _get(pool, "tenant-c").token == "token-app-shared-tenant-c"
+    assert _get(pool, "tenant-a").metadata["source"] == "cache"
+
+    assert len(pool) == 2
+    assert mint_client.calls == [
+        ("tenant-a", "app-a", "secret-for-app-a"),
+        ("tenant-b", "app-shared", "secret-for-shared"),
+        ("tenant-c", "app-shared", "secret-for-shared"),
+    ]
+    assert pool.provider_for("tenant-a").cache is not pool.provider_for("tenant-b").cache
+
+
+class _ClosingCache(GraphTokenCache):
+    def __init__(self) -> None:
+        super().__init__()
+        self.closed = False
+
+    def close(self) -> None:
+        self.closed = True
+
+
+def test_pool_evicts_idle_providers_and_rejects_unregistered_tenants():
+    clock = _Clock()
+    registry = CredentialRegistry(
+        {"tenant-a": Credential("app-a", SecretReference.parse("op://vault/app-a/secret"))}
+    )
+    pool = _pool(registry, _MintClient(), clock)
+    first = pool.provider_for("tenant-a")
+    first.cache = _ClosingCache()
+
+    clock.now = 30
+    assert pool.evict_idle() == 0
+    clock.now = 100
+    assert pool.evict_idle() == 1
+    assert first.cache.closed
+    second = pool.provider_for("tenant-a")
+    second.cache = _ClosingCache()
+    assert second is not first
+    clock.now = 200
+    pool.provider_for("tenant-a")
+    assert not second.cache.closed
+    with pytest.raises(GraphTokenProviderError) as exc:
+        _get(pool, "tenant-unknown")
+    assert exc.value.code == "policy.denied"
+
+
+def test_server_builds_provider_pool_from_registry_file(tmp_path):
+    config = BrokerConfig.from_env(
+        {
+            "MCP_AUTH_BROKER_SECRET_PROVIDER": "1password",
+            "MCP_AUTH_BROKER_CREDENTIAL_REGISTRY": _write_registry(tmp_path),
+        }
+    )
+    server = MCPAuthBrokerServer(
+        config=config,
+        audit=AuditEmitter(emit_to_stdout=False),
+        secret_provider=_FakeSecretProvider(),
+    )
+
+    assert isinstance(server.token_provider, TokenProviderPool)
+    assert server.token_provider.provider_for("tenant-a").client_id == "app-a"
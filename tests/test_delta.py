@@ -0,0 +1,170 @@
+from uuid import uuid4
+
+from mcp_auth_broker import MCPAuthBrokerServer
+from mcp_auth_broker.audit import AuditEmitter
+from mcp_auth_broker.config import BrokerConfig
+from mcp_auth_broker.delta import DeltaStateStore, run_delta_query
+from mcp_auth_broker.downstream import GraphRequest, GraphResponse
+from mcp_auth_broker.server import TOOL_NAME
+
+_BASE = "https://graph.microsoft.com/v1.0/users/delta"
+
+
+class _DeltaGraph:
+    """Serves a two-page initial round, then change pages keyed by delta token."""
+
+    def __init__(self) -> None:
+        self.paths: list[str] = []
+        self.expired_tokens: set[str] = set()
+        self.changes = {"t1": ["user-c"]}
+
+    def send(self, request: GraphRequest) -> GraphResponse:
+        self.paths.append(request.path)
+        if request.path == "/v1.0/users/delta":
+            body = {"value": ["user-a"], "@odata.nextLink": f"{_BASE}?$skiptoken=2"}
+        elif request.path.endswith("$skiptoken=2"):
+            body = {"value": ["user-b"], "@odata.deltaLink": f"{_BASE}?$deltatoken=t1"}
+        else:
+            token = request.path.rsplit("=", 1)[1]
+            if token in self.expired_tokens:
+                return GraphResponse(status=410, headers={}, body={}, provider_request_id="gone")
+            body = {
+                "value": self.changes.get(token, []),
+                "@odata.deltaLink": f"{_BASE}?$deltatoken=t2",
+            }
+        return GraphResponse(status=200, headers={}, body=body, provider_request_id="r")
+
+
+def _request(requester_id: str = "user-1") -> GraphRequest:
+    return GraphRequest(
+        tenant_id="tenant-1",
+        requester_id=requester_id,
+        scopes=("User.Read",),
+        resource="https://graph.microsoft.com",
+        access_token="token-abc",
+        method="GET",
+        path="/v1.0/users/delta",
+        headers={},
+        body=None,
+        timeout_seconds=1,
+    )
+
+
+def test_initial_round_then_incremental_changes_only():
+    graph = _DeltaGraph()
+    store = DeltaStateStore()
+
+    initial = run_delta_query(graph, store, _request(), max_pages=10, max_items=100)
+    incremental = run_delta_query(graph, store, _request(), max_pages=10, max_items=100)
+
+    assert initial.items == ["user-a", "user-b"]
+    assert initial.summary == {"mode": "initial", "changes": 2, "complete": True}
+    assert incremental.items == ["user-c"]
+    assert incremental.summary["mode"] == "incremental"
+    assert graph.paths[-1] == f"{_BASE}?$deltatoken=t1"
+    state = store.get("tenant-1", "user-1", "/v1.0/users/delta")
+    assert state.resume_link == f"{_BASE}?$deltatoken=t2"
+    assert state.sync_count == 2
+
+
+def test_truncated_initial_round_resumes_from_next_link():
+    graph = _DeltaGraph()
+    store = DeltaStateStore()
+
+    first = run_delta_query(graph, store, _request(), max_pages=1, max_items=100)
+    second = run_delta_query(graph, store, _request(), max_pages=1, max_items=100)
+
+    assert first.summary["complete"] is False
+    assert second.items == ["user-b"]
+    assert second.summary == {"mode": "initial", "changes": 1, "complete": True}
+
+
+def test_expired_delta_link_triggers_full_resync():
+    graph = _DeltaGraph()
+    store = DeltaStateStore()
+    run_delta_query(graph, store, _request(), max_pages=10, max_items=100)
+    graph.expired_tokens.add("t1")
+
+    result = run_delta_query(graph, store, _request(), max_pages=10, max_items=100)
+
+    assert result.items == ["user-a", "user-b"]
+    assert result.summary["resynced"] is True
+
+
+def test_state_persists_in_sqlite_file(tmp_path):
+    path = str(tmp_path / "delta.sqlite3")
+    run_delta_query(_DeltaGraph(), DeltaStateStore(path), _request(), max_pages=10, max_items=100)
+
+    reopened = DeltaStateStore(path)
+
+    assert [state.resume_link for state in reopened.states()] == [f"{_BASE}?$deltatoken=t1"]
+
+
+def _config() -> BrokerConfig:
+    return BrokerConfig(
+        environment="test",
+        service_name="mcp-auth-broker",
+        contract_version="v0.1.0",
+        policy_version="v0.1.0",
+        default_timeout_ms=10000,
+        allowed_scopes=("User.Read",),
+        secret_provider_mode="none",
+        graph_secret_reference=None,
+        graph_client_id="",
+        allowed_graph_resources=("https://graph.microsoft.com",),
+        token_cache_skew_seconds=60,
+        token_max_ttl_seconds=3000,
+        token_provider_timeout_seconds=4,
+    )
+
+
+class _TokenResult:
+    token = "token-abc"
+    metadata = {"tenant_id": "tenant-1", "source": "minted"}
+
+
+class _TokenProvider:
+    def get_token(self, *, tenant_id, resource, scopes, force_refresh=False, now_epoch=None):
+        return _TokenResult()
+
+
+def _tool_request(requester_id: str) -> dict:
+    return {
+        "contract_version": "v0.1.0",
+        "request_id": str(uuid4()),
+        "requester": {"requester_id": requester_id, "identity_assurance": "verified"},
+        "graph": {
+            "tenant_id": "tenant-1",
+            "resource": "https://graph.microsoft.com",
+            "scopes": ["User.Read"],
+        },
+        "operation": {
+            "action": "downstream_call",
+            "method": "GET",
+            "path": "/v1.0/users/delta",
+            "delta": True,
+        },
+    }
+
+
+def test_server_exposes_inspect_and_reset_of_sync_state():
+    server = MCPAuthBrokerServer(
+        config=_config(),
+        audit=AuditEmitter(emit_to_stdout=False),
+        token_provider=_TokenProvider(),
+        downstream_client=_DeltaGraph(),
+    )
+
+    first = server.execute_tool(TOOL_NAME, _tool_request("user-1"))
+    server.execute_tool(TOOL_NAME, _tool_request("user-2"))
+    repeat = server.execute_tool(TOOL_NAME, _tool_request("user-1"))
+
+    assert first["result"]["execution"]["response_body"] == {"value": ["user-a", "user-b"]}
+    assert repeat["result"]["execution"]["delta"]["mode"] == "incremental"
+    assert [state["requester_id"] for state in server.delta_sync_states()] == ["user-1", "user-2"]
+    assert "resume_link" not in server.delta_sync_states()[0]
+
+    assert server.reset_delta_sync(tenant_id="tenant-1", requester_id="user-1") == 1
+    assert [state["requester_id"] for state in server.delta_sync_states()] == ["user-2"]
+    after_reset = server.execute_tool(TOOL_NAME, _tool_request("user-1"))
+    assert after_reset["result"]["execution"]["delta"]["mode"] == "initial"
@@ -0,0 +1,216 @@
+import socketserver
+import threading
+import time
+
+import pytest
+
+from mcp_auth_broker.distributed_cache import NetworkTokenCacheBackend
+from mcp_auth_broker.distributed_cache import TokenCacheCipher, TokenCacheCipherError
+from mcp_auth_broker.graph_tokens import GraphTokenProvider, canonical_scopes
+from mcp_auth_broker.secrets import SecretReference
+
+_KEY = b"0123456789abcdef0123456789abcdef"
+
+
+class _StandInStore(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), _StandInHandler)
+        self.values: dict[str, tuple[str, float]] = {}
+        self.lock = threading.Lock()
+
+    def live(self, key: str) -> str | None:
+        entry = self.values.get(key)
+        if entry is None or entry[1] <= time.monotonic():
+            return None
+        return entry[0]
+
+
+class _StandInHandler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        store = self.server
+        for raw in self.rfile:
+            parts = raw.decode("ascii").split()
+            command, key = parts[0], parts[1]
+            with store.lock:
+                if command == "GET":
+                    value = store.live(key)
+                    reply = "MISS" if value is None else f"VALUE {value}"
+                elif command in {"SET", "SETNX"}:
+                    if command == "SETNX" and store.live(key) is not None:
+                        reply = "EXISTS"
+                    else:
+                        store.values[key] = (parts[3], time.monotonic() + int(parts[2]) / 1000)
+                        reply = "OK"
+                else:
+                    if store.live(key) == parts[2]:
+                        del store.values[key]
+                        reply = "OK"
+                    else:
+                        reply = "MISS"
+            self.wfile.write(reply.encode("ascii") + b"\n")
+
+
+@pytest.fixture
+def store():
+    server = _StandInStore()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+class _FakeSecretProvider:
+    def resolve(self, reference: SecretReference) -> str:
+        return "secret"
+
+
+class _MintClientOk:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def mint(self, *, tenant_id, client_id, client_secret, scope, timeout_seconds):
+        self.calls += 1
+        return "token-abc", "Bearer", 3600
+
+
+def _backend(port: int) -> NetworkTokenCacheBackend:
+    return NetworkTokenCacheBackend(host="127.0.0.1", port=port, key=_KEY, l1_ttl_seconds=5)
+
+
+def _provider(mint_client, cache, lease_wait_seconds: float = 2.0) -> GraphTokenProvider:
+    return GraphTokenProvider(
+        client_id="client-1",
+        secret_reference=SecretReference.parse("op://vault/item/field"),
+        secret_provider=_FakeSecretProvider(),
+        mint_client=mint_client,
+        cache=cache,
+        lease_wait_seconds=lease_wait_seconds,
+    )
+
+
+def _get(provider: GraphTokenProvider):
+    return provider.get_token(
+        tenant_id="tenant-1",
+        resource="https://graph.microsoft.com",
+        scopes=["User.Read"],
+        now_epoch=time.time(),
+    )
+
+
+def test_cipher_round_trip_and_tamper_detection():
+    cipher = TokenCacheCipher(_KEY)
+    sealed = cipher.encrypt(b"token-abc")
+
+    assert b"token-abc" not in sealed
+    assert cipher.decrypt(sealed) == b"token-abc"
+    with pytest.raises(TokenCacheCipherError):
+        cipher.decrypt(sealed[:-1] + bytes([sealed[-1] ^ 1]))
+    bound = cipher.encrypt(b"token-abc", b"context-a")
+    assert cipher.decrypt(bound, b"context-a") == b"token-abc"
+    with pytest.raises(TokenCacheCipherError):
+        cipher.decrypt(bound, b"context-b")
+
+
+def test_sealed_value_copied_to_another_key_reads_as_miss(store):
+    port = store.server_address[1]
+    writer = _backend(port)
+    tenant_a = ("tenant-a", "client-1", canonical_scopes(["User.Read"]))
+    tenant_b = ("tenant-b", "client-1", canonical_scopes(["User.Read"]))
+    for key, token in ((tenant_a, "token-a"), (tenant_b, "token-b")):
+        writer.put(
+            key=key,
+            access_token=token,
+            token_type="Bearer",
+            expires_in_seconds=3600,
+            now_epoch=time.time(),
+            max_ttl_seconds=3000,
+        )
+    key_a = writer._store_key("token", tenant_a)
+    key_b = writer._store_key("token", tenant_b)
+    with store.lock:
+        store.values[key_a], store.values[key_b] = store.values[key_b], store.values[key_a]
+
+    reader = _backend(port)
+    lookup = {"now_epoch": time.time(), "skew_seconds": 60}
+    assert reader.get_valid(key=tenant_a, **lookup) is None
+    assert reader.get_valid(key=tenant_b, **lookup) is None
+
+
+def test_l1_keeps_only_the_newest_entries():
+    backend = NetworkTokenCacheBackend(host="127.0.0.1", port=1, key=_KEY, l1_max_entries=2)
+    keys = [(f"tenant-{index}", "client-1", ("user.read",)) for index in range(3)]
+    for key in keys:
+        backend.put(
+            key=key,
+            access_token=key[0],
+            token_type="Bearer",
+            expires_in_seconds=3600,
+            now_epoch=time.time(),
+            max_ttl_seconds=3000,
+        )
+
+    lookup = {"now_epoch": time.time(), "skew_seconds": 60}
+    assert backend.get_valid(key=keys[0], **lookup) is None
+    assert [backend.get_valid(key=key, **lookup).access_token for key in keys[1:]] == [
+        "tenant-1",
+        "tenant-2",
+    ]
+
+
+def test_nodes_share_minted_token_through_store(store):
+    port = store.server_address[1]
+    mint_client = _MintClientOk()
+    node_a = _provider(mint_client, _backend(port))
+    node_b = _provider(mint_client, _backend(port))
+
+    first = _get(node_a)
+    second = _get(node_b)
+
+    assert first.metadata["source"] == "minted"
+    assert second.metadata["source"] == "cache"
+    assert second.token == "token-abc"
+    assert mint_client.calls == 1
+    assert all("token-abc" not in value for value, _ in store.values.values())
+
+
+def test_peer_waits_for_lease_holder_instead_of_minting(store):
+    port = store.server_address[1]
+    holder = _backend(port)
+    key = ("tenant-1", "client-1", canonical_scopes(["User.Read"]))
+    assert holder.acquire_mint_lease(key=key, lease_seconds=5)
+
+    def _finish_mint():
+        time.sleep(0.1)
+        holder.put(
+            key=key,
+            access_token="token-peer",
+            token_type="Bearer",
+            expires_in_seconds=3600,
+            now_epoch=time.time(),
+            max_ttl_seconds=3000,
+        )
+        holder.release_mint_lease(key=key)
+
+    threading.Thread(target=_finish_mint).start()
+    mint_client = _MintClientOk()
+
+    result = _get(_provider(mint_client, _backend(port)))
+
+    assert result.token == "token-peer"
+    assert result.metadata["source"] == "cache"
+    assert mint_client.calls == 0
+
+
+def test_unreachable_store_degrades_to_local_mint():
+    with socketserver.TCPServer(("127.0.0.1", 0), socketserver.BaseRequestHandler) as probe:
+        port = probe.server_address[1]
+    mint_client = _MintClientOk()
+
+    result = _get(_provider(mint_client, _backend(port), lease_wait_seconds=0))
+
+    assert result.metadata["source"] == "minted"
+    assert mint_client.calls == 1
@@ -0,0 +1,386 @@
+import gzip
+import io
+import json
+import threading
+import zlib
+from dataclasses import replace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from mcp_auth_broker import MCPAuthBrokerServer
+from mcp_auth_broker.audit import AuditEmitter
+from mcp_auth_broker.batching import GraphBatchCoalescer
+from mcp_auth_broker.config import BrokerConfig
+from mcp_auth_broker.downstream import GraphDownstreamError, GraphRequest, GraphResponse
+from mcp_auth_broker.downstream import HttpGraphDownstreamClient, normalize_forward_headers
+from mcp_auth_broker.downstream import read_decoded
+from mcp_auth_broker.metrics import MetricsRegistry
+from mcp_auth_broker.server import TOOL_NAME
+
+
+def _config() -> BrokerConfig:
+    return BrokerConfig(
+        environment="test",
+        service_name="mcp-auth-broker",
+        contract_version="v0.1.0",
+        policy_version="v0.1.0",
+        default_timeout_ms=10000,
+        allowed_scopes=("User.Read",),
+        secret_provider_mode="none",
+        graph_secret_reference=None,
+        graph_client_id="",
+        allowed_graph_resources=("https://graph.microsoft.com",),
+        token_cache_skew_seconds=60,
+        token_max_ttl_seconds=3000,
+        token_provider_timeout_seconds=4,
+    )
+
+
+def _request(path: str = "/v1.0/me", headers: dict | None = None) -> dict:
+    return {
+        "contract_version": "v0.1.0",
+        "request_id": "req-123",
+        "requester": {"requester_id": "user-1", "identity_assurance": "verified"},
+        "graph": {
+            "tenant_id": "tenant-1",
+            "resource": "https://graph.microsoft.com",
+            "scopes": ["User.Read"],
+        },
+        "operation": {
+            "action": "downstream_call",
+            "method": "GET",
+            "path": path,
+            "headers": headers or {},
+        },
+        "timeout_ms": 1000,
+    }
+
+
+def _graph_request(path: str, requester_id: str = "user-1", method: str = "GET") -> GraphRequest:
+    return GraphRequest(
+        tenant_id="tenant-1",
+        requester_id=requester_id,
+        scopes=("User.Read",),
+        resource="https://graph.microsoft.com",
+        access_token="token-abc",
+        method=method,
+        path=path,
+        headers={},
+        body=None,
+        timeout_seconds=1,
+    )
+
+
+class _TokenResult:
+    token = "token-abc"
+    metadata = {"tenant_id": "tenant-1", "source": "minted"}
+
+
+class _TokenProvider:
+    def get_token(self, *, tenant_id, resource, scopes, force_refresh=False, now_epoch=None):
+        return _TokenResult()
+
+
+class _RecordingClient:
+    def __init__(self, error: GraphDownstreamError | None = None) -> None:
+        self.requests: list[GraphRequest] = []
+        self.error = error
+        self.lock = threading.Lock()
+
+    def send(self, request: GraphRequest) -> GraphResponse:
+        with self.lock:
+            self.requests.append(request)
+        if self.error is not None:
+            raise self.error
+        if request.path.endswith("/$batch"):
+            return GraphResponse(
+                status=200,
+                headers={"content-type": "application/json"},
+                body={
+                    "responses": [
+                        {
+                            "id": sub["id"],
+                            "status": 404 if sub["url"] == "/missing" else 200,
+                            "headers": {"Request-Id": f"sub-{sub['id']}"},
+                            "body": {"url": sub["url"]},
+                        }
+                        for sub in request.body["requests"]
+                    ]
+                },
+                provider_request_id="batch-1",
+            )
+        return GraphResponse(
+            status=200,
+            headers={"content-type": "application/json", "set-cookie": "x", "etag": "W/1"},
+            body={"path": request.path},
+            provider_request_id="direct-1",
+        )
+
+
+def _server(client, audit: AuditEmitter | None = None) -> MCPAuthBrokerServer:
+    return MCPAuthBrokerServer(
+        config=_config(),
+        audit=audit or AuditEmitter(emit_to_stdout=False),
+        token_provider=_TokenProvider(),
+        downstream_client=client,
+    )
+
+
+def test_server_executes_downstream_call_and_filters_response_headers():
+    client = _RecordingClient()
+    server = _server(client)
+
+    response = server.execute_tool(
+        TOOL_NAME, _request(headers={"Accept": "application/json", "Cookie": "a=b"})
+    )
+
+    execution = response["result"]["execution"]
+    assert execution["http_status"] == 200
+    assert execution["response_body"] == {"path": "/v1.0/me"}
+    assert execution["response_headers"] == {"content-type": "application/json", "etag": "W/1"}
+    assert client.requests[0].headers == {"accept": "application/json"}
+    assert client.requests[0].access_token == "token-abc"
+
+
+def test_server_rejects_unknown_operation_headers():
+    client = _RecordingClient()
+    response = _server(client).execute_tool(TOOL_NAME, _request(headers={"X-Custom": "1"}))
+
+    assert response["error"]["code"] == "bad_request.invalid_field"
+    assert response["error"]["metadata"] == {"fields": ["operation.headers"]}
+    assert client.requests == []
+
+
+def test_server_maps_downstream_timeout_to_provider_outcome():
+    audit = AuditEmitter(emit_to_stdout=False)
+    client = _RecordingClient(error=GraphDownstreamError("provider.timeout", "timed out"))
+
+    response = _server(client, audit).execute_tool(TOOL_NAME, _request())
+
+    assert response["error"]["code"] == "provider.timeout"
+    assert audit.events[2]["event_type"] == "provider.called"
+    assert audit.events[2]["payload"]["outcome"] == "timeout"
+    assert audit.events[3]["payload"]["error_code"] == "provider.timeout"
+
+
+def test_normalize_forward_headers_strips_blocked_and_rejects_unknown():
+    assert normalize_forward_headers({"Authorization": "Bearer x", "Prefer": "a"}) == {
+        "prefer": "a"
+    }
+    with pytest.raises(ValueError):
+        normalize_forward_headers({"x-forwarded-for": "1.2.3.4"})
+
+
+def test_coalescer_fans_out_batch_sub_responses():
+    client = _RecordingClient()
+    coalescer = GraphBatchCoalescer(client, window_seconds=0.2, max_batch_size=3)
+    paths = ["/v1.0/me", "/v1.0/missing", "/v1.0/groups"]
+    results: dict[str, GraphResponse] = {}
+
+    def _call(path: str) -> None:
+        results[path] = coalescer.send(_graph_request(path))
+
+    threads = [threading.Thread(target=_call, args=(path,)) for path in paths]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(client.requests) == 1
+    assert client.requests[0].path == "/v1.0/$batch"
+    assert results["/v1.0/missing"].status == 404
+    assert results["/v1.0/me"].status == 200
+    assert results["/v1.0/me"].body == {"url": "/me"}
+    assert results["/v1.0/groups"].annotations["batch"]["size"] == 3
+    assert {result.provider_request_id for result in results.values()} == {
+        "sub-0",
+        "sub-1",
+        "sub-2",
+    }
+
+
+def test_coalescer_keeps_requesters_apart_and_sends_singletons_directly():
+    client = _RecordingClient()
+    coalescer = GraphBatchCoalescer(client, window_seconds=0.05)
+    results = []
+
+    threads = [
+        threading.Thread(
+            target=lambda requester=requester: results.append(
+                coalescer.send(_graph_request("/v1.0/me", requester_id=requester))
+            )
+        )
+        for requester in ("user-1", "user-2")
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+
+    assert sorted(request.path for request in client.requests) == ["/v1.0/me", "/v1.0/me"]
+    assert all(result.annotations == {} for result in results)
+
+
+def test_coalescer_sends_writes_directly():
+    client = _RecordingClient()
+    coalescer = GraphBatchCoalescer(client, window_seconds=0.2)
+    results = []
+
+    threads = [
+        threading.Thread(
+            target=lambda method=method: results.append(
+                coalescer.send(_graph_request("/v1.0/me/messages", method=method))
+            )
+        )
+        for method in ("POST", "PATCH")
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+
+    assert sorted(request.method for request in client.requests) == ["PATCH", "POST"]
+    assert all(request.path == "/v1.0/me/messages" for request in client.requests)
+    assert all(result.annotations == {} for result in results)
+
+
+def test_coalescer_propagates_batch_failure_to_every_caller():
+    client = _RecordingClient(error=GraphDownstreamError("provider.unavailable", "down"))
+    coalescer = GraphBatchCoalescer(client, window_seconds=0.01)
+
+    with pytest.raises(GraphDownstreamError) as exc:
+        coalescer.send(_graph_request("/v1.0/me"))
+
+    assert exc.value.code == "provider.unavailable"
+
+
+class _FailedEnvelopeClient(_RecordingClient):
+    def __init__(self, status: int) -> None:
+        super().__init__()
+        self.status = status
+
+    def send(self, request: GraphRequest) -> GraphResponse:
+        with self.lock:
+            self.requests.append(request)
+        return GraphResponse(
+            status=self.status, headers={}, body={"error": {"code": "x"}}, provider_request_id=""
+        )
+
+
+@pytest.mark.parametrize(
+    ("status", "code"),
+    [
+        (429, "provider.rate_limited"),
+        (503, "provider.unavailable"),
+        (400, "provider.bad_response"),
+    ],
+)
+def test_coalescer_maps_failed_batch_envelope_to_errors(status, code):
+    client = _FailedEnvelopeClient(status)
+    coalescer = GraphBatchCoalescer(client, window_seconds=0.2, max_batch_size=2)
+    errors: list[GraphDownstreamError] = []
+
+    def _call(path: str) -> None:
+        try:
+            coalescer.send(_graph_request(path))
+        except GraphDownstreamError as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=_call, args=(path,)) for path in ("/v1.0/me", "/v1.0/a")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+
+    assert [request.path for request in client.requests] == ["/v1.0/$batch"]
+    assert [exc.code for exc in errors] == [code, code]
+
+
+class _GzipGraphHandler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        payload = json.dumps({"value": [{"id": str(n)} for n in range(500)]}).encode()
+        accepts_gzip = "gzip" in self.headers.get("accept-encoding", "")
+        body = gzip.compress(payload) if accepts_gzip else payload
+        self.send_response(200)
+        self.send_header("content-type", "application/json")
+        if accepts_gzip:
+            self.send_header("content-encoding", "gzip")
+        self.send_header("content-length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+def test_http_client_requests_and_inflates_gzip_responses():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _GzipGraphHandler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    metrics = MetricsRegistry()
+    request = replace(
+        _graph_request("/v1.0/users"), resource=f"http://127.0.0.1:{httpd.server_port}"
+    )
+    try:
+        response = HttpGraphDownstreamClient(metrics=metrics).send(request)
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+
+    assert len(response.body["value"]) == 500
+    assert "content-encoding" not in response.headers
+    assert metrics.counter("downstream.compression_saved_bytes", encoding="gzip") > 0
+    assert metrics.counter("downstream.bytes_decoded", encoding="gzip") > metrics.counter(
+        "downstream.bytes_received", encoding="gzip"
+    )
+
+
+def test_read_decoded_handles_zlib_deflate():
+    body, wire_bytes = read_decoded(
+        io.BytesIO(zlib.compress(b"hello" * 100)), "deflate", max_bytes=1000
+    )
+
+    assert bytes(body) == b"hello" * 100
+    assert wire_bytes < 500
+
+
+class _Trickle:
+    """Returns at most one byte per read, as a slow socket might."""
+
+    def __init__(self, data: bytes) -> None:
+        self.stream = io.BytesIO(data)
+
+    def read(self, size: int) -> bytes:
+        return self.stream.read(1)
+
+
+def test_read_decoded_accepts_raw_deflate():
+    compressor = zlib.compressobj(wbits=-zlib.MAX_WBITS)
+    raw = compressor.compress(b"hello" * 100) + compressor.flush()
+
+    for stream in (io.BytesIO(raw), _Trickle(raw)):
+        body, wire_bytes = read_decoded(stream, "deflate", max_bytes=1000)
+
+        assert bytes(body) == b"hello" * 100
+        assert wire_bytes == len(raw)
+    wrapped, _ = read_decoded(_Trickle(zlib.compress(b"abc")), "deflate", max_bytes=10)
+    assert bytes(wrapped) == b"abc"
+    with pytest.raises(GraphDownstreamError):
+        read_decoded(io.BytesIO(b"not deflate at all"), "deflate", max_bytes=1000)
+
+
+def test_read_decoded_stops_decompression_bombs_at_the_cap():
+    bomb = gzip.compress(b"\0" * (50 * 1024 * 1024))
+
+    with pytest.raises(GraphDownstreamError) as exc_info:
+        read_decoded(io.BytesIO(bomb), "gzip", max_bytes=1024 * 1024)
+
+    assert exc_info.value.code == "provider.bad_response"
+
+
+def test_read_decoded_rejects_corrupt_and_truncated_streams():
+    compressed = gzip.compress(b"payload" * 100)
+
+    for stream in (io.BytesIO(b"not gzip at all"), io.BytesIO(compressed[:-12])):
+        with pytest.raises(GraphDownstreamError):
+            read_decoded(stream, "gzip", max_bytes=10_000)
@@ -0,0 +1,31 @@
+import pytest
+
+from mcp_auth_broker.fair_queue import FairQueue
+
+
+def test_fair_queue_interleaves_flows_by_weight():
+    queue = FairQueue(lambda flow: {"noisy": 2}.get(flow, 1))
+    for index in range(4):
+        queue.push("noisy", f"noisy-{index}")
+    queue.push("quiet", "quiet-0")
+    queue.push("quiet", "quiet-1")
+
+    order = [queue.pop() for _ in range(len(queue))]
+
+    assert order == ["noisy-0", "noisy-1", "quiet-0", "noisy-2", "noisy-3", "quiet-1"]
+    with pytest.raises(IndexError):
+        queue.pop()
+
+
+def test_fair_queue_forgets_credit_of_flows_that_drain_or_are_removed():
+    queue = FairQueue()
+    queue.push("a", "a-0")
+    queue.push("b", "b-0")
+    queue.push("b", "b-1")
+
+    queue.remove("a", "a-0")
+
+    assert queue.depth("a") == 0
+    assert queue.peek() == "b-0"
+    assert [queue.pop(), queue.pop()] == ["b-0", "b-1"]
+    assert len(queue) == 0
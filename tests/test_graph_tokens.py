@@ -1,6 +1,15 @@
-from mcp_auth_broker.graph_tokens import GraphTokenCache
+import email.message
+import tracemalloc
+import urllib.error
+import urllib.request
+
+import pytest
+
+from mcp_auth_broker.graph_tokens import GraphTokenCache, canonical_scopes
 from mcp_auth_broker.graph_tokens import GraphTokenProvider
 from mcp_auth_broker.graph_tokens import GraphTokenProviderError
+from mcp_auth_broker.graph_tokens import HttpGraphTokenMintClient, parse_retry_after
+from mcp_auth_broker.rate_limit import MintRateLimiter
 from mcp_auth_broker.secrets import SecretReference
 
 
@@ -15,9 +24,11 @@ class _FakeSecretProvider:
 class _MintClientOk:
     def __init__(self) -> None:
         self.calls = 0
+        self.scopes: list[str] = []
 
     def mint(self, *, tenant_id, client_id, client_secret, scope, timeout_seconds):
         self.calls += 1
+        self.scopes.append(scope)
         return "token-abc", "Bearer", 3600
 
 
@@ -145,6 +156,27 @@ def test_refresh_failure_returns_valid_cached_fallback():
     assert fallback.metadata["source"] == "cache_fallback"
 
 
+def test_failed_refresh_inside_skew_window_serves_unexpired_token():
+    provider = _provider(_MintClientOk())
+    provider.get_token(
+        tenant_id="tenant-1",
+        resource="https://graph.microsoft.com",
+        scopes=["User.Read"],
+        now_epoch=1000,
+    )
+    provider.mint_client = _MintClientFail(code="provider.unavailable", message="down")
+
+    # The token expires at 4000; 3950 is inside the 60s refresh skew but not yet expired.
+    fallback = provider.get_token(
+        tenant_id="tenant-1",
+        resource="https://graph.microsoft.com",
+        scopes=["User.Read"],
+        now_epoch=3950,
+    )
+
+    assert fallback.metadata["source"] == "cache_fallback"
+
+
 def test_refresh_failure_does_not_return_expired_token():
     mint_client = _MintClientOk()
     provider = _provider(mint_client)
@@ -169,3 +201,213 @@ def test_refresh_failure_does_not_return_expired_token():
         assert exc.code == "provider.unavailable"
     else:
         raise AssertionError("expected deterministic provider failure for expired cache")
+
+
+class _MintClientThrottled:
+    def __init__(self, retry_after_seconds: float) -> None:
+        self.calls = 0
+        self.retry_after_seconds = retry_after_seconds
+
+    def mint(self, *, tenant_id, client_id, client_secret, scope, timeout_seconds):
+        self.calls += 1
+        raise GraphTokenProviderError(
+            "provider.rate_limited",
+            "throttled",
+            retry_after_seconds=self.retry_after_seconds,
+        )
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_parse_retry_after_accepts_seconds_and_http_date():
+    assert parse_retry_after("30") == 30.0
+    assert parse_retry_after("Thu, 01 Jan 1970 00:01:40 GMT", now_epoch=40) == 60.0
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+
+def test_http_mint_client_surfaces_retry_after(monkeypatch):
+    headers = email.message.Message()
+    headers["Retry-After"] = "12"
+
+    def _fake_urlopen(request, timeout):
+        raise urllib.error.HTTPError(request.full_url, 429, "Too Many Requests", headers, None)
+
+    monkeypatch.setattr(urllib.request, "urlopen", _fake_urlopen)
+
+    try:
+        HttpGraphTokenMintClient().mint(
+            tenant_id="tenant-1",
+            client_id="client-1",
+            client_secret="secret",
+            scope="User.Read",
+            timeout_seconds=1,
+        )
+    except GraphTokenProviderError as exc:
+        assert exc.code == "provider.rate_limited"
+        assert exc.retry_after_seconds == 12.0
+    else:
+        raise AssertionError("expected rate limited error")
+
+
+def test_retry_after_pauses_minting_and_serves_cache_fallback():
+    clock = _Clock()
+    provider = _provider(_MintClientOk())
+    provider.rate_limiter = MintRateLimiter(rate_per_second=10, burst=10, clock=clock)
+    provider.get_token(
+        tenant_id="tenant-1",
+        resource="https://graph.microsoft.com",
+        scopes=["User.Read"],
+        now_epoch=1000,
+    )
+    throttled = _MintClientThrottled(retry_after_seconds=30)
+    provider.mint_client = throttled
+
+    for _ in range(3):
+        fallback = provider.get_token(
+            tenant_id="tenant-1",
+            resource="https://graph.microsoft.com",
+            scopes=["User.Read"],
+            force_refresh=True,
+            now_epoch=1010,
+        )
+        assert fallback.metadata["source"] == "cache_fallback"
+
+    assert throttled.calls == 1
+
+    clock.now = 31
+    recovered = _MintClientOk()
+    provider.mint_client = recovered
+    minted = provider.get_token(
+        tenant_id="tenant-1",
+        resource="https://graph.microsoft.com",
+        scopes=["User.Read"],
+        force_refresh=True,
+        now_epoch=1041,
+    )
+
+    assert minted.metadata["source"] == "minted"
+    assert recovered.calls == 1
+
+
+def test_exhausted_bucket_rejects_mint_without_cached_token():
+    mint_client = _MintClientOk()
+    provider = _provider(mint_client)
+    provider.rate_limiter = MintRateLimiter(rate_per_second=0.5, burst=1, clock=_Clock())
+    provider.get_token(
+        tenant_id="tenant-1",
+        resource="https://graph.microsoft.com",
+        scopes=["User.Read"],
+        now_epoch=1000,
+    )
+
+    try:
+        provider.get_token(
+            tenant_id="tenant-1",
+            resource="https://graph.microsoft.com",
+            scopes=["User.Read"],
+            force_refresh=True,
+            now_epoch=5000,
+        )
+    except GraphTokenProviderError as exc:
+        assert exc.code == "provider.rate_limited"
+        assert exc.retry_after_seconds == 2.0
+    else:
+        raise AssertionError("expected limiter rejection")
+    assert mint_client.calls == 1
+
+
+def _multi_scope_provider(mint_client):
+    return GraphTokenProvider(
+        client_id="client-1",
+        secret_reference=SecretReference.parse("op://vault/item/field"),
+        secret_provider=_FakeSecretProvider(),
+        mint_client=mint_client,
+        cache=GraphTokenCache(),
+        allowed_scopes=("User.Read", "Mail.Read", "Files.Read"),
+    )
+
+
+def test_scope_order_and_duplicates_share_one_cached_token():
+    mint_client = _MintClientOk()
+    provider = _multi_scope_provider(mint_client)
+
+    for scopes in (["User.Read", "Mail.Read"], ["Mail.Read", "User.Read", "Mail.Read"]):
+        provider.get_token(
+            tenant_id="tenant-1", resource="https://graph.microsoft.com", scopes=scopes
+        )
+
+    assert mint_client.calls == 1
+    assert canonical_scopes(["Mail.Read", " user.read", "User.Read"]) == ("mail.read", "user.read")
+
+
+def test_wider_cached_token_is_not_served_to_narrower_request():
+    mint_client = _MintClientOk()
+    provider = _multi_scope_provider(mint_client)
+    provider.get_token(
+        tenant_id="tenant-1",
+        resource="https://graph.microsoft.com",
+        scopes=["User.Read", "Mail.Read", "Files.Read"],
+    )
+
+    narrower = provider.get_token(
+        tenant_id="tenant-1", resource="https://graph.microsoft.com", scopes=["Mail.Read"]
+    )
+
+    assert narrower.metadata["source"] == "minted"
+    assert narrower.metadata["scopes"] == ["Mail.Read"]
+    assert mint_client.scopes == ["files.read mail.read user.read", "mail.read"]
+
+
+def test_allowlist_check_and_mint_use_the_same_canonical_scopes():
+    mint_client = _MintClientOk()
+    provider = _provider(mint_client)
+
+    provider.get_token(
+        tenant_id="tenant-1",
+        resource="https://graph.microsoft.com",
+        scopes=["user.read", " USER.READ "],
+    )
+    for scopes in (["Mail.Read"], [" "], []):
+        with pytest.raises(GraphTokenProviderError) as exc:
+            provider.get_token(
+                tenant_id="tenant-1", resource="https://graph.microsoft.com", scopes=scopes
+            )
+        assert exc.value.code == "policy.invalid_scope"
+
+    assert mint_client.scopes == ["user.read"]
+
+
+def test_cache_hits_share_stored_record_and_stay_compact_at_100k_keys():
+    cache = GraphTokenCache()
+    scopes = ["User.Read", "Mail.Read"]
+
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        for index in range(100_000):
+            cache.put(
+                key=(f"tenant-{index}", "client-1", canonical_scopes(scopes)),
+                access_token=f"token-{index}",
+                token_type="Bearer",
+                expires_in_seconds=3600,
+                now_epoch=1000,
+                max_ttl_seconds=3000,
+            )
+        per_key = (tracemalloc.get_traced_memory()[0] - baseline) / 100_000
+    finally:
+        tracemalloc.stop()
+
+    key = ("tenant-7", "client-1", canonical_scopes(["mail.read", "User.Read", "User.Read"]))
+    first = cache.get_valid(key=key, now_epoch=1010, skew_seconds=60)
+    second = cache.get_valid(key=key, now_epoch=1020, skew_seconds=60)
+    assert first is second
+    assert first.source == "cache"
+    assert not hasattr(first, "__dict__")
+    assert per_key < 1200
@@ -0,0 +1,161 @@
+import threading
+import time
+
+from mcp_auth_broker import MCPAuthBrokerServer
+from mcp_auth_broker.audit import AuditEmitter
+from mcp_auth_broker.config import BrokerConfig
+from mcp_auth_broker.idempotency import ReplayCache
+from mcp_auth_broker.server import TOOL_NAME
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class _Counter:
+    def __init__(self, response: dict | None = None) -> None:
+        self.calls = 0
+        self.response = response or {"status": "ok", "result": {"value": [1]}}
+
+    def __call__(self) -> dict:
+        self.calls += 1
+        return self.response
+
+
+def test_replay_cache_runs_once_and_replays_copies_until_ttl():
+    clock = _Clock()
+    cache = ReplayCache(ttl_seconds=60, max_entries=2, clock=clock)
+    run = _Counter()
+
+    first, first_outcome = cache.execute(("user-1", "req-1"), "fp", run, wait_seconds=1)
+    replay, replay_outcome = cache.execute(("user-1", "req-1"), "fp", run, wait_seconds=1)
+    replay["result"]["value"].append(2)
+    conflict = cache.execute(("user-1", "req-1"), "other", run, wait_seconds=1)
+
+    assert (first_outcome, replay_outcome) == ("executed", "replayed")
+    assert run.calls == 1
+    assert cache.execute(("user-1", "req-1"), "fp", run, wait_seconds=1)[0] == first
+    assert conflict == (None, "conflict")
+
+    clock.now = 61
+    assert cache.execute(("user-1", "req-1"), "fp", run, wait_seconds=1)[1] == "executed"
+    cache.execute(("user-1", "req-2"), "fp", run, wait_seconds=1)
+    cache.execute(("user-1", "req-3"), "fp", run, wait_seconds=1)
+    assert len(cache) == 2
+
+
+def test_replay_cache_does_not_store_transient_failures():
+    cache = ReplayCache()
+    run = _Counter({"status": "error", "error": {"code": "provider.timeout", "retryable": False}})
+
+    for _ in range(2):
+        assert cache.execute(("user-1", "req-1"), "fp", run, wait_seconds=1)[1] == "executed"
+
+    assert run.calls == 2
+    assert len(cache) == 0
+
+
+def test_replay_cache_bounds_stored_bytes_and_skips_oversized_responses():
+    cache = ReplayCache(max_bytes=2_500, max_entry_bytes=1_500)
+    large = _Counter({"status": "ok", "result": {"body": "x" * 1_000}})
+    oversized = _Counter({"status": "ok", "result": {"body": "x" * 2_000}})
+
+    for request_id in ("req-1", "req-2", "req-3"):
+        cache.execute(("user-1", request_id), "fp", large, wait_seconds=1)
+    assert cache.execute(("user-1", "big"), "fp", oversized, wait_seconds=1)[1] == "executed"
+    assert cache.execute(("user-1", "big"), "fp", oversized, wait_seconds=1)[1] == "executed"
+
+    assert len(cache) == 2
+    assert cache.stored_bytes <= 2_500
+    assert cache.execute(("user-1", "req-1"), "fp", large, wait_seconds=1)[1] == "executed"
+    assert cache.execute(("user-1", "req-3"), "fp", large, wait_seconds=1)[1] == "replayed"
+    assert oversized.calls == 2
+
+
+def test_retry_attaches_to_in_flight_execution():
+    cache = ReplayCache()
+    started = threading.Event()
+    release = threading.Event()
+    run = _Counter()
+
+    def _slow_run() -> dict:
+        started.set()
+        release.wait(5)
+        return run()
+
+    original = threading.Thread(
+        target=cache.execute,
+        args=(("user-1", "req-1"), "fp", _slow_run),
+        kwargs={"wait_seconds": 5},
+    )
+    original.start()
+    assert started.wait(5)
+    assert cache.execute(("user-1", "req-1"), "fp", run, wait_seconds=0.01) == (None, "timeout")
+
+    attached = []
+    retry = threading.Thread(
+        target=lambda: attached.append(
+            cache.execute(("user-1", "req-1"), "fp", run, wait_seconds=5)
+        )
+    )
+    retry.start()
+    time.sleep(0.05)
+    release.set()
+    original.join(5)
+    retry.join(5)
+
+    assert attached == [(run.response, "attached")]
+    assert run.calls == 1
+
+
+def _config() -> BrokerConfig:
+    return BrokerConfig(
+        environment="test",
+        service_name="mcp-auth-broker",
+        contract_version="v0.1.0",
+        policy_version="v0.1.0",
+        default_timeout_ms=10000,
+        allowed_scopes=("User.Read",),
+        secret_provider_mode="none",
+        graph_secret_reference=None,
+        graph_client_id="",
+        allowed_graph_resources=("https://graph.microsoft.com",),
+        token_cache_skew_seconds=60,
+        token_max_ttl_seconds=3000,
+        token_provider_timeout_seconds=4,
+    )
+
+
+def _request(path: str = "/v1.0/me") -> dict:
+    return {
+        "contract_version": "v0.1.0",
+        "request_id": "req-123",
+        "requester": {"requester_id": "user-1", "identity_assurance": "verified"},
+        "graph": {
+            "tenant_id": "tenant-1",
+            "resource": "https://graph.microsoft.com",
+            "scopes": ["User.Read"],
+        },
+        "operation": {"action": "downstream_call", "method": "POST", "path": path},
+    }
+
+
+def test_server_replays_retries_and_rejects_reused_request_ids():
+    audit = AuditEmitter(emit_to_stdout=False)
+    server = MCPAuthBrokerServer(config=_config(), audit=audit)
+
+    first = server.execute_tool(TOOL_NAME, _request())
+    retry = server.execute_tool(TOOL_NAME, _request())
+    conflict = server.execute_tool(TOOL_NAME, _request("/v1.0/me/sendMail"))
+
+    assert retry == first
+    assert [event["event_type"] for event in audit.events].count("policy.decided") == 1
+    assert conflict["error"]["code"] == "bad_request.idempotency_conflict"
+    replays = [event for event in audit.events if event["event_type"] == "request.replayed"]
+    assert [event["payload"]["outcome"] for event in replays] == ["replayed", "conflict"]
+    assert replays[0]["request_id"] == "req-123"
+    assert server.metrics.counter("idempotency.replays", outcome="replayed") == 1
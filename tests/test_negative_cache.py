@@ -0,0 +1,115 @@
+import pytest
+
+from mcp_auth_broker.graph_tokens import GraphTokenCache, GraphTokenProvider
+from mcp_auth_broker.graph_tokens import GraphTokenProviderError
+from mcp_auth_broker.negative_cache import NegativeCache, NegativeCachingSecretProvider
+from mcp_auth_broker.secrets import SecretProviderError, SecretReference
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class _FailingSecretProvider:
+    def __init__(self, code: str) -> None:
+        self.code = code
+        self.calls = 0
+
+    def resolve(self, reference: SecretReference) -> str:
+        self.calls += 1
+        raise SecretProviderError(code=self.code, message="secret failure")
+
+
+class _FakeSecretProvider:
+    def resolve(self, reference: SecretReference) -> str:
+        return "secret"
+
+
+class _RejectingMintClient:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def mint(self, *, tenant_id, client_id, client_secret, scope, timeout_seconds):
+        self.calls += 1
+        raise GraphTokenProviderError("provider.auth_failed", "token provider auth failed")
+
+
+def test_negative_cache_applies_per_code_ttls_and_size_cap():
+    clock = _Clock()
+    cache = NegativeCache(
+        ttl_by_code={"secret.not_found": 10, "provider.auth_failed": 60},
+        max_entries=2,
+        clock=clock,
+    )
+
+    assert cache.put("ref-1", "secret.not_found", "missing")
+    assert not cache.put("ref-2", "secret.timeout", "slow")
+    assert cache.put(("tenant-1", "client-1"), "provider.auth_failed", "rejected")
+    clock.now += 11
+
+    assert cache.get("ref-1") is None
+    assert cache.get(("tenant-1", "client-1")) == ("provider.auth_failed", "rejected")
+    cache.put("ref-3", "secret.not_found", "missing")
+    cache.put("ref-4", "secret.not_found", "missing")
+    assert len(cache) == 2
+    assert cache.get(("tenant-1", "client-1")) is None
+    assert cache.invalidate(lambda key: key == "ref-3") == 1
+    assert cache.get("ref-4") is not None
+
+
+def test_secret_layer_returns_cached_deterministic_errors_without_calling_provider():
+    inner = _FailingSecretProvider("secret.not_found")
+    provider = NegativeCachingSecretProvider(inner, NegativeCache())
+    reference = SecretReference.parse("op://vault/item/field")
+
+    for _ in range(3):
+        with pytest.raises(SecretProviderError) as exc:
+            provider.resolve(reference)
+        assert exc.value.code == "secret.not_found"
+
+    assert inner.calls == 1
+
+    transient = _FailingSecretProvider("secret.unavailable")
+    provider = NegativeCachingSecretProvider(transient, NegativeCache())
+    for _ in range(2):
+        with pytest.raises(SecretProviderError):
+            provider.resolve(reference)
+    assert transient.calls == 2
+
+
+def test_token_provider_skips_minting_for_tenants_that_failed_auth_until_invalidated():
+    mint_client = _RejectingMintClient()
+    negative_cache = NegativeCache()
+    provider = GraphTokenProvider(
+        client_id="client-1",
+        secret_reference=SecretReference.parse("op://vault/item/field"),
+        secret_provider=_FakeSecretProvider(),
+        mint_client=mint_client,
+        cache=GraphTokenCache(),
+        negative_cache=negative_cache,
+    )
+
+    def _get(tenant_id: str):
+        return provider.get_token(
+            tenant_id=tenant_id,
+            resource="https://graph.microsoft.com",
+            scopes=["User.Read"],
+            now_epoch=1000,
+        )
+
+    codes = []
+    for tenant_id in ("tenant-1", "tenant-1", "tenant-2"):
+        with pytest.raises(GraphTokenProviderError) as exc:
+            _get(tenant_id)
+        codes.append(exc.value.code)
+
+    assert codes == ["provider.auth_failed"] * 3
+    assert mint_client.calls == 2
+    assert negative_cache.invalidate(lambda key: key[0] == "tenant-1") == 1
+    with pytest.raises(GraphTokenProviderError):
+        _get("tenant-1")
+    assert mint_client.calls == 3
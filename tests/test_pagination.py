@@ -0,0 +1,203 @@
+import gc
+import threading
+import time
+import weakref
+
+from mcp_auth_broker import MCPAuthBrokerServer
+from mcp_auth_broker.audit import AuditEmitter
+from mcp_auth_broker.config import BrokerConfig
+from mcp_auth_broker.downstream import GraphRequest, GraphResponse
+from mcp_auth_broker.pagination import PageStream
+from mcp_auth_broker.server import TOOL_NAME
+
+_BASE = "https://graph.microsoft.com/v1.0/users"
+
+
+class _PagedClient:
+    def __init__(self, total_pages: int, page_size: int = 3) -> None:
+        self.total_pages = total_pages
+        self.page_size = page_size
+        self.paths: list[str] = []
+        self.refs: list[weakref.ref] = []
+        self.lock = threading.Lock()
+
+    def send(self, request: GraphRequest) -> GraphResponse:
+        with self.lock:
+            self.paths.append(request.path)
+            index = len(self.paths) - 1
+        body = {"value": [f"item-{index}-{n}" for n in range(self.page_size)]}
+        if index + 1 < self.total_pages:
+            body["@odata.nextLink"] = f"{_BASE}?$skiptoken={index + 1}"
+        page = GraphResponse(status=200, headers={}, body=body, provider_request_id=f"p-{index}")
+        self.refs.append(weakref.ref(page))
+        return page
+
+    def live_pages(self) -> int:
+        return sum(1 for ref in self.refs if ref() is not None)
+
+
+def _first_request() -> GraphRequest:
+    return GraphRequest(
+        tenant_id="tenant-1",
+        requester_id="user-1",
+        scopes=("User.Read",),
+        resource="https://graph.microsoft.com",
+        access_token="token-abc",
+        method="GET",
+        path="/v1.0/users",
+        headers={"consistency-level": "eventual"},
+        body=None,
+        timeout_seconds=1,
+    )
+
+
+def _wait_for(predicate, timeout: float = 2.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_page_stream_follows_next_links_and_reports_totals():
+    client = _PagedClient(total_pages=3)
+    stream = PageStream(client, _first_request(), max_pages=10, max_items=100)
+
+    pages = [page.provider_request_id for page in stream]
+
+    assert pages == ["p-0", "p-1", "p-2"]
+    assert client.paths[1:] == [f"{_BASE}?$skiptoken=1", f"{_BASE}?$skiptoken=2"]
+    assert (stream.pages, stream.items, stream.truncated, stream.next_link) == (3, 9, False, None)
+
+
+def test_page_stream_prefetches_next_page_while_current_is_consumed():
+    client = _PagedClient(total_pages=3)
+    iterator = iter(PageStream(client, _first_request()))
+
+    first = next(iterator)
+
+    assert first.provider_request_id == "p-0"
+    assert _wait_for(lambda: len(client.paths) == 2)
+
+
+def test_page_stream_keeps_at_most_two_pages_alive():
+    client = _PagedClient(total_pages=50)
+    peak = 0
+    for page in PageStream(client, _first_request(), max_pages=50, max_items=10_000):
+        del page
+        gc.collect()
+        peak = max(peak, client.live_pages())
+
+    assert len(client.paths) == 50
+    assert peak <= 2
+
+
+def test_page_stream_enforces_page_and_item_limits():
+    by_pages = PageStream(_PagedClient(total_pages=5), _first_request(), max_pages=2)
+    assert len(list(by_pages)) == 2
+    assert by_pages.truncated
+    assert by_pages.next_link == f"{_BASE}?$skiptoken=2"
+
+    by_items = PageStream(_PagedClient(total_pages=5), _first_request(), max_items=4)
+    pages = list(by_items)
+    assert [len(page.body["value"]) for page in pages] == [3, 1]
+    assert by_items.items == 4
+    assert by_items.truncated
+
+
+def _config() -> BrokerConfig:
+    return BrokerConfig(
+        environment="test",
+        service_name="mcp-auth-broker",
+        contract_version="v0.1.0",
+        policy_version="v0.1.0",
+        default_timeout_ms=10000,
+        allowed_scopes=("User.Read",),
+        secret_provider_mode="none",
+        graph_secret_reference=None,
+        graph_client_id="",
+        allowed_graph_resources=("https://graph.microsoft.com",),
+        token_cache_skew_seconds=60,
+        token_max_ttl_seconds=3000,
+        token_provider_timeout_seconds=4,
+    )
+
+
+class _TokenResult:
+    token = "token-abc"
+    metadata = {"tenant_id": "tenant-1", "source": "minted"}
+
+
+class _TokenProvider:
+    def get_token(self, *, tenant_id, resource, scopes, force_refresh=False, now_epoch=None):
+        return _TokenResult()
+
+
+def _request(**operation) -> dict:
+    return {
+        "contract_version": "v0.1.0",
+        "request_id": "req-123",
+        "requester": {"requester_id": "user-1", "identity_assurance": "verified"},
+        "graph": {
+            "tenant_id": "tenant-1",
+            "resource": "https://graph.microsoft.com",
+            "scopes": ["User.Read"],
+        },
+        "operation": {
+            "action": "downstream_call",
+            "method": "GET",
+            "path": "/v1.0/users",
+            **operation,
+        },
+    }
+
+
+def _server(client, audit=None) -> MCPAuthBrokerServer:
+    return MCPAuthBrokerServer(
+        config=_config(),
+        audit=audit or AuditEmitter(emit_to_stdout=False),
+        token_provider=_TokenProvider(),
+        downstream_client=client,
+    )
+
+
+def test_stream_tool_yields_partial_pages_then_final_summary():
+    audit = AuditEmitter(emit_to_stdout=False)
+    server = _server(_PagedClient(total_pages=3), audit)
+
+    envelopes = list(server.stream_tool(TOOL_NAME, _request(paginate=True, max_pages=5)))
+
+    assert [envelope["status"] for envelope in envelopes] == ["partial"] * 3 + ["ok"]
+    assert envelopes[1]["result"]["page"]["index"] == 1
+    assert envelopes[-1]["result"]["execution"]["pagination"] == {
+        "pages": 3,
+        "items": 9,
+        "truncated": False,
+        "next_link": None,
+    }
+    assert [event["event_type"] for event in audit.events] == [
+        "request.received",
+        "policy.decided",
+        "provider.called",
+        "result.emitted",
+    ]
+
+
+def test_execute_tool_collects_bounded_pages():
+    response = _server(_PagedClient(total_pages=10)).execute_tool(
+        TOOL_NAME, _request(paginate=True, max_items=5)
+    )
+
+    execution = response["result"]["execution"]
+    assert len(execution["response_body"]["value"]) == 5
+    assert execution["pagination"]["truncated"] is True
+
+
+def test_pagination_settings_are_validated():
+    response = _server(_PagedClient(total_pages=1)).execute_tool(
+        TOOL_NAME, _request(paginate=True, method="POST", max_pages=0)
+    )
+
+    assert response["error"]["code"] == "bad_request.invalid_field"
+    assert response["error"]["metadata"]["fields"] == ["operation.method", "operation.max_pages"]
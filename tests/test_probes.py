@@ -0,0 +1,108 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from mcp_auth_broker import MCPAuthBrokerServer
+from mcp_auth_broker.audit import AuditEmitter
+from mcp_auth_broker.cli import main
+from mcp_auth_broker.config import BrokerConfig
+from mcp_auth_broker.probes import published_readiness, run_probe
+
+_HEAVY_MODULES = {
+    "mcp_auth_broker.server",
+    "mcp_auth_broker.graph_tokens",
+    "urllib.request",
+    "http.client",
+    "subprocess",
+    "sqlite3",
+    "concurrent.futures",
+}
+# Cumulative import time of the CLI module on the probe path, in microseconds.
+_IMPORT_BUDGET_US = 150_000
+
+
+def test_probe_commands_print_status_without_building_server(capsys, monkeypatch):
+    monkeypatch.delenv("MCP_AUTH_BROKER_ENV", raising=False)
+    main(["ready"])
+    ready = json.loads(capsys.readouterr().out)
+    main(["tools"])
+    tools = json.loads(capsys.readouterr().out)
+
+    assert ready == {"status": "ready", "environment": "dev", "prewarm": "idle"}
+    assert tools[0]["name"] == "auth.graph.operation.execute.v1"
+    assert run_probe("health")["status"] == "ok"
+
+
+def test_ready_probe_reports_dependency_state_published_by_the_server(
+    tmp_path, capsys, monkeypatch
+):
+    root = tmp_path / "secrets"
+    env = {
+        "MCP_AUTH_BROKER_ENV": "test",
+        "MCP_AUTH_BROKER_SECRET_PROVIDER": "file",
+        "MCP_AUTH_BROKER_SECRET_FILE_ROOT": str(root),
+        "MCP_AUTH_BROKER_READINESS_INTERVAL_SECONDS": "3600",
+        "MCP_AUTH_BROKER_READINESS_STATUS_PATH": str(tmp_path / "ready.json"),
+    }
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+    config = BrokerConfig.from_env(env)
+    server = MCPAuthBrokerServer(config=config, audit=AuditEmitter(emit_to_stdout=False))
+
+    def _publish() -> None:
+        server.readiness_monitor.probe("secret_provider")
+        server.readiness_publisher.publish()
+
+    _publish()
+    with pytest.raises(SystemExit) as exit_status:
+        main(["ready"])
+    failing = json.loads(capsys.readouterr().out)
+    root.mkdir()
+    _publish()
+    main(["ready"])
+    recovered = json.loads(capsys.readouterr().out)
+    published_at = json.loads((tmp_path / "ready.json").read_text())["published_at"]
+    stale = published_readiness(config, now=published_at + config.readiness_stale_seconds + 1)
+    server.shutdown()
+    with pytest.raises(SystemExit):
+        main(["ready"])
+    stopped = json.loads(capsys.readouterr().out)
+
+    assert exit_status.value.code == 1
+    assert failing["status"] == "not_ready"
+    assert failing["dependencies"]["secret_provider"]["error_code"] == "secret.unavailable"
+    assert recovered["status"] == "ready"
+    assert recovered["dependencies"]["secret_provider"]["status"] == "ok"
+    assert stale["dependencies"]["status_file"]["status"] == "stale"
+    assert stopped["dependencies"] == {"status_file": {"status": "pending"}}
+
+
+def test_probe_path_stays_within_import_budget():
+    completed = subprocess.run(
+        [
+            sys.executable,
+            "-X",
+            "importtime",
+            "-c",
+            "from mcp_auth_broker.cli import main; main(['health'])",
+        ],
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+        timeout=30,
+        check=True,
+    )
+
+    cumulative = {}
+    for line in completed.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, total, name = line.split("|")
+            if total.strip().isdigit():
+                cumulative[name.strip()] = int(total)
+
+    assert json.loads(completed.stdout)["status"] == "ok"
+    assert not _HEAVY_MODULES & set(cumulative)
+    assert cumulative["mcp_auth_broker.cli"] < _IMPORT_BUDGET_US
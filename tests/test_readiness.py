@@ -0,0 +1,124 @@
+import threading
+
+import pytest
+
+from mcp_auth_broker import MCPAuthBrokerServer
+from mcp_auth_broker.audit import AuditEmitter
+from mcp_auth_broker.config import BrokerConfig
+from mcp_auth_broker.metrics import MetricsRegistry
+from mcp_auth_broker.readiness import ReadinessMonitor
+from mcp_auth_broker.secrets import OnePasswordSecretProvider, SecretProviderError
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _failing_check():
+    raise SecretProviderError(code="secret.access_denied", message="denied")
+
+
+def _crashing_check():
+    raise RuntimeError("boom")
+
+
+def test_monitor_serves_cached_results_and_marks_them_stale():
+    clock = _Clock()
+    calls = []
+
+    def _ok_check():
+        calls.append(clock.now)
+        return {"backend": "memory"}
+
+    monitor = ReadinessMonitor(
+        checks={"cache": _ok_check, "secrets": _failing_check, "endpoint": _crashing_check},
+        interval_seconds=10,
+        stale_seconds=30,
+        metrics=MetricsRegistry(),
+        clock=clock,
+    )
+    assert monitor.snapshot()["cache"] == {"status": "pending"}
+
+    for name in monitor.checks:
+        monitor.probe(name)
+    clock.now = 5
+    snapshot = monitor.snapshot()
+    monitor.snapshot()
+
+    assert calls == [0.0]
+    assert snapshot["cache"] == {
+        "status": "ok",
+        "age_ms": 5000,
+        "duration_ms": 0,
+        "backend": "memory",
+    }
+    assert snapshot["secrets"]["status"] == "failed"
+    assert snapshot["secrets"]["error_code"] == "secret.access_denied"
+    assert snapshot["endpoint"]["error_code"] == "dependency.unavailable"
+    clock.now = 31
+    assert monitor.snapshot()["cache"]["status"] == "stale"
+
+
+def test_cli_secret_provider_check_reports_missing_token_and_binary():
+    with pytest.raises(SecretProviderError) as exc:
+        OnePasswordSecretProvider(token="", op_binary="op").check()
+    assert exc.value.code == "secret.access_denied"
+
+    with pytest.raises(SecretProviderError) as exc:
+        OnePasswordSecretProvider(token="token", op_binary="/nonexistent/op").check()
+    assert exc.value.code == "secret.unavailable"
+
+
+def test_server_readiness_reports_secret_provider_state(tmp_path):
+    root = tmp_path / "secrets"
+    config = BrokerConfig.from_env(
+        {
+            "MCP_AUTH_BROKER_ENV": "test",
+            "MCP_AUTH_BROKER_SECRET_PROVIDER": "file",
+            "MCP_AUTH_BROKER_SECRET_FILE_ROOT": str(root),
+            "MCP_AUTH_BROKER_READINESS_INTERVAL_SECONDS": "3600",
+        }
+    )
+    server = MCPAuthBrokerServer(config=config, audit=AuditEmitter(emit_to_stdout=False))
+
+    server.readiness_monitor.probe("secret_provider")
+    readiness = server.readiness()
+    assert readiness["status"] == "not_ready"
+    assert readiness["dependencies"]["secret_provider"]["error_code"] == "secret.unavailable"
+
+    root.mkdir()
+    server.readiness_monitor.probe("secret_provider")
+    readiness = server.readiness()
+    server.shutdown()
+
+    assert readiness["status"] == "ready"
+    assert readiness["dependencies"]["secret_provider"]["mode"] == "file"
+    assert list(readiness["dependencies"]) == ["secret_provider"]
+
+
+def test_server_probes_dependencies_only_after_start(tmp_path):
+    config = BrokerConfig.from_env(
+        {
+            "MCP_AUTH_BROKER_ENV": "test",
+            "MCP_AUTH_BROKER_SECRET_PROVIDER": "file",
+            "MCP_AUTH_BROKER_SECRET_FILE_ROOT": str(tmp_path),
+            "MCP_AUTH_BROKER_READINESS_INTERVAL_SECONDS": "3600",
+        }
+    )
+    checked = []
+    server = MCPAuthBrokerServer(config=config, audit=AuditEmitter(emit_to_stdout=False))
+    server.readiness_monitor.checks = {"secret_provider": lambda: checked.append(1)}
+
+    assert not [t for t in threading.enumerate() if t.name.startswith("readiness-")]
+    assert server.readiness()["dependencies"]["secret_provider"] == {"status": "pending"}
+
+    server.start()
+    server.shutdown()
+    for thread in threading.enumerate():
+        if thread.name == "readiness-secret_provider":
+            thread.join(5)
+    assert checked == [1]
@@ -0,0 +1,186 @@
+import copy
+import json
+from dataclasses import replace
+
+import pytest
+
+from mcp_auth_broker import MCPAuthBrokerServer
+from mcp_auth_broker.audit import AuditEmitter
+from mcp_auth_broker.config import BrokerConfig
+from mcp_auth_broker.redaction import DEFAULT_AUDIT_PATHS, REDACTED, RedactionEngine
+from mcp_auth_broker.secrets import SecretProviderError, SecretReference
+from mcp_auth_broker.server import TOOL_NAME
+
+
+def _provider_called_payload() -> dict:
+    return {
+        "provider": "microsoft_graph",
+        "operation": {
+            "action": "downstream_call",
+            "method": "POST",
+            "path": "/v1.0/me/sendMail",
+            "headers": {"Authorization": "Bearer abc", "content-type": "application/json"},
+            "body": {"message": {"subject": "hello", "toRecipients": [{"address": "a@b.c"}]}},
+        },
+        "timeout_ms": 1000,
+        "attempt": 1,
+        "outcome": "success",
+    }
+
+
+def test_engine_redacts_compiled_paths_and_shares_untouched_subtrees():
+    engine = RedactionEngine(["operation.headers.authorization", "items.*.secret", "**.token"])
+    untouched = {"id": "1", "nested": [{"value": 1}]}
+    value = {
+        "operation": {"headers": {"Authorization": "Bearer abc", "accept": "json"}},
+        "items": [{"secret": "s1", "name": "a"}, {"name": "b"}],
+        "deep": {"list": [{"token": "t1"}]},
+        "untouched": untouched,
+    }
+    original = copy.deepcopy(value)
+
+    redacted, redactions = engine.redact(value)
+
+    assert value == original
+    assert redacted["operation"]["headers"] == {"Authorization": REDACTED, "accept": "json"}
+    assert redacted["items"][0] == {"secret": REDACTED, "name": "a"}
+    assert redacted["items"][1] is value["items"][1]
+    assert redacted["deep"]["list"][0]["token"] == REDACTED
+    assert redacted["untouched"] is untouched
+    assert [entry["field"] for entry in redactions] == [
+        "operation.headers.Authorization",
+        "items.0.secret",
+        "deep.list.0.token",
+    ]
+    assert engine.redact({"untouched": untouched})[1] == []
+    with pytest.raises(ValueError):
+        RedactionEngine(["operation..body"])
+
+
+def test_redaction_walks_only_reachable_subtrees_and_shares_the_rest():
+    engine = RedactionEngine(DEFAULT_AUDIT_PATHS)
+    payload = _provider_called_payload()
+    payload["result"] = {"value": [{"id": str(index)} for index in range(1000)]}
+
+    redacted, redactions = engine.redact(payload)
+    clean = {key: value for key, value in payload.items() if key != "operation"}
+
+    assert redacted["result"] is payload["result"]
+    assert redacted["operation"]["body"] == REDACTED
+    assert redacted["operation"]["headers"]["Authorization"] == REDACTED
+    assert len(redactions) == 2
+    assert engine.redact(clean) == (clean, [])
+    assert engine.redact(clean)[0] is clean
+
+
+def _config(**overrides) -> BrokerConfig:
+    config = BrokerConfig(
+        environment="test",
+        service_name="mcp-auth-broker",
+        contract_version="v0.1.0",
+        policy_version="v0.1.0",
+        default_timeout_ms=10000,
+        allowed_scopes=("User.Read",),
+        secret_provider_mode="none",
+        graph_secret_reference=None,
+        graph_client_id="",
+        allowed_graph_resources=("https://graph.microsoft.com",),
+        token_cache_skew_seconds=60,
+        token_max_ttl_seconds=3000,
+        token_provider_timeout_seconds=4,
+    )
+    return replace(config, **overrides)
+
+
+def _request() -> dict:
+    return {
+        "contract_version": "v0.1.0",
+        "request_id": "req-123",
+        "requester": {"requester_id": "user-1", "identity_assurance": "verified"},
+        "graph": {
+            "tenant_id": "tenant-1",
+            "resource": "https://graph.microsoft.com",
+            "scopes": ["User.Read"],
+        },
+        "operation": {
+            "action": "downstream_call",
+            "method": "GET",
+            "path": "/v1.0/me",
+            "headers": {"Authorization": "Bearer caller-token", "accept": "application/json"},
+        },
+    }
+
+
+@pytest.mark.parametrize(
+    ("audit_mode", "event_type", "field"),
+    [
+        ("full", "provider.called", "operation.headers.Authorization"),
+        ("compact", "request.completed", "provider.called.operation.headers.Authorization"),
+    ],
+)
+def test_server_redacts_audit_payloads_and_lists_redactions(audit_mode, event_type, field):
+    audit = AuditEmitter(emit_to_stdout=False)
+    server = MCPAuthBrokerServer(config=_config(audit_mode=audit_mode), audit=audit)
+    request = _request()
+
+    response = server.execute_tool(TOOL_NAME, request)
+
+    assert response["status"] == "ok"
+    assert request["operation"]["headers"]["Authorization"] == "Bearer caller-token"
+    event = next(event for event in audit.events if event["event_type"] == event_type)
+    assert "caller-token" not in json.dumps(event)
+    assert {"field": field, "reason": "sensitive"} in event["redactions"]
+
+
+def test_server_redacts_credential_keys_in_emitted_audit_events():
+    audit = AuditEmitter(emit_to_stdout=False)
+    server = MCPAuthBrokerServer(config=_config(), audit=audit)
+    request = _request()
+    request["operation"]["client_secret"] = "caller-secret"
+
+    server.execute_tool(TOOL_NAME, request)
+
+    event = next(event for event in audit.events if event["event_type"] == "provider.called")
+    assert event["payload"]["operation"]["client_secret"] == REDACTED
+    assert {"field": "operation.client_secret", "reason": "sensitive"} in event["redactions"]
+    assert "caller-secret" not in json.dumps(audit.events)
+
+
+class _LeakySecretProvider:
+    def resolve(self, reference):
+        raise SecretProviderError(code="secret.access_denied", message="denied for s3cret")
+
+
+def test_token_error_result_records_withheld_secret():
+    audit = AuditEmitter(emit_to_stdout=False)
+    server = MCPAuthBrokerServer(
+        config=_config(
+            secret_provider_mode="1password",
+            graph_secret_reference=SecretReference.parse("op://vault/item/field"),
+            graph_client_id="test-client",
+        ),
+        audit=audit,
+        secret_provider=_LeakySecretProvider(),
+    )
+
+    response = server.execute_tool(TOOL_NAME, _request())
+
+    assert response["error"]["code"] == "secret.access_denied"
+    event = audit.events[-1]
+    assert event["event_type"] == "result.emitted"
+    assert event["redactions"] == [{"field": "error.metadata.secret_value", "reason": "sensitive"}]
+    assert "s3cret" not in json.dumps(audit.events)
+
+
+def test_server_redacts_configured_response_paths():
+    server = MCPAuthBrokerServer(
+        config=_config(redact_response_paths=("result.execution.response_body.ok",)),
+        audit=AuditEmitter(emit_to_stdout=False),
+    )
+
+    response = server.execute_tool(TOOL_NAME, _request())
+
+    assert response["result"]["execution"]["response_body"]["ok"] == REDACTED
+    assert response["result"]["redactions"] == [
+        {"field": "result.execution.response_body.ok", "reason": "sensitive"}
+    ]
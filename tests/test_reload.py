@@ -0,0 +1,195 @@
+import json
+import os
+import signal
+import threading
+import time
+from dataclasses import replace
+from uuid import uuid4
+
+from mcp_auth_broker import MCPAuthBrokerServer
+from mcp_auth_broker import server as server_module
+from mcp_auth_broker.audit import AuditEmitter
+from mcp_auth_broker.cli import main
+from mcp_auth_broker.config import BrokerConfig
+from mcp_auth_broker.graph_tokens import GraphTokenCache, GraphTokenProvider
+from mcp_auth_broker.reload import ConfigReloader
+from mcp_auth_broker.secrets import SecretReference
+from mcp_auth_broker.server import TOOL_NAME
+
+
+class _FakeSecretProvider:
+    def resolve(self, reference: SecretReference) -> str:
+        return "secret"
+
+
+class _MintClient:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def mint(self, *, tenant_id, client_id, client_secret, scope, timeout_seconds):
+        self.calls += 1
+        return f"token-{self.calls}", "Bearer", 3600
+
+
+def _config(**overrides) -> BrokerConfig:
+    config = BrokerConfig(
+        environment="test",
+        service_name="mcp-auth-broker",
+        contract_version="v0.1.0",
+        policy_version="v0.1.0",
+        default_timeout_ms=10000,
+        allowed_scopes=("User.Read", "Mail.Read"),
+        secret_provider_mode="none",
+        graph_secret_reference=None,
+        graph_client_id="",
+        allowed_graph_resources=("https://graph.microsoft.com",),
+        token_cache_skew_seconds=60,
+        token_max_ttl_seconds=3000,
+        token_provider_timeout_seconds=4,
+    )
+    return replace(config, **overrides)
+
+
+def _server(audit: AuditEmitter | None = None) -> tuple[MCPAuthBrokerServer, _MintClient]:
+    mint_client = _MintClient()
+    provider = GraphTokenProvider(
+        client_id="client-1",
+        secret_reference=SecretReference.parse("op://vault/item/field"),
+        secret_provider=_FakeSecretProvider(),
+        mint_client=mint_client,
+        cache=GraphTokenCache(),
+        allowed_scopes=("User.Read", "Mail.Read"),
+    )
+    server = MCPAuthBrokerServer(
+        config=_config(),
+        audit=audit or AuditEmitter(emit_to_stdout=False),
+        token_provider=provider,
+    )
+    return server, mint_client
+
+
+def _request(scope: str) -> dict:
+    return {
+        "contract_version": "v0.1.0",
+        "request_id": str(uuid4()),
+        "requester": {"requester_id": "user-1", "identity_assurance": "verified"},
+        "graph": {
+            "tenant_id": "tenant-1",
+            "resource": "https://graph.microsoft.com",
+            "scopes": [scope],
+        },
+        "operation": {"action": "downstream_call", "method": "GET", "path": "/v1.0/me"},
+    }
+
+
+def test_reload_swaps_policy_and_keeps_permitted_tokens_warm():
+    audit = AuditEmitter(emit_to_stdout=False)
+    server, mint_client = _server(audit)
+    server.execute_tool(TOOL_NAME, _request("User.Read"))
+    server.execute_tool(TOOL_NAME, _request("Mail.Read"))
+
+    result = server.reload_config(_config(allowed_scopes=("User.Read",), policy_version="v0.2.0"))
+
+    assert result["status"] == "reloaded"
+    assert result["changed"] == ["allowed_scopes", "policy_version"]
+    assert result["invalidated"]["token_cache"] == 1
+    denied = server.execute_tool(TOOL_NAME, _request("Mail.Read"))
+    allowed = server.execute_tool(TOOL_NAME, _request("User.Read"))
+    assert denied["error"]["code"] == "policy.denied"
+    assert allowed["result"]["policy"]["metadata"]["policy_version"] == "v0.2.0"
+    assert allowed["result"]["execution"]["response_body"]["token_metadata"]["source"] == "cache"
+    assert mint_client.calls == 2
+    reloads = [event for event in audit.events if event["event_type"] == "config.reloaded"]
+    assert reloads[0]["payload"]["policy_version"] == "v0.2.0"
+
+
+def test_reload_reports_but_does_not_apply_startup_only_settings():
+    server, _ = _server()
+
+    result = server.reload_config(_config(downstream_mode="graph"))
+
+    assert result["status"] == "unchanged"
+    assert result["restart_required"] == ["downstream_mode"]
+    assert server.config.downstream_mode == "none"
+
+
+def test_reloader_applies_env_file_and_rejects_invalid_files(tmp_path):
+    env_file = tmp_path / "broker.env"
+    env_file.write_text("# overlay\nMCP_AUTH_BROKER_POLICY_VERSION=v0.3.0\n")
+    server, _ = _server()
+    reloader = ConfigReloader(
+        server,
+        env_file=str(env_file),
+        environ={"MCP_AUTH_BROKER_ALLOWED_SCOPES": "User.Read,Mail.Read"},
+    )
+
+    applied = reloader.reload()
+    env_file.write_text("MCP_AUTH_BROKER_DEFAULT_TIMEOUT_MS=-1\n")
+    rejected = reloader.reload()
+
+    assert applied["changed"] == ["policy_version"]
+    assert rejected["status"] == "rejected"
+    assert server.config.policy_version == "v0.3.0"
+
+
+def test_reloader_watches_env_file_for_changes(tmp_path):
+    env_file = tmp_path / "broker.env"
+    env_file.write_text("MCP_AUTH_BROKER_POLICY_VERSION=v0.1.0\n")
+    server, _ = _server()
+    reloader = ConfigReloader(
+        server,
+        env_file=str(env_file),
+        environ={"MCP_AUTH_BROKER_ALLOWED_SCOPES": "User.Read,Mail.Read"},
+        poll_interval_seconds=0.01,
+    )
+    reloader.start()
+    try:
+        time.sleep(0.05)
+        env_file.write_text("MCP_AUTH_BROKER_POLICY_VERSION=v0.4.0\n")
+        deadline = time.monotonic() + 2
+        while server.config.policy_version != "v0.4.0" and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        reloader.stop()
+
+    assert server.config.policy_version == "v0.4.0"
+
+
+def _reload_events(audit: AuditEmitter) -> list[dict]:
+    return [event for event in audit.events if event["event_type"] == "config.reloaded"]
+
+
+def test_cli_run_reloads_on_sighup_until_interrupted(monkeypatch, capsys):
+    audit = AuditEmitter(emit_to_stdout=False)
+    server, _ = _server(audit)
+    server.reloader.environ = {
+        "MCP_AUTH_BROKER_ALLOWED_SCOPES": "User.Read,Mail.Read",
+        "MCP_AUTH_BROKER_POLICY_VERSION": "v0.5.0",
+    }
+    monkeypatch.setattr(server_module, "MCPAuthBrokerServer", lambda: server)
+    original_sigint = signal.getsignal(signal.SIGINT)
+    previous_sighup = signal.getsignal(signal.SIGHUP)
+
+    def _operator() -> None:
+        deadline = time.monotonic() + 5
+        while signal.getsignal(signal.SIGINT) is original_sigint:
+            if time.monotonic() > deadline:
+                return
+            time.sleep(0.01)
+        os.kill(os.getpid(), signal.SIGHUP)
+        while not _reload_events(audit) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        os.kill(os.getpid(), signal.SIGINT)
+
+    operator = threading.Thread(target=_operator)
+    operator.start()
+    main(["run"])
+    operator.join(5)
+
+    reloads = _reload_events(audit)
+    statuses = [json.loads(line)["status"] for line in capsys.readouterr().out.splitlines()]
+    assert server.config.policy_version == "v0.5.0"
+    assert reloads[0]["payload"]["changed"] == ["policy_version"]
+    assert statuses == ["started", "stopped"]
+    assert signal.getsignal(signal.SIGINT) is original_sigint
+    assert signal.getsignal(signal.SIGHUP) is previous_sighup
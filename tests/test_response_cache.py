@@ -0,0 +1,125 @@
+from mcp_auth_broker.downstream import GraphRequest, GraphResponse
+from mcp_auth_broker.response_cache import GraphResponseCache
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class _Upstream:
+    def __init__(self) -> None:
+        self.requests: list[GraphRequest] = []
+        self.etag = 'W/"1"'
+
+    def send(self, request: GraphRequest) -> GraphResponse:
+        self.requests.append(request)
+        if request.headers.get("if-none-match") == self.etag:
+            return GraphResponse(status=304, headers={}, body=None, provider_request_id="r-304")
+        return GraphResponse(
+            status=200,
+            headers={"content-type": "application/json", "etag": self.etag},
+            body={"path": request.path, "padding": "x" * 100},
+            provider_request_id=f"r-{len(self.requests)}",
+        )
+
+
+def _request(path: str = "/v1.0/me", scopes=("User.Read",), method: str = "GET") -> GraphRequest:
+    return GraphRequest(
+        tenant_id="tenant-1",
+        requester_id="user-1",
+        scopes=scopes,
+        resource="https://graph.microsoft.com",
+        access_token="token-abc",
+        method=method,
+        path=path,
+        headers={},
+        body=None,
+        timeout_seconds=1,
+    )
+
+
+def test_fresh_entry_is_served_without_upstream_call():
+    upstream = _Upstream()
+    cache = GraphResponseCache(
+        upstream, max_bytes=10_000, max_age_by_prefix=(("/v1.0/me", 60),), clock=_Clock()
+    )
+
+    first = cache.send(_request())
+    first.body["path"] = "mutated"
+    second = cache.send(_request())
+
+    assert first.annotations["cache_status"] == "miss"
+    assert second.annotations["cache_status"] == "hit"
+    assert second.body["path"] == "/v1.0/me"
+    assert len(upstream.requests) == 1
+
+
+def test_stale_entry_revalidates_with_etag():
+    clock = _Clock()
+    upstream = _Upstream()
+    cache = GraphResponseCache(
+        upstream, max_bytes=10_000, max_age_by_prefix=(("/v1.0/", 10),), clock=clock
+    )
+    cache.send(_request())
+
+    clock.now = 11
+    revalidated = cache.send(_request())
+
+    assert upstream.requests[-1].headers["if-none-match"] == 'W/"1"'
+    assert revalidated.annotations["cache_status"] == "revalidated"
+    assert revalidated.status == 200
+    assert revalidated.body["path"] == "/v1.0/me"
+
+    upstream.etag = 'W/"2"'
+    clock.now = 30
+    changed = cache.send(_request())
+
+    assert changed.annotations["cache_status"] == "miss"
+    assert changed.provider_request_id == "r-3"
+
+
+def test_scope_sets_are_isolated_but_order_insensitive():
+    upstream = _Upstream()
+    cache = GraphResponseCache(
+        upstream, max_bytes=10_000, max_age_by_prefix=(("/", 60),), clock=_Clock()
+    )
+
+    cache.send(_request(scopes=("User.Read", "Mail.Read")))
+    reordered = cache.send(_request(scopes=("Mail.Read", "User.Read")))
+    recased = cache.send(_request(scopes=("mail.read", " USER.READ", "User.Read")))
+    narrower = cache.send(_request(scopes=("User.Read",)))
+
+    assert reordered.annotations["cache_status"] == "hit"
+    assert recased.annotations["cache_status"] == "hit"
+    assert narrower.annotations["cache_status"] == "miss"
+
+
+def test_memory_budget_evicts_least_recently_used():
+    upstream = _Upstream()
+    cache = GraphResponseCache(
+        upstream, max_bytes=400, max_age_by_prefix=(("/", 60),), clock=_Clock()
+    )
+
+    cache.send(_request("/v1.0/users/a"))
+    cache.send(_request("/v1.0/users/b"))
+    cache.send(_request("/v1.0/users/a"))
+    cache.send(_request("/v1.0/users/c"))
+
+    assert cache.size_bytes <= 400
+    assert cache.send(_request("/v1.0/users/a")).annotations["cache_status"] == "hit"
+    assert cache.send(_request("/v1.0/users/b")).annotations["cache_status"] == "miss"
+
+
+def test_non_get_requests_bypass_cache():
+    upstream = _Upstream()
+    cache = GraphResponseCache(upstream, max_bytes=10_000, max_age_by_prefix=(("/", 60),))
+
+    response = cache.send(_request(method="DELETE"))
+    cache.send(_request(method="DELETE"))
+
+    assert "cache_status" not in response.annotations
+    assert len(upstream.requests) == 2
@@ -1,8 +1,15 @@
+import json
+import os
 import subprocess
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
 
 import pytest
 
 from mcp_auth_broker.config import BrokerConfig
+from mcp_auth_broker.secrets import FileSecretProvider, OnePasswordConnectSecretProvider
 from mcp_auth_broker.secrets import OnePasswordSecretProvider, SecretProviderError, SecretReference
 
 
@@ -99,3 +106,160 @@ def test_1password_provider_maps_unavailable_binary(monkeypatch):
         provider.resolve(SecretReference.parse("op://vault/item/field"))
 
     assert exc.value.code == "secret.unavailable"
+
+
+def test_file_provider_caches_until_the_mounted_file_changes(tmp_path):
+    secret_file = tmp_path / "vault" / "item" / "field"
+    secret_file.parent.mkdir(parents=True)
+    secret_file.write_text("first\n")
+    provider = FileSecretProvider(str(tmp_path))
+    reference = SecretReference.parse("op://vault/item/field")
+
+    assert provider.resolve(reference) == "first"
+    secret_file.write_text("second\n")
+    os.utime(secret_file, ns=(0, os.stat(secret_file).st_mtime_ns + 1_000_000))
+
+    assert provider.resolve(reference) == "second"
+    with pytest.raises(SecretProviderError) as exc:
+        provider.resolve(SecretReference.parse("op://vault/item/missing"))
+    assert exc.value.code == "secret.not_found"
+    with pytest.raises(SecretProviderError) as exc:
+        provider.resolve(SecretReference.parse("op://vault/../field"))
+    assert exc.value.code == "bad_request.invalid_field"
+
+
+class _ConnectHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    requests: list[tuple[int, str]] = []
+    filters: list[str] = []
+    delay_seconds = 0.0
+    in_flight = 0
+    max_in_flight = 0
+    lock = threading.Lock()
+
+    def do_GET(self) -> None:
+        cls = type(self)
+        with cls.lock:
+            cls.in_flight += 1
+            cls.max_in_flight = max(cls.max_in_flight, cls.in_flight)
+        try:
+            time.sleep(self.delay_seconds)
+            self._route()
+        finally:
+            with cls.lock:
+                cls.in_flight -= 1
+
+    def _route(self) -> None:
+        url = urlsplit(self.path)
+        self.requests.append((self.client_address[1], url.path))
+        query_filter = parse_qs(url.query).get("filter", [""])[0]
+        self.filters.append(query_filter)
+        title = [json.loads(query_filter.split(" eq ", 1)[1])] if query_filter else []
+        if self.headers.get("authorization") != "Bearer connect-token":
+            self._send(401, {"message": "invalid token"})
+        elif url.path == "/v1/vaults" and title == ["broken"]:
+            self._send(200, [{"name": "broken"}])
+        elif url.path == "/v1/vaults":
+            self._send(200, [{"id": "v1"}] if title == ["vault"] else [])
+        elif url.path == "/v1/vaults/v1/items":
+            self._send(200, [{"id": "i1"}] if title == ["item"] else [])
+        elif url.path == "/v1/vaults/v1/items/i1":
+            self._send(200, {"fields": [{"id": "f1", "label": "field", "value": "s3cret"}]})
+        else:
+            self._send(404, {"message": "not found"})
+
+    def _send(self, status: int, payload: object) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("content-type", "application/json")
+        self.send_header("content-length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+def test_connect_provider_resolves_over_one_kept_alive_connection():
+    _ConnectHandler.requests = []
+    _ConnectHandler.filters = []
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _ConnectHandler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{httpd.server_port}"
+    provider = OnePasswordConnectSecretProvider(url, token="connect-token")
+    try:
+        first = provider.resolve(SecretReference.parse("op://vault/item/field"))
+        second = provider.resolve(SecretReference.parse("op://vault/item/field"))
+        with pytest.raises(SecretProviderError) as missing:
+            provider.resolve(SecretReference.parse("op://other/item/field"))
+        with pytest.raises(SecretProviderError) as injected:
+            provider.resolve(SecretReference.parse('op://x" or title eq "vault/item/field'))
+        with pytest.raises(SecretProviderError) as denied:
+            OnePasswordConnectSecretProvider(url, token="wrong").resolve(
+                SecretReference.parse("op://vault/item/field")
+            )
+    finally:
+        provider.close()
+        httpd.shutdown()
+        httpd.server_close()
+
+    assert first == second == "s3cret"
+    assert missing.value.code == "secret.not_found"
+    assert injected.value.code == "secret.not_found"
+    assert 'title eq "x\\" or title eq \\"vault"' in _ConnectHandler.filters
+    assert denied.value.code == "secret.access_denied"
+    provider_requests = _ConnectHandler.requests[:5]
+    assert [path for _, path in provider_requests] == [
+        "/v1/vaults",
+        "/v1/vaults/v1/items",
+        "/v1/vaults/v1/items/i1",
+        "/v1/vaults/v1/items/i1",
+        "/v1/vaults",
+    ]
+    assert len({port for port, _ in provider_requests}) == 1
+
+
+def test_connect_provider_runs_parallel_requests_on_a_bounded_pool():
+    _ConnectHandler.requests = []
+    _ConnectHandler.max_in_flight = 0
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _ConnectHandler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{httpd.server_port}"
+    provider = OnePasswordConnectSecretProvider(url, token="connect-token", max_connections=2)
+    reference = SecretReference.parse("op://vault/item/field")
+    results = []
+    try:
+        provider.resolve(reference)
+        _ConnectHandler.delay_seconds = 0.05
+        threads = [
+            threading.Thread(target=lambda: results.append(provider.resolve(reference)))
+            for _ in range(6)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+        with pytest.raises(SecretProviderError) as malformed:
+            provider.resolve(SecretReference.parse("op://broken/item/field"))
+    finally:
+        _ConnectHandler.delay_seconds = 0.0
+        provider.close()
+        httpd.shutdown()
+        httpd.server_close()
+
+    assert results == ["s3cret"] * 6
+    assert _ConnectHandler.max_in_flight == 2
+    assert len({port for port, _ in _ConnectHandler.requests}) == 2
+    assert malformed.value.code == "secret.unavailable"
+
+
+def test_config_selects_file_and_connect_providers():
+    file_config = BrokerConfig.from_env(
+        {
+            "MCP_AUTH_BROKER_SECRET_PROVIDER": "file",
+            "MCP_AUTH_BROKER_SECRET_FILE_ROOT": "/var/run/secrets/broker",
+        }
+    )
+    assert file_config.secret_file_root == "/var/run/secrets/broker"
+    with pytest.raises(ValueError):
+        BrokerConfig.from_env({"MCP_AUTH_BROKER_SECRET_PROVIDER": "connect"})
@@ -0,0 +1,123 @@
+import tracemalloc
+
+from mcp_auth_broker import MCPAuthBrokerServer
+from mcp_auth_broker.audit import AuditEmitter
+from mcp_auth_broker.config import BrokerConfig
+from mcp_auth_broker.downstream import GraphRequest, GraphResponse
+from mcp_auth_broker.slo import ALL_TENANTS, SloTimedDownstreamClient, SloTracker
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class _FakeDownstreamClient:
+    def send(self, request: GraphRequest) -> GraphResponse:
+        return GraphResponse(status=200, headers={}, body={}, provider_request_id="p-1")
+
+
+def _tracker(clock: _Clock, signals: list, **overrides) -> SloTracker:
+    options = {
+        "budgets_ms": {"mint": 3000, "downstream": 4000},
+        "window_seconds": 60,
+        "slices": 6,
+        "on_breach": lambda *signal: signals.append(signal),
+        "clock": clock,
+    }
+    options.update(overrides)
+    return SloTracker(**options)
+
+
+def test_tracker_signals_when_violation_ratio_crosses_trigger_and_recovers():
+    clock = _Clock()
+    signals = []
+    tracker = _tracker(clock, signals)
+
+    for _ in range(18):
+        tracker.observe("mint", "tenant-1", 0.2)
+    tracker.observe("mint", "tenant-1", 3.5)
+    tracker.observe("mint", "tenant-2", 0.2)
+    assert signals == []
+
+    tracker.observe("mint", "tenant-2", 5.0)
+    assert signals == [("mint", ALL_TENANTS, 0.0952, True)]
+
+    clock.now = 61
+    for _ in range(20):
+        tracker.observe("mint", "tenant-2", 0.1)
+    assert signals[-1] == ("mint", ALL_TENANTS, 0.0, False)
+
+    report = tracker.report()
+    assert report["mint"]["samples"] == 20
+    assert report["mint"]["p50_ms"] < 115
+    assert set(report["mint"]["tenants"]) == {"tenant-2"}
+    assert report["downstream"]["samples"] == 0
+
+
+def test_tracker_quantiles_and_tenant_cap():
+    clock = _Clock()
+    tracker = _tracker(clock, [], max_tenants=2)
+
+    for latency_ms in range(1, 1001):
+        tracker.observe("downstream", f"tenant-{latency_ms % 3}", latency_ms / 1000)
+
+    report = tracker.report()["downstream"]
+    assert report["samples"] == 1000
+    assert 500 <= report["p50_ms"] <= 500 * 1.15
+    assert 990 <= report["p99_ms"] <= 990 * 1.15
+    assert len(report["tenants"]) == 2
+
+
+def test_tracker_memory_stays_constant_with_request_volume():
+    clock = _Clock()
+    tracker = _tracker(clock, [], max_tenants=16)
+
+    def _run(samples: int) -> None:
+        for index in range(samples):
+            clock.now += 0.01
+            tracker.observe("downstream", f"tenant-{index % 32}", (index % 5000) / 1000)
+
+    _run(2_000)
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        _run(20_000)
+        after, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert after - before < 64 * 1024
+
+
+def test_server_emits_audit_and_metric_signals_for_budget_breaches():
+    config = BrokerConfig.from_env({"MCP_AUTH_BROKER_ENV": "test"})
+    audit = AuditEmitter(emit_to_stdout=False)
+    server = MCPAuthBrokerServer(config=config, audit=audit)
+    client = SloTimedDownstreamClient(_FakeDownstreamClient(), server.slo)
+
+    for _ in range(20):
+        server.slo.observe("downstream", "tenant-1", 4.5)
+    client.send(
+        GraphRequest(
+            tenant_id="tenant-1",
+            requester_id="user-1",
+            scopes=("User.Read",),
+            resource="https://graph.microsoft.com",
+            access_token="token",
+            method="GET",
+            path="/v1.0/me",
+            headers={},
+            body=None,
+            timeout_seconds=4,
+        )
+    )
+
+    events = [event for event in audit.events if event["event_type"] == "slo.budget_breached"]
+    assert [event["payload"]["tenant_id"] for event in events] == [ALL_TENANTS, "tenant-1"]
+    assert events[0]["payload"]["budget_ms"] == 4000
+    assert server.metrics.gauge("slo.budget_breached", stage="downstream", tenant="tenant-1") == 1
+    assert server.slo_report()["downstream"]["tenants"]["tenant-1"]["samples"] == 21
@@ -1,3 +1,9 @@
+import os
+import signal
+import threading
+import time
+from dataclasses import replace
+
 from mcp_auth_broker import MCPAuthBrokerServer, main
 from mcp_auth_broker.audit import AuditEmitter
 from mcp_auth_broker.config import BrokerConfig
@@ -40,10 +46,23 @@ def _allow_request() -> dict:
     }
 
 
-def test_main_runs(capsys):
+def test_main_runs_until_interrupted(capsys):
+    original = signal.getsignal(signal.SIGINT)
+
+    def _interrupt_once_serving() -> None:
+        deadline = time.monotonic() + 5
+        while signal.getsignal(signal.SIGINT) is original and time.monotonic() < deadline:
+            time.sleep(0.01)
+        os.kill(os.getpid(), signal.SIGINT)
+
+    interrupter = threading.Thread(target=_interrupt_once_serving)
+    interrupter.start()
     main([])
+    interrupter.join(5)
+
     captured = capsys.readouterr()
     assert '"status": "started"' in captured.out
+    assert '"status": "stopped"' in captured.out
 
 
 def test_tool_discovery_returns_expected_signature():
@@ -90,6 +109,29 @@ def test_deny_path_returns_stable_reason_code():
     ]
 
 
+def test_policy_matches_scopes_case_insensitively():
+    server = MCPAuthBrokerServer(config=_config(), audit=AuditEmitter(emit_to_stdout=False))
+    request = _allow_request()
+    request["graph"]["scopes"] = [" user.read "]
+
+    response = server.execute_tool(TOOL_NAME, request)
+
+    assert response["status"] == "ok"
+    assert response["result"]["policy"]["decision"] == "allow"
+
+
+def test_policy_denies_resource_outside_allowlist():
+    server = MCPAuthBrokerServer(config=_config(), audit=AuditEmitter(emit_to_stdout=False))
+    request = _allow_request()
+    request["graph"]["resource"] = "https://management.azure.com"
+
+    response = server.execute_tool(TOOL_NAME, request)
+
+    assert response["status"] == "error"
+    assert response["error"]["code"] == "policy.denied"
+    assert response["error"]["metadata"]["reason_code"] == "policy.rule.deny.resource.not_permitted"
+
+
 class _FailingSecretProvider:
     def resolve(self, reference):
         raise SecretProviderError(code="secret.access_denied", message="secret access denied")
@@ -178,3 +220,101 @@ def test_server_maps_token_provider_failure_deterministically():
 
     assert response["status"] == "error"
     assert response["error"]["code"] == "provider.unavailable"
+
+
+class _BlockingTokenProvider:
+    def __init__(self):
+        self.release = threading.Event()
+        self.warmed = []
+
+    def get_token(self, *, tenant_id, resource, scopes, force_refresh=False, now_epoch=None):
+        self.release.wait(5)
+        self.warmed.append((tenant_id, tuple(scopes)))
+        return _FakeTokenResult()
+
+
+def test_readiness_waits_for_prewarm_to_complete():
+    token_provider = _BlockingTokenProvider()
+    config = replace(
+        _config(),
+        prewarm_targets=(("tenant-1", ("User.Read",)), ("tenant-2", ("User.Read",))),
+    )
+    server = MCPAuthBrokerServer(
+        config=config,
+        audit=AuditEmitter(emit_to_stdout=False),
+        token_provider=token_provider,
+    )
+
+    assert server.readiness()["status"] == "not_ready"
+
+    token_provider.release.set()
+    assert server.prewarmer.wait(5)
+
+    assert server.readiness() == {"status": "ready", "environment": "test", "prewarm": "complete"}
+    assert sorted(token_provider.warmed) == [
+        ("tenant-1", ("User.Read",)),
+        ("tenant-2", ("User.Read",)),
+    ]
+
+
+def test_readiness_reports_prewarm_timeout_as_ready():
+    token_provider = _BlockingTokenProvider()
+    config = replace(
+        _config(),
+        prewarm_targets=(("tenant-1", ("User.Read",)),),
+        prewarm_timeout_seconds=0,
+    )
+    server = MCPAuthBrokerServer(
+        config=config,
+        audit=AuditEmitter(emit_to_stdout=False),
+        token_provider=token_provider,
+    )
+
+    readiness = server.readiness()
+    token_provider.release.set()
+
+    assert readiness["status"] == "ready"
+    assert readiness["prewarm"] == "timed_out"
+
+
+class _BrokenTokenProvider:
+    def get_token(self, *, tenant_id, resource, scopes, force_refresh=False, now_epoch=None):
+        if tenant_id == "tenant-1":
+            raise GraphTokenProviderError("provider.auth_failed", "token provider auth failed")
+        raise RuntimeError("connection pool exhausted")
+
+
+def test_prewarm_records_and_audits_every_failure():
+    audit = AuditEmitter(emit_to_stdout=False)
+    config = replace(
+        _config(),
+        prewarm_targets=(("tenant-1", ("User.Read",)), ("tenant-2", ("User.Read",))),
+    )
+    server = MCPAuthBrokerServer(config=config, audit=audit, token_provider=_BrokenTokenProvider())
+
+    assert server.prewarmer.wait(5)
+
+    assert server.prewarmer.failed == {
+        "tenant-1": "provider.auth_failed",
+        "tenant-2": "provider.unavailable",
+    }
+    failures = sorted(
+        (event["payload"]["tenant_id"], event["payload"]["error_code"])
+        for event in audit.events
+        if event["event_type"] == "token.prewarm_failed"
+    )
+    assert failures == [("tenant-1", "provider.auth_failed"), ("tenant-2", "provider.unavailable")]
+    assert server.metrics.counter(
+        "prewarm.failures", tenant="tenant-2", code="provider.unavailable"
+    )
+
+
+def test_config_parses_prewarm_targets(monkeypatch):
+    monkeypatch.setenv(
+        "MCP_AUTH_BROKER_PREWARM", "tenant-a:User.Read, Mail.Read;tenant-b:User.Read"
+    )
+    config = BrokerConfig.from_env()
+    assert config.prewarm_targets == (
+        ("tenant-a", ("User.Read", "Mail.Read")),
+        ("tenant-b", ("User.Read",)),
+    )
@@ -0,0 +1,362 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from uuid import uuid4
+
+import pytest
+
+from mcp_auth_broker import MCPAuthBrokerServer
+from mcp_auth_broker.audit import AuditEmitter
+from mcp_auth_broker.config import BrokerConfig
+from mcp_auth_broker.downstream import GraphDownstreamError, GraphRequest, GraphResponse
+from mcp_auth_broker.server import TOOL_NAME
+from mcp_auth_broker.uploads import (
+    CHUNK_ALIGNMENT,
+    HttpUploadTransport,
+    StreamUploadSource,
+    run_upload_session,
+)
+
+_UPLOAD_URL = "https://tenant.sharepoint.com/upload/session-1"
+
+
+class _SessionClient:
+    def __init__(self) -> None:
+        self.requests: list[GraphRequest] = []
+
+    def send(self, request: GraphRequest) -> GraphResponse:
+        self.requests.append(request)
+        return GraphResponse(
+            status=200, headers={}, body={"uploadUrl": _UPLOAD_URL}, provider_request_id="s-1"
+        )
+
+
+class _RangeTransport:
+    """Accepts ranges in order; optionally drops the connection after storing a range."""
+
+    def __init__(self, fail_after_store: set[int] | None = None) -> None:
+        self.received = bytearray()
+        self.total = 0
+        self.puts: list[tuple[int, int]] = []
+        self.fail_after_store = fail_after_store or set()
+        self.lock = threading.Lock()
+
+    def put_range(self, url, data, *, start, total, timeout_seconds):
+        assert url == _UPLOAD_URL
+        with self.lock:
+            self.puts.append((start, len(data)))
+            if start != len(self.received):
+                return 416, {"error": {"code": "invalidRange"}}
+            self.received.extend(data)
+            self.total = total
+            if start in self.fail_after_store:
+                self.fail_after_store.discard(start)
+                return 503, None
+            if len(self.received) == total:
+                return 201, {"id": "item-1", "size": total}
+            return 202, {"nextExpectedRanges": [f"{len(self.received)}-"]}
+
+    def status(self, url, *, timeout_seconds):
+        return 200, {"nextExpectedRanges": [f"{len(self.received)}-"]}
+
+
+def _create_request() -> GraphRequest:
+    return GraphRequest(
+        tenant_id="tenant-1",
+        requester_id="user-1",
+        scopes=("Files.ReadWrite",),
+        resource="https://graph.microsoft.com",
+        access_token="token-abc",
+        method="POST",
+        path="/v1.0/me/drive/root:/big.bin:/createUploadSession",
+        headers={},
+        body=None,
+        timeout_seconds=1,
+    )
+
+
+def test_stream_source_is_uploaded_in_aligned_ranges():
+    payload = bytes(range(256)) * 3000
+    parts = [payload[index : index + 1000] for index in range(0, len(payload), 1000)]
+    transport = _RangeTransport()
+
+    result = run_upload_session(
+        _SessionClient(),
+        transport,
+        _create_request(),
+        StreamUploadSource(parts, total_size=len(payload)),
+        chunk_size=CHUNK_ALIGNMENT,
+    )
+
+    assert bytes(transport.received) == payload
+    assert [size for _, size in transport.puts] == [CHUNK_ALIGNMENT, CHUNK_ALIGNMENT, 112_640]
+    assert result.http_status == 201
+    assert result.summary == {"bytes": len(payload), "chunks": 3, "retries": 0}
+
+
+def test_failed_range_resumes_from_next_expected_offset():
+    payload = b"x" * (CHUNK_ALIGNMENT * 2 + 10)
+    transport = _RangeTransport(fail_after_store={0})
+    sleeps: list[float] = []
+
+    result = run_upload_session(
+        _SessionClient(),
+        transport,
+        _create_request(),
+        StreamUploadSource([payload], total_size=len(payload)),
+        chunk_size=CHUNK_ALIGNMENT,
+        sleep=sleeps.append,
+    )
+
+    # The session already had the first range, so it is not resent.
+    assert transport.puts == [
+        (0, CHUNK_ALIGNMENT),
+        (CHUNK_ALIGNMENT, CHUNK_ALIGNMENT),
+        (CHUNK_ALIGNMENT * 2, 10),
+    ]
+    assert bytes(transport.received) == payload
+    assert result.summary["retries"] == 1
+    # Backoff starts at half the 0.5s base step and adds up to the other half as jitter.
+    assert len(sleeps) == 1 and 0.25 <= sleeps[0] <= 0.5
+
+
+def test_retry_budget_applies_to_each_range():
+    payload = b"z" * (CHUNK_ALIGNMENT * 3 + 10)
+    transport = _RangeTransport(fail_after_store={0, CHUNK_ALIGNMENT, CHUNK_ALIGNMENT * 2})
+    sleeps: list[float] = []
+
+    result = run_upload_session(
+        _SessionClient(),
+        transport,
+        _create_request(),
+        StreamUploadSource([payload], total_size=len(payload)),
+        chunk_size=CHUNK_ALIGNMENT,
+        max_retries=1,
+        sleep=sleeps.append,
+    )
+
+    assert bytes(transport.received) == payload
+    assert result.summary["retries"] == 3
+    assert len(sleeps) == 3
+
+
+class _ThrottlingTransport(_RangeTransport):
+    """Answers the first ``throttles`` ranges with 429 and the given ``Retry-After``."""
+
+    def __init__(self, retry_after: float | None, throttles: int = 1) -> None:
+        super().__init__()
+        self.retry_after = retry_after
+        self.throttles = throttles
+
+    def put_range(self, url, data, *, start, total, timeout_seconds):
+        if self.throttles:
+            self.throttles -= 1
+            raise GraphDownstreamError(
+                "provider.rate_limited", "throttled", retry_after_seconds=self.retry_after
+            )
+        return super().put_range(
+            url, data, start=start, total=total, timeout_seconds=timeout_seconds
+        )
+
+
+def _upload(transport: _RangeTransport, sleeps: list[float], **kwargs):
+    payload = b"t" * (CHUNK_ALIGNMENT + 10)
+    return run_upload_session(
+        _SessionClient(),
+        transport,
+        _create_request(),
+        StreamUploadSource([payload], total_size=len(payload)),
+        chunk_size=CHUNK_ALIGNMENT,
+        sleep=sleeps.append,
+        **kwargs,
+    )
+
+
+def test_throttled_range_waits_for_retry_after_then_backs_off():
+    sleeps: list[float] = []
+
+    result = _upload(_ThrottlingTransport(retry_after=2), sleeps)
+
+    assert result.http_status == 201
+    assert sleeps == [2]
+
+    sleeps.clear()
+    _upload(_ThrottlingTransport(retry_after=None, throttles=3), sleeps, backoff_seconds=1)
+    assert len(sleeps) == 3
+    assert 0.5 <= sleeps[0] <= 1 and 1 <= sleeps[1] <= 2 and 2 <= sleeps[2] <= 4
+
+
+def test_throttled_range_fails_when_retry_after_exceeds_limit():
+    sleeps: list[float] = []
+
+    with pytest.raises(GraphDownstreamError) as exc:
+        _upload(_ThrottlingTransport(retry_after=120), sleeps, max_backoff_seconds=30)
+
+    assert exc.value.code == "provider.rate_limited"
+    assert exc.value.retry_after_seconds == 120
+    assert sleeps == []
+
+
+class _ThrottlingHandler(BaseHTTPRequestHandler):
+    def do_PUT(self) -> None:
+        self.rfile.read(int(self.headers["content-length"]))
+        self.send_response(429)
+        self.send_header("retry-after", "7")
+        self.send_header("content-length", "0")
+        self.end_headers()
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+def test_http_transport_reports_retry_after_on_429():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _ThrottlingHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        with pytest.raises(GraphDownstreamError) as exc:
+            HttpUploadTransport().put_range(
+                f"http://127.0.0.1:{server.server_port}/upload",
+                b"abc",
+                start=0,
+                total=3,
+                timeout_seconds=5,
+            )
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert exc.value.code == "provider.rate_limited"
+    assert exc.value.retry_after_seconds == 7
+
+
+def test_read_ahead_bounds_buffered_chunks():
+    produced = []
+    gate = threading.Event()
+
+    def parts():
+        for index in range(20):
+            produced.append(index)
+            yield b"y" * CHUNK_ALIGNMENT
+
+    class _SlowTransport(_RangeTransport):
+        def put_range(self, url, data, *, start, total, timeout_seconds):
+            gate.wait(1)
+            return super().put_range(
+                url, data, start=start, total=total, timeout_seconds=timeout_seconds
+            )
+
+    transport = _SlowTransport()
+    worker = threading.Thread(
+        target=run_upload_session,
+        args=(
+            _SessionClient(),
+            transport,
+            _create_request(),
+            StreamUploadSource(parts(), total_size=20 * CHUNK_ALIGNMENT),
+        ),
+        kwargs={"chunk_size": CHUNK_ALIGNMENT, "read_ahead_chunks": 2},
+    )
+    worker.start()
+    threading.Event().wait(0.2)
+    buffered_while_blocked = len(produced)
+    gate.set()
+    worker.join(5)
+
+    # One chunk in flight, two queued and one held by the blocked reader.
+    assert buffered_while_blocked <= 4
+    assert len(transport.received) == 20 * CHUNK_ALIGNMENT
+
+
+def _config(root: str) -> BrokerConfig:
+    return BrokerConfig(
+        environment="test",
+        service_name="mcp-auth-broker",
+        contract_version="v0.1.0",
+        policy_version="v0.1.0",
+        default_timeout_ms=10000,
+        allowed_scopes=("User.Read",),
+        secret_provider_mode="none",
+        graph_secret_reference=None,
+        graph_client_id="",
+        allowed_graph_resources=("https://graph.microsoft.com",),
+        token_cache_skew_seconds=60,
+        token_max_ttl_seconds=3000,
+        token_provider_timeout_seconds=4,
+        upload_source_root=root,
+    )
+
+
+class _TokenResult:
+    token = "token-abc"
+    metadata = {"tenant_id": "tenant-1", "source": "minted"}
+
+
+class _TokenProvider:
+    def get_token(self, *, tenant_id, resource, scopes, force_refresh=False, now_epoch=None):
+        return _TokenResult()
+
+
+def _tool_request(upload: dict) -> dict:
+    return {
+        "contract_version": "v0.1.0",
+        "request_id": str(uuid4()),
+        "requester": {"requester_id": "user-1", "identity_assurance": "verified"},
+        "graph": {
+            "tenant_id": "tenant-1",
+            "resource": "https://graph.microsoft.com",
+            "scopes": ["User.Read"],
+        },
+        "operation": {
+            "action": "downstream_call",
+            "method": "POST",
+            "path": "/v1.0/me/drive/root:/big.bin:/createUploadSession",
+            "upload": upload,
+        },
+    }
+
+
+def _server(root: str, transport: _RangeTransport) -> MCPAuthBrokerServer:
+    return MCPAuthBrokerServer(
+        config=_config(root),
+        audit=AuditEmitter(emit_to_stdout=False),
+        token_provider=_TokenProvider(),
+        downstream_client=_SessionClient(),
+        upload_transport=transport,
+    )
+
+
+def test_server_uploads_file_beneath_source_root(tmp_path):
+    (tmp_path / "big.bin").write_bytes(b"z" * (CHUNK_ALIGNMENT + 5))
+    transport = _RangeTransport()
+
+    response = _server(str(tmp_path), transport).execute_tool(
+        TOOL_NAME, _tool_request({"source_path": "big.bin", "chunk_size": CHUNK_ALIGNMENT})
+    )
+
+    execution = response["result"]["execution"]
+    assert execution["http_status"] == 201
+    assert execution["upload"] == {"bytes": CHUNK_ALIGNMENT + 5, "chunks": 2, "retries": 0}
+
+
+def test_server_streams_upload_content_from_caller():
+    transport = _RangeTransport()
+
+    response = _server("", transport).execute_upload(
+        TOOL_NAME, _tool_request({}), StreamUploadSource([b"a" * 10, b"b" * 10], total_size=20)
+    )
+
+    assert response["status"] == "ok"
+    assert bytes(transport.received) == b"a" * 10 + b"b" * 10
+
+
+def test_upload_rejects_paths_outside_root_and_bad_chunk_sizes(tmp_path):
+    (tmp_path / "inside").mkdir()
+    (tmp_path / "secret.txt").write_text("nope")
+    server = _server(str(tmp_path / "inside"), _RangeTransport())
+
+    escaped = server.execute_tool(TOOL_NAME, _tool_request({"source_path": "../secret.txt"}))
+    misaligned = server.execute_tool(
+        TOOL_NAME, _tool_request({"source_path": "x", "chunk_size": 1000})
+    )
+
+    assert escaped["error"]["metadata"]["fields"] == ["operation.upload.source_path"]
+    assert misaligned["error"]["metadata"]["fields"] == ["operation.upload.chunk_size"]